@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import Dict, Any
 from dotenv import load_dotenv
 
@@ -11,12 +12,59 @@ class Config:
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'qa')
     BROWSER = os.getenv('BROWSER', 'chrome')
     HEADLESS = os.getenv('HEADLESS', 'false').lower() == 'true'
+    # Playwright trace per test: 'off', 'on' or 'retain-on-failure'
+    PLAYWRIGHT_TRACE = os.getenv('PLAYWRIGHT_TRACE', 'off')
+
+    # Output directory of the reports, timings, traces and videos of a run. The results
+    # store stays in framework/reports, matrix combinations each get their own directory
+    REPORTS_DIR = os.getenv('REPORTS_DIR', os.path.join('framework', 'reports'))
+
+    # Chrome profiles copied from a template warmed at BASE_URL once per session
+    PROFILE_TEMPLATE = os.getenv('PROFILE_TEMPLATE', 'false').lower() == 'true'
+    PROFILE_TEMPLATE_DIR = os.getenv('PROFILE_TEMPLATE_DIR',
+                                     os.path.join(tempfile.gettempdir(), 'browser-profile-templates'))
+
+    # Browser launch profile: 'default', or 'fast' for new headless mode without background
+    # work, a smaller viewport and no animations
+    LAUNCH_PROFILE = os.getenv('LAUNCH_PROFILE', 'default')
+    FAST_VIEWPORT = {'width': 1280, 'height': 720}
+    FAST_CHROMIUM_ARGUMENTS = [
+        '--disable-extensions',
+        '--disable-component-extensions-with-background-pages',
+        '--disable-background-networking',
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-renderer-backgrounding',
+        '--disable-sync',
+        '--disable-default-apps',
+        '--disable-component-update',
+        '--disable-features=Translate,MediaRouter,OptimizationHints',
+        '--no-first-run',
+        '--no-default-browser-check',
+        '--mute-audio'
+    ]
+    FAST_FIREFOX_PREFERENCES = {
+        'ui.prefersReducedMotion': 1,
+        'toolkit.cosmeticAnimations.enabled': False,
+        'general.smoothScroll': False,
+        'browser.shell.checkDefaultBrowser': False,
+        'browser.startup.homepage_override.mstone': 'ignore',
+        'datareporting.policy.dataSubmissionEnabled': False,
+        'app.update.auto': False,
+        'extensions.update.enabled': False
+    }
 
     # Timeouts
     IMPLICIT_WAIT = int(os.getenv('IMPLICIT_WAIT', '10'))
     EXPLICIT_WAIT = int(os.getenv('EXPLICIT_WAIT', '10'))
     PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
 
+    # Trend retention: runs kept individually and days of daily rollups
+    TREND_RAW_RUNS = int(os.getenv('TREND_RAW_RUNS', '100'))
+    TREND_ROLLUP_DAYS = int(os.getenv('TREND_ROLLUP_DAYS', '365'))
+    # Days of raw run, test and metric results kept in the results store
+    RESULTS_RETENTION_DAYS = int(os.getenv('RESULTS_RETENTION_DAYS', '90'))
+
     # Appium Settings
     APPIUM_HUB = os.getenv('APPIUM_HUB', 'http://localhost:4723/wd/hub')
 
@@ -42,23 +90,47 @@ class Config:
         }
 
     @staticmethod
-    def get_playwright_config() -> Dict[str, Any]:
-        return {
+    def get_playwright_config(profile: str = None) -> Dict[str, Any]:
+        """Browser launch options, see get_playwright_context_options for the page settings"""
+        config = {
             'headless': Config.HEADLESS,
-            'viewport': {'width': 1920, 'height': 1080},
-            'timeout': Config.PAGE_LOAD_TIMEOUT * 1000,  # Convert to milliseconds
-            'trace': 'retain-on-failure'
+            'timeout': Config.PAGE_LOAD_TIMEOUT * 1000  # Convert to milliseconds
         }
+        if (profile or Config.LAUNCH_PROFILE) == 'fast':
+            config.update({'headless': True, 'args': list(Config.FAST_CHROMIUM_ARGUMENTS)})
+        return config
+
+    @staticmethod
+    def get_playwright_context_options(profile: str = None) -> Dict[str, Any]:
+        if (profile or Config.LAUNCH_PROFILE) == 'fast':
+            return {'viewport': dict(Config.FAST_VIEWPORT), 'reduced_motion': 'reduce'}
+        return {'viewport': {'width': 1920, 'height': 1080}}
 
     @staticmethod
-    def get_selenium_options(browser: str) -> Dict[str, Any]:
+    def get_selenium_options(browser: str, profile: str = None) -> Dict[str, Any]:
         options = {
             'headless': Config.HEADLESS,
             'implicit_wait': Config.IMPLICIT_WAIT,
-            'page_load_timeout': Config.PAGE_LOAD_TIMEOUT
+            'page_load_timeout': Config.PAGE_LOAD_TIMEOUT,
+            'arguments': [],
+            'preferences': {}
         }
+        fast = (profile or Config.LAUNCH_PROFILE) == 'fast'
         if browser.lower() == 'chrome':
-            options.update({
-                'arguments': ['--start-maximized', '--disable-extensions']
-            })
-        return options 
\ No newline at end of file
+            if fast:
+                viewport = Config.FAST_VIEWPORT
+                options['arguments'] = ['--headless=new', f"--window-size={viewport['width']},{viewport['height']}",
+                                        *Config.FAST_CHROMIUM_ARGUMENTS]
+            else:
+                options['arguments'] = ['--start-maximized', '--disable-extensions']
+                if Config.HEADLESS:
+                    options['arguments'].insert(0, '--headless')
+        elif browser.lower() == 'firefox':
+            if fast:
+                viewport = Config.FAST_VIEWPORT
+                options['arguments'] = ['-headless', f"--width={viewport['width']}", f"--height={viewport['height']}"]
+                options['preferences'] = dict(Config.FAST_FIREFOX_PREFERENCES)
+            elif Config.HEADLESS:
+                options['arguments'] = ['--headless']
+        options['headless'] = options['headless'] or fast
+        return options
@@ -1,6 +1,7 @@
 from typing import Dict, List
 import os
 import json
+import shlex
 
 
 class ParallelConfig:
@@ -28,7 +29,7 @@ class ParallelConfig:
         :return: List of pytest command arguments
         """
         execution_list = []
-        base_args = ['-v', '--alluredir=framework/reports/allure-results']
+        base_args = ['-v']
         
         if markers:
             for marker in markers:
@@ -43,17 +44,28 @@ class ParallelConfig:
             if platform == 'web':
                 for browser, browser_args in config['web'].items():
                     args = base_args.copy()
+                    args.append(ParallelConfig.get_alluredir(f'web-{browser}'))
                     args.extend(['--platform', 'web'])
                     args.extend(browser_args)
                     execution_list.append(args)
             elif platform == 'mobile':
                 for device, device_args in config['mobile'].items():
                     args = base_args.copy()
+                    args.append(ParallelConfig.get_alluredir(device))
                     args.extend(device_args)
                     execution_list.append(args)
         
         return execution_list
 
+    @staticmethod
+    def get_reports_dir(combination: str) -> str:
+        """Reports directory of one combination, so concurrent combinations never share output files"""
+        return os.path.join('framework', 'reports', 'matrix', combination)
+
+    @staticmethod
+    def get_alluredir(combination: str) -> str:
+        return f"--alluredir={os.path.join(ParallelConfig.get_reports_dir(combination), 'allure-results')}"
+
     @staticmethod
     def save_execution_plan(execution_list: List[List[str]], output_file: str = 'execution_plan.json'):
         """Save execution plan to file"""
@@ -65,6 +77,13 @@ class ParallelConfig:
         with open(output_file, 'w') as f:
             json.dump(plan, f, indent=2)
 
+    @staticmethod
+    def load_execution_plan(plan_file: str = 'execution_plan.json') -> List[List[str]]:
+        """Load an execution plan saved by save_execution_plan"""
+        with open(plan_file) as f:
+            plan = json.load(f)
+        return [shlex.split(command) for command in plan['execution_list']]
+
     @staticmethod
     def get_worker_count() -> int:
         """Get optimal number of parallel workers"""
@@ -1,4 +1,4 @@
-from typing import Union, Optional
+from typing import Dict, Union, Optional
 from selenium.webdriver.remote.webdriver import WebDriver as SeleniumDriver
 from selenium.webdriver.remote.webelement import WebElement as SeleniumElement
 from selenium.webdriver.support.wait import WebDriverWait
@@ -6,14 +6,20 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from playwright.sync_api import Page as PlaywrightPage
 from appium.webdriver import WebElement as AppiumElement
+from framework.utils.perf_budget import track_page
 from framework.utils.soft_assert import SoftAssert
 
 
 class BasePage:
+    # Performance budget of the page, e.g. {"lcp_ms": 2500, "transfer_kb": 800}; applies to
+    # every test creating the page, see the perf_budget marker
+    PERF_BUDGET: Dict[str, float] = {}
+
     def __init__(self, driver: Union[SeleniumDriver, PlaywrightPage, None] = None):
         self.driver = driver
         self.soft_assert = SoftAssert()
         self._timeout = 10
+        track_page(self)
 
     def find_element(self, by: str, value: str) -> Union[SeleniumElement, AppiumElement, PlaywrightPage]:
         """
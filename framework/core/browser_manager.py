@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
@@ -7,6 +8,34 @@ from webdriver_manager.firefox import GeckoDriverManager
 from playwright.sync_api import sync_playwright
 from appium import webdriver as appium_webdriver
 from framework.config.config import Config
+from framework.utils.process_registry import ProcessRegistry
+
+# Injected before any page script with the fast launch profile: animations and transitions
+# finish immediately and scrolling jumps, so tests do not wait on them
+DISABLE_ANIMATIONS_SCRIPT = """
+(() => {
+    const css = '*, *::before, *::after { transition: none !important; transition-duration: 0s !important; '
+        + 'animation: none !important; animation-duration: 0s !important; caret-color: transparent !important; } '
+        + 'html, body, * { scroll-behavior: auto !important; }';
+    const inject = () => {
+        const style = document.createElement('style');
+        style.setAttribute('data-disable-animations', '');
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) { inject(); } else { document.addEventListener('DOMContentLoaded', inject); }
+    const instant = (original) => function (options, ...rest) {
+        if (options && typeof options === 'object') { options = Object.assign({}, options, {behavior: 'auto'}); }
+        return original.call(this, options, ...rest);
+    };
+    for (const target of [window, Element.prototype]) {
+        for (const name of ['scroll', 'scrollTo', 'scrollBy']) {
+            if (target[name]) { target[name] = instant(target[name]); }
+        }
+    }
+    Element.prototype.scrollIntoView = instant(Element.prototype.scrollIntoView);
+})();
+"""
 
 
 class BrowserManager:
@@ -14,53 +43,161 @@ class BrowserManager:
         self.config = Config
         self._driver = None
         self._playwright = None
+        self._shared_context = None
+        self.process_registry = ProcessRegistry()
+        self.leaked_processes = 0
 
-    def get_driver(self, platform: str, browser: str = None, capabilities: Dict = None) -> Any:
+    def get_driver(self, platform: str, browser: str = None, capabilities: Dict = None,
+                   context_options: Dict = None, user_data_dir: str = None) -> Any:
         """
         Get driver instance based on platform and browser
         :param platform: 'web', 'android', 'ios'
         :param browser: Browser name for web platform
         :param capabilities: Additional capabilities
+        :param context_options: Additional Playwright browser context options
+        :param user_data_dir: Chrome profile directory, e.g. a clone of a warmed ProfileTemplate
         :return: Driver instance
         """
         if platform == 'web':
-            return self._get_web_driver(browser)
+            return self._launch(lambda: self._get_web_driver(browser, context_options, user_data_dir))
         elif platform == 'android':
-            return self._get_android_driver(capabilities)
+            return self._launch(lambda: self._get_android_driver(capabilities))
         elif platform == 'ios':
-            return self._get_ios_driver(capabilities)
-        else:
-            raise ValueError(f"Unsupported platform: {platform}")
+            return self._launch(lambda: self._get_ios_driver(capabilities))
+        raise ValueError(f"Unsupported platform: {platform}")
+
+    def get_playwright_context(self, context_options: Dict = None) -> Any:
+        """
+        Launch a Playwright Chromium with a single browser context. Quit it with quit_driver.
+        :param context_options: Additional Playwright browser context options
+        :return: Browser context
+        """
+        return self._launch(lambda: self._new_playwright_context(context_options))
+
+    def shared_playwright_context(self, context_options: Dict = None) -> Any:
+        """
+        Browser context shared by the Playwright tests of this manager, launched on first use
+        and quit by close_shared_playwright_context or close
+        :param context_options: Additional Playwright browser context options, used at launch only
+        :return: Browser context
+        """
+        if self._shared_context is None:
+            self._shared_context = self.get_playwright_context(context_options)
+        return self._shared_context
+
+    def close_shared_playwright_context(self) -> int:
+        """
+        Quit the shared browser context, the next test launches a fresh one
+        :return: Number of leaked processes
+        """
+        context, self._shared_context = self._shared_context, None
+        return self.quit_driver(context) if context is not None else 0
 
-    def _get_web_driver(self, browser: str):
+    def playwright(self) -> Any:
+        """
+        The Playwright instance of this manager. The sync API allows one running instance per
+        thread, so every Playwright browser of the session is launched from it.
+        """
+        if self._playwright is None:
+            before = self.process_registry.snapshot()
+            self._playwright = sync_playwright().start()
+            self.process_registry.track('playwright', before)
+        return self._playwright
+
+    def recycle_if_bloated(self, rss_mb: float) -> int:
+        """
+        Quit the shared browser context when its browser's process tree has grown beyond
+        rss_mb, so the next test launches a fresh one. Called between tests.
+        :return: Number of drivers recycled
+        """
+        if self._shared_context is None or self.process_registry.rss_mb(str(id(self._shared_context))) <= rss_mb:
+            return 0
+        self.close_shared_playwright_context()
+        return 1
+
+    def _launch(self, launch) -> Any:
+        # Every process started by the launch belongs to this driver
+        before = self.process_registry.snapshot()
+        try:
+            driver = launch()
+        except Exception:
+            # A failed launch can leave a driver server or browser behind
+            self.process_registry.track('failed-launch', before)
+            self.leaked_processes += self.process_registry.reap('failed-launch')
+            raise
+        self.process_registry.track(str(id(driver)), before)
+        return driver
+
+    def _get_web_driver(self, browser: str, context_options: Optional[Dict] = None,
+                        user_data_dir: Optional[str] = None):
         """Get web driver instance"""
         browser = browser.lower() if browser else self.config.BROWSER.lower()
         
         if browser == 'chrome':
             options = webdriver.ChromeOptions()
-            if self.config.HEADLESS:
-                options.add_argument('--headless')
-            options.add_argument('--start-maximized')
-            return webdriver.Chrome(
+            for argument in self.config.get_selenium_options('chrome')['arguments']:
+                options.add_argument(argument)
+            if user_data_dir:
+                options.add_argument(f'--user-data-dir={user_data_dir}')
+            driver = webdriver.Chrome(
                 service=ChromeService(ChromeDriverManager().install()),
                 options=options
             )
         elif browser == 'firefox':
             options = webdriver.FirefoxOptions()
-            if self.config.HEADLESS:
-                options.add_argument('--headless')
-            return webdriver.Firefox(
+            firefox_options = self.config.get_selenium_options('firefox')
+            for argument in firefox_options['arguments']:
+                options.add_argument(argument)
+            for name, value in firefox_options['preferences'].items():
+                options.set_preference(name, value)
+            driver = webdriver.Firefox(
                 service=FirefoxService(GeckoDriverManager().install()),
                 options=options
             )
         elif browser == 'playwright':
-            self._playwright = sync_playwright().start()
-            browser_type = self._playwright.chromium
-            browser = browser_type.launch(**self.config.get_playwright_config())
-            context = browser.new_context()
-            return context.new_page()
+            return self._new_playwright_context(context_options).new_page()
         else:
             raise ValueError(f"Unsupported browser: {browser}")
+        self.apply_launch_profile(driver)
+        return driver
+
+    def _new_playwright_context(self, context_options: Optional[Dict] = None):
+        browser = self.playwright().chromium.launch(**self.config.get_playwright_config())
+        context = browser.new_context(**{**self.config.get_playwright_context_options(), **(context_options or {})})
+        self.apply_launch_profile(context)
+        return context
+
+    def build_profile_template(self, user_data_dir: str, url: str = None, visits: int = 2):
+        """
+        Warm a Chrome profile: first-run setup, HTTP cache and, from the second visit on,
+        V8's code cache of the page scripts. Quitting flushes the caches to disk.
+        :param user_data_dir: Profile directory to create
+        :param url: Page to visit, defaults to Config.BASE_URL
+        :param visits: Page loads, code is only cached once a script ran before
+        """
+        driver = self.get_driver('web', 'chrome', user_data_dir=user_data_dir)
+        try:
+            for _ in range(visits):
+                driver.get(url or self.config.BASE_URL)
+        finally:
+            self.quit_driver(driver)
+
+    @staticmethod
+    def apply_launch_profile(target: Any, profile: str = None):
+        """
+        Disable animations, transitions and smooth scrolling on every page opened from now on
+        when the fast launch profile is selected
+        :param target: Selenium driver or Playwright browser context
+        :param profile: Launch profile, defaults to Config.LAUNCH_PROFILE
+        """
+        if (profile or Config.LAUNCH_PROFILE) != 'fast':
+            return
+        if hasattr(target, 'add_init_script'):  # Playwright context
+            target.add_init_script(DISABLE_ANIMATIONS_SCRIPT)
+        elif hasattr(target, 'execute_cdp_cmd'):  # Chromium
+            target.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': DISABLE_ANIMATIONS_SCRIPT})
+        # Firefox has no script injection over WebDriver classic, its preferences already
+        # turn on reduced motion and turn off smooth scrolling
 
     def _get_android_driver(self, capabilities: Optional[Dict] = None):
         """Get Android driver instance"""
@@ -84,11 +221,90 @@ class BrowserManager:
             desired_capabilities=caps
         )
 
-    def quit_driver(self, driver: Any):
-        """Quit driver instance"""
-        if hasattr(driver, 'quit'):
-            driver.quit()
-        
+    @staticmethod
+    def is_driver_healthy(driver: Any) -> bool:
+        """
+        Check that the driver session still responds
+        :param driver: Driver instance
+        :return: True if the session can be reused
+        """
+        try:
+            if hasattr(driver, 'goto'):  # Playwright
+                return not driver.is_closed() and driver.evaluate("() => 1") == 1
+            if hasattr(driver, 'start_recording_screen'):  # Appium
+                driver.get_window_size()
+                return True
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def reset_driver(driver: Any):
+        """
+        Reset page or app state so a test body can run again on the same session
+        :param driver: Driver instance
+        """
+        clear_storage = "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+        if hasattr(driver, 'goto'):  # Playwright
+            driver.evaluate(f"() => {{ {clear_storage} }}")
+            driver.context.clear_cookies()
+            driver.goto('about:blank')
+        elif hasattr(driver, 'start_recording_screen'):  # Appium
+            caps = driver.capabilities
+            app_id = (caps.get('appPackage') or caps.get('appium:appPackage')
+                      or caps.get('bundleId') or caps.get('appium:bundleId'))
+            if app_id:
+                driver.terminate_app(app_id)
+                driver.activate_app(app_id)
+        else:
+            driver.execute_script(clear_storage)
+            driver.delete_all_cookies()
+            driver.get('about:blank')
+
+    @staticmethod
+    def clear_origins(page: Any, origins: Iterable[str]):
+        """
+        Clear cookies, storage, IndexedDB, cache storage and service workers of the origins a
+        Playwright page visited through CDP, so the next test sharing its context starts clean
+        :param page: Chromium Playwright page
+        :param origins: Origins (scheme://host:port) or URLs visited
+        """
+        origins = {f"{url.scheme}://{url.netloc}" for url in map(urlsplit, origins) if url.scheme in ('http', 'https')}
+        if not origins:
+            return
+        cdp = page.context.new_cdp_session(page)
+        try:
+            for origin in origins:
+                cdp.send('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        finally:
+            cdp.detach()
+
+    def quit_driver(self, driver: Any) -> int:
+        """
+        Quit driver instance and reap its processes that are still running
+        :return: Number of leaked processes
+        """
+        try:
+            if hasattr(driver, 'tracing'):  # Playwright context
+                driver.browser.close()
+            elif hasattr(driver, 'goto'):  # Playwright page
+                driver.context.browser.close()
+            elif hasattr(driver, 'quit'):
+                driver.quit()
+        finally:
+            leaked = self.process_registry.reap(str(id(driver)))
+            self.leaked_processes += leaked
+        return leaked
+
+    def close(self) -> Dict[str, int]:
+        """
+        Reap every process still tracked at the end of the session
+        :return: Leaked process counts at driver teardown and at session end
+        """
+        self.close_shared_playwright_context()
         if self._playwright:
             self._playwright.stop()
-            self._playwright = None 
\ No newline at end of file
+            self._playwright = None
+            self.leaked_processes += self.process_registry.reap('playwright')
+        return {'teardown': self.leaked_processes, 'session_end': self.process_registry.reap_all()} 
\ No newline at end of file
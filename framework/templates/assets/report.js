@@ -0,0 +1,28 @@
+// Renders the report charts from their embedded Plotly figure data once they scroll into view
+(function () {
+    function render(element) {
+        var figure = JSON.parse(document.getElementById(element.dataset.figure).textContent);
+        if (!window.Plotly) {
+            element.textContent = "Chart unavailable: plotly.js could not be loaded";
+            return;
+        }
+        Plotly.newPlot(element, figure.data, figure.layout, {responsive: true, displaylogo: false});
+    }
+
+    document.addEventListener("DOMContentLoaded", function () {
+        var charts = document.querySelectorAll(".lazy-chart");
+        if (!("IntersectionObserver" in window)) {
+            charts.forEach(render);
+            return;
+        }
+        var observer = new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    render(entry.target);
+                }
+            });
+        }, {rootMargin: "200px"});
+        charts.forEach(function (chart) { observer.observe(chart); });
+    });
+})();
@@ -0,0 +1,102 @@
+// Virtualised test timeline: only the rows in view are rendered, so suites of any size stay responsive
+(function () {
+    var ROW_HEIGHT = 28;
+    var OVERSCAN = 10;
+
+    function escapeHtml(text) {
+        return text.replace(/[&<>"]/g, function (c) {
+            return {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;"}[c];
+        });
+    }
+
+    function Timeline(viewport, data, controls) {
+        this.viewport = viewport;
+        this.data = data;
+        this.controls = controls;
+        this.rows = [];
+        this.spacer = document.createElement("div");
+        this.body = document.createElement("div");
+        this.spacer.style.position = "relative";
+        this.body.style.position = "absolute";
+        this.body.style.left = this.body.style.right = "0";
+        this.spacer.appendChild(this.body);
+        viewport.appendChild(this.spacer);
+
+        var self = this;
+        var scheduled = false;
+        viewport.addEventListener("scroll", function () {
+            if (scheduled) { return; }
+            scheduled = true;
+            window.requestAnimationFrame(function () { scheduled = false; self.render(); });
+        });
+        ["filter", "outcome", "worker", "sort"].forEach(function (name) {
+            controls[name].addEventListener("input", function () { self.update(); });
+        });
+        data.outcome_names.forEach(function (name, code) {
+            controls.outcome.add(new Option(name, code));
+        });
+        data.worker_names.forEach(function (name, code) {
+            controls.worker.add(new Option(name, code));
+        });
+        this.update();
+    }
+
+    Timeline.prototype.update = function () {
+        var data = this.data;
+        var text = this.controls.filter.value.toLowerCase();
+        var outcome = this.controls.outcome.value;
+        var worker = this.controls.worker.value;
+        var rows = [];
+        for (var i = 0; i < data.nodeids.length; i++) {
+            if (outcome !== "" && data.outcomes[i] !== +outcome) { continue; }
+            if (worker !== "" && data.workers[i] !== +worker) { continue; }
+            if (text && data.nodeids[i].toLowerCase().indexOf(text) === -1) { continue; }
+            rows.push(i);
+        }
+        if (this.controls.sort.value === "duration") {
+            rows.sort(function (a, b) { return data.durations[b] - data.durations[a]; });
+        }
+        this.rows = rows;
+        this.spacer.style.height = rows.length * ROW_HEIGHT + "px";
+        this.controls.count.textContent = rows.length + " of " + data.nodeids.length + " tests";
+        this.viewport.scrollTop = 0;
+        this.render();
+    };
+
+    Timeline.prototype.render = function () {
+        var data = this.data;
+        var span = data.span || 1;
+        var first = Math.max(0, Math.floor(this.viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        var last = Math.min(this.rows.length, first + Math.ceil(this.viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN);
+        var html = [];
+        for (var position = first; position < last; position++) {
+            var i = this.rows[position];
+            var outcome = data.outcome_names[data.outcomes[i]];
+            var nodeid = escapeHtml(data.nodeids[i]);
+            html.push(
+                "<div class=\"timeline-row " + outcome + "\">" +
+                "<span class=\"timeline-test\" title=\"" + nodeid + "\">" + nodeid + "</span>" +
+                "<span class=\"timeline-worker\">" + escapeHtml(data.worker_names[data.workers[i]]) + "</span>" +
+                "<span class=\"timeline-track\"><span class=\"timeline-bar\" style=\"left:" +
+                (100 * data.starts[i] / span).toFixed(2) + "%;width:" +
+                Math.max(0.2, 100 * data.durations[i] / span).toFixed(2) + "%\"></span></span>" +
+                "<span class=\"timeline-duration\">" + data.durations[i].toFixed(2) + "s</span>" +
+                "</div>"
+            );
+        }
+        this.body.style.top = first * ROW_HEIGHT + "px";
+        this.body.innerHTML = html.join("");
+    };
+
+    document.addEventListener("DOMContentLoaded", function () {
+        var source = document.getElementById("timeline-data");
+        if (!source) { return; }
+        new Timeline(document.getElementById("timeline"), JSON.parse(source.textContent), {
+            filter: document.getElementById("timeline-filter"),
+            outcome: document.getElementById("timeline-outcome"),
+            worker: document.getElementById("timeline-worker"),
+            sort: document.getElementById("timeline-sort"),
+            count: document.getElementById("timeline-count")
+        });
+    });
+})();
@@ -3,7 +3,7 @@ from typing import Generator, Dict, Any, Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
-from playwright.sync_api import sync_playwright, Browser, Page
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
 from appium import webdriver as appium_webdriver
 from framework.config.config import Config
 import allure
@@ -11,62 +11,126 @@ import json
 import os
 import datetime
 import time
+import re
 import socket
+import warnings
 from _pytest.config import Config
 from _pytest.nodes import Item
 from _pytest.runner import CallInfo
 from framework.core.browser_manager import BrowserManager
 from framework.config.config import Config as TestConfig
 from framework.config.parallel_config import ParallelConfig
+from framework.utils.attachment_store import AttachmentStorePlugin
+from framework.utils.distributed import DistributedNodePlugin
+from framework.utils.impact import ImpactAnalyzer, ImpactPlugin
+from framework.utils.memory_watchdog import MemoryWatchdog, MemoryWatchdogPlugin
+from framework.utils.ordering import HistoryPrioritizer, STRATEGIES as ORDERING_STRATEGIES
+from framework.utils.perf_budget import PerfBudgetPlugin
+from framework.utils.playwright_trace import TRACE_MODES, PlaywrightTraceRecorder
+from framework.utils.performance_metrics import PerformanceCollector
+from framework.utils.process_registry import ProcessRegistry
+from framework.utils.profile_template import ProfileTemplate
+from framework.utils.regressions import (
+    PAGE_METRIC_PREFIX, RegressionDetector, format_regressions, regressions_above, write_regressions
+)
 from framework.utils.reporting import TestReporting
+from framework.utils.resources import WorkerPlanner, process_tree_rss_mb, psutil
+from framework.utils.results_store import ResultsStore
+from framework.utils.timing import TimingCollector, summarize_phases
+from framework.utils.tracing import CommandTracingPlugin
+from framework.utils.video_recorder import VideoRecorder
 
 
 @pytest.fixture(scope="function")
-def selenium_driver() -> Generator:
+def selenium_driver(request, profile_template) -> Generator:
     """
     Fixture for Selenium WebDriver
     """
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()))
-    driver.implicitly_wait(Config.IMPLICIT_WAIT)
-    driver.maximize_window()
+    options = webdriver.ChromeOptions()
+    for argument in TestConfig.get_selenium_options("chrome")["arguments"]:
+        options.add_argument(argument)
+    user_data_dir = profile_template.clone(request.node.name) if profile_template else None
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+    driver.implicitly_wait(TestConfig.IMPLICIT_WAIT)
+    if TestConfig.LAUNCH_PROFILE != "fast":
+        driver.maximize_window()
+    BrowserManager.apply_launch_profile(driver)
+    recorder = _start_video(request, driver)
     yield driver
     allure.attach(
         driver.get_screenshot_as_png(),
         name="screenshot",
         attachment_type=allure.attachment_type.PNG
     )
+    _stop_video(request, recorder)
     driver.quit()
+    if profile_template:
+        profile_template.discard(user_data_dir)
 
 
 @pytest.fixture(scope="function")
-def playwright_page() -> Generator[Page, None, None]:
+def playwright_context(request, browser_manager) -> Generator[BrowserContext, None, None]:
     """
-    Fixture for Playwright Page
+    Browser context of a Playwright test, launched from the browser manager's Playwright
+    instance. Every test gets a browser and context of its own unless
+    --shared-playwright-context is given; then the tests of a worker share one context,
+    traced once with a chunk per test.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(**Config.get_playwright_config())
-        context = browser.new_context()
-        page = context.new_page()
-        yield page
-        if page:
-            allure.attach(
-                page.screenshot(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG
-            )
-        context.close()
-        browser.close()
+    context_options = _playwright_video_options() if request.config.getoption("--video") else {}
+    trace_mode = request.config.getoption("--playwright-trace")
+    if request.config.getoption("--shared-playwright-context"):
+        context = browser_manager.shared_playwright_context(context_options)
+        trace = _shared_playwright_trace(request, context) if trace_mode != "off" else None
+    else:
+        context = browser_manager.get_playwright_context(context_options)
+        trace = PlaywrightTraceRecorder(context, trace_mode, _playwright_trace_dir()) if trace_mode != "off" else None
+    _start_trace_chunk(request, trace)
+    yield context
+    _stop_trace_chunk(request, trace)
+    if not request.config.getoption("--shared-playwright-context"):
+        browser_manager.quit_driver(context)
+
+
+@pytest.fixture(scope="function")
+def playwright_page(request, playwright_context) -> Generator[Page, None, None]:
+    """
+    Fixture for Playwright Page. In a shared context the cookies, storage, IndexedDB, cache
+    storage and service workers of every origin the page visited are cleared afterwards and
+    permissions reset; state kept outside those, such as the HTTP cache, carries over to the
+    next test.
+    """
+    page = playwright_context.new_page()
+    visited = set()
+    page.on("framenavigated", lambda frame: visited.add(frame.url))
+    recorder = _start_video(request, page)
+    yield page
+    if page:
+        allure.attach(
+            page.screenshot(),
+            name="screenshot",
+            attachment_type=allure.attachment_type.PNG
+        )
+    if request.config.getoption("--shared-playwright-context"):
+        BrowserManager.clear_origins(page, visited)
+        BrowserManager.reset_driver(page)
+        playwright_context.clear_permissions()
+    _stop_video(request, recorder)
+    if not page.is_closed():
+        page.close()
 
 
 @pytest.fixture(scope="function")
-def android_driver() -> Generator:
+def android_driver(request) -> Generator:
     """
     Fixture for Android Appium WebDriver
     """
     driver = appium_webdriver.Remote(
-        command_executor=Config.APPIUM_HUB,
-        desired_capabilities=Config.get_android_capabilities()
+        command_executor=TestConfig.APPIUM_HUB,
+        desired_capabilities=TestConfig.get_android_capabilities()
     )
+    recorder = _start_video(request, driver)
     yield driver
     if driver:
         allure.attach(
@@ -74,18 +138,20 @@ def android_driver() -> Generator:
             name="screenshot",
             attachment_type=allure.attachment_type.PNG
         )
+        _stop_video(request, recorder)
         driver.quit()
 
 
 @pytest.fixture(scope="function")
-def ios_driver() -> Generator:
+def ios_driver(request) -> Generator:
     """
     Fixture for iOS Appium WebDriver
     """
     driver = appium_webdriver.Remote(
-        command_executor=Config.APPIUM_HUB,
-        desired_capabilities=Config.get_ios_capabilities()
+        command_executor=TestConfig.APPIUM_HUB,
+        desired_capabilities=TestConfig.get_ios_capabilities()
     )
+    recorder = _start_video(request, driver)
     yield driver
     if driver:
         allure.attach(
@@ -93,9 +159,108 @@ def ios_driver() -> Generator:
             name="screenshot",
             attachment_type=allure.attachment_type.PNG
         )
+        _stop_video(request, recorder)
         driver.quit()
 
 
+def _start_video(request, driver: Any) -> Optional[VideoRecorder]:
+    """Start recording the driver session when --video is enabled"""
+    if not request.config.getoption("--video"):
+        return None
+    try:
+        recorder = VideoRecorder.create(
+            driver,
+            output_dir=os.path.join(TestConfig.REPORTS_DIR, "videos"),
+            buffer_seconds=request.config.getoption("--video-buffer"),
+            fps=request.config.getoption("--video-fps")
+        )
+        recorder.start()
+        return recorder
+    except Exception as e:
+        allure.attach(str(e), "Video Recording Error", allure.attachment_type.TEXT)
+        return None
+
+
+def _playwright_video_options() -> Dict[str, Any]:
+    """Playwright context options recording videos to the run's reports directory"""
+    return VideoRecorder.playwright_context_options(os.path.join(TestConfig.REPORTS_DIR, "videos", "raw"))
+
+
+def _stop_video(request, recorder: Optional[VideoRecorder]):
+    """Stop recording and attach the video only if the test failed"""
+    if recorder is None:
+        return
+    try:
+        video_path = recorder.stop(request.node.nodeid, keep=_test_failed(request))
+    except Exception as e:
+        allure.attach(str(e), "Video Recording Error", allure.attachment_type.TEXT)
+        return
+    if video_path:
+        extension = os.path.splitext(video_path)[1].lstrip(".")
+        allure.attach.file(video_path, name="Test Video", extension=extension)
+
+
+def _test_failed(request) -> bool:
+    return any(getattr(getattr(request.node, f"rep_{when}", None), "failed", False) for when in ("setup", "call"))
+
+
+def _start_trace_chunk(request, trace: Optional[PlaywrightTraceRecorder]):
+    """Start the Playwright trace chunk of the test"""
+    if trace is None:
+        return
+    try:
+        trace.start_test(request.node.nodeid)
+    except Exception as e:
+        allure.attach(str(e), "Playwright Trace Error", allure.attachment_type.TEXT)
+
+
+def _stop_trace_chunk(request, trace: Optional[PlaywrightTraceRecorder]):
+    """Stop the Playwright trace chunk and attach it only if the test failed, unless tracing is on"""
+    if trace is None:
+        return
+    try:
+        trace_path = trace.stop_test(request.node.nodeid, _test_failed(request),
+                                     attempt=getattr(request.node, "execution_count", 0))
+    except Exception as e:
+        allure.attach(str(e), "Playwright Trace Error", allure.attachment_type.TEXT)
+        return
+    if trace_path:
+        allure.attach.file(trace_path, name="Playwright Trace", extension="zip")
+
+
+def _playwright_trace_dir() -> str:
+    return os.path.join(TestConfig.REPORTS_DIR, "traces", "playwright")
+
+
+def _shared_playwright_trace(request, context) -> PlaywrightTraceRecorder:
+    """Trace of the worker's shared context, restarted when the context was relaunched"""
+    trace = getattr(request.config, "playwright_trace", None)
+    if trace is None or trace.context is not context:
+        stats = trace.stats if trace else None
+        trace = PlaywrightTraceRecorder(context, request.config.getoption("--playwright-trace"),
+                                        _playwright_trace_dir())
+        # Chunk counts add up over the contexts of the worker
+        trace.stats = stats or trace.stats
+        request.config.playwright_trace = trace
+    return trace
+
+
+def _stop_playwright_trace(request):
+    """Stop the worker's shared context tracing and record how many chunks were kept"""
+    trace = getattr(request.config, "playwright_trace", None)
+    if trace is None:
+        return
+    request.config.playwright_trace = None
+    try:
+        stats = trace.stop()
+    except Exception:
+        # The context was already closed, the remaining trace data is gone either way
+        stats = trace.stats
+    request.config.results_store.update_run_info(
+        request.config.run_id, {"playwright_trace": {os.environ.get("PYTEST_XDIST_WORKER", "main"): stats}}
+    )
+
+
 def pytest_addoption(parser):
     """Add custom command line options"""
     parser.addoption(
@@ -110,6 +275,35 @@ def pytest_addoption(parser):
         default="chrome",
         help="Browser to use for web tests"
     )
+    parser.addoption(
+        "--playwright-trace",
+        action="store",
+        default=TestConfig.PLAYWRIGHT_TRACE,
+        choices=TRACE_MODES,
+        help="Playwright tracing with a chunk per test: retain-on-failure only writes the chunks of "
+             "failed tests (default: PLAYWRIGHT_TRACE, off)"
+    )
+    parser.addoption(
+        "--shared-playwright-context",
+        action="store_true",
+        help="Open the pages of playwright_page tests in one browser context per worker instead of a "
+             "browser and context per test; visited origins are cleared between tests"
+    )
+    parser.addoption(
+        "--profile-template",
+        action="store_true",
+        default=TestConfig.PROFILE_TEMPLATE,
+        help="Warm a Chrome profile at BASE_URL once per run and start every Chrome from a "
+             "copy-on-write or hardlinked copy of it (default: PROFILE_TEMPLATE)"
+    )
+    parser.addoption(
+        "--launch-profile",
+        action="store",
+        default=None,
+        choices=["default", "fast"],
+        help="Browser launch profile: fast uses new headless mode without extensions, background work, "
+             "sync or first-run pages, a 1280x720 viewport and disables animations (default: LAUNCH_PROFILE)"
+    )
     parser.addoption(
         "--env",
         action="store",
@@ -125,18 +319,143 @@ def pytest_addoption(parser):
         "--workers",
         action="store",
         default=None,
-        help="Number of parallel workers"
+        help="Number of parallel workers, 'auto' (default) plans them from available resources"
+    )
+    parser.addoption(
+        "--schedule",
+        action="store",
+        default="lpt",
+        choices=["lpt", "load"],
+        help="xdist scheduling with --dist load: longest-processing-time-first from past durations (lpt) "
+             "or xdist's load; other --dist modes always use their own scheduler"
+    )
+    parser.addoption(
+        "--default-duration",
+        action="store",
+        type=float,
+        default=None,
+        help="Estimated duration in seconds for tests without history (default: median of known tests)"
+    )
+    parser.addoption(
+        "--order",
+        action="store",
+        default="none",
+        choices=["none", *ORDERING_STRATEGIES],
+        help="Order tests from stored history: failure probability per second, failure probability "
+             "or duration. Applies to collection order and to the xdist dispatch order"
     )
     parser.addoption(
         "--video",
         action="store_true",
-        help="Record video of test execution"
+        help="Record video of test execution, kept only for failed tests"
+    )
+    parser.addoption(
+        "--video-buffer",
+        action="store",
+        type=int,
+        default=30,
+        help="Seconds of screencast frames kept in memory for Selenium video recording"
+    )
+    parser.addoption(
+        "--video-fps",
+        action="store",
+        type=int,
+        default=2,
+        help="Frames per second captured for Selenium video recording"
     )
     parser.addoption(
         "--performance",
         action="store_true",
         help="Collect performance metrics"
     )
+    parser.addoption(
+        "--perf-budget-mode",
+        action="store",
+        default="warn",
+        choices=["warn", "fail"],
+        help="Tests over their perf_budget (needs --performance) emit a warning or fail; "
+             "a perf_budget(mode=...) marker overrides this per test"
+    )
+    parser.addoption(
+        "--trace-commands",
+        action="store",
+        nargs="?",
+        const="worker",
+        default=None,
+        choices=["worker", "test"],
+        help="Write a Chrome Trace Event trace.json of page methods, driver commands and fixtures, "
+             "one file per worker (default) or per test"
+    )
+    parser.addoption(
+        "--record-impact",
+        action="store_true",
+        help="Record the page classes, locators and framework modules each test exercises"
+    )
+    parser.addoption(
+        "--impacted-since",
+        action="store",
+        default=None,
+        metavar="GIT_REF",
+        help="Only run tests whose recorded dependencies changed since the git ref"
+    )
+    parser.addoption(
+        "--full",
+        action="store_true",
+        help="Run all tests, ignoring --impacted-since"
+    )
+    parser.addoption(
+        "--memory-watchdog",
+        action="store_true",
+        help="Sample worker and browser RSS, recycle bloated browser processes and throttle on low memory"
+    )
+    parser.addoption(
+        "--recycle-rss-mb",
+        action="store",
+        type=float,
+        default=2048,
+        help="Browser process tree RSS (MB) above which a browser kept across tests, such as the shared "
+             "Playwright context, is relaunched before the next test"
+    )
+    parser.addoption(
+        "--throttle-available-mb",
+        action="store",
+        type=float,
+        default=1024,
+        help="Available system memory (MB) below which new tests wait to start"
+    )
+    parser.addoption(
+        "--report-mode",
+        action="store",
+        default="sync",
+        choices=["sync", "background", "off"],
+        help="Generate reports at session end (sync), in a detached process (background) or not at all (off); "
+             "'python -m framework.utils.reporting report' builds them later from the stored results"
+    )
+    parser.addoption(
+        "--attachment-store",
+        action="store",
+        default="dedup",
+        choices=["dedup", "compress", "off"],
+        help="Write allure attachments once per distinct content (dedup), additionally recompress PNGs "
+             "losslessly after the session (compress) or once per attachment (off); "
+             "'python -m framework.utils.attachment_store gc' removes unreferenced ones"
+    )
+    parser.addoption(
+        "--fail-on-regression",
+        action="store",
+        type=float,
+        default=None,
+        metavar="PERCENT",
+        help="Fail the session when a test or page method is significantly slower than in its previous "
+             "runs by at least PERCENT; regressions are written to reports/results/regressions.json"
+    )
+    parser.addoption(
+        "--regression-runs",
+        action="store",
+        type=int,
+        default=20,
+        help="Previous runs with the same platform, browser and environment forming the duration baseline"
+    )
     parser.addoption(
         "--distributed",
         action="store_true",
@@ -151,7 +470,7 @@ def pytest_addoption(parser):
     parser.addoption(
         "--master",
         action="store",
-        help="Master node address for distributed execution"
+        help="Coordinator address (host:port) for distributed execution"
     )
     parser.addoption(
         "--retries",
@@ -160,6 +479,14 @@ def pytest_addoption(parser):
         default=0,
         help="Number of times to retry failed tests"
     )
+    parser.addoption(
+        "--retry-mode",
+        action="store",
+        default="inplace",
+        choices=["rebuild", "inplace"],
+        help="Let tests marked inplace_retry re-run only the test body on the live driver, rebuilding only "
+             "if the driver is unhealthy (inplace), or retry every test with fresh fixtures (rebuild)"
+    )
     parser.addoption(
         "--flaky-tests-only",
         action="store_true",
@@ -168,9 +495,40 @@ def pytest_addoption(parser):
 
 
 @pytest.fixture(scope="session")
-def browser_manager():
+def browser_manager(request):
     """Fixture for browser manager instance"""
-    return BrowserManager()
+    manager = BrowserManager()
+    watchdog_plugin = request.config.pluginmanager.get_plugin("memory_watchdog")
+    if watchdog_plugin:
+        watchdog_plugin.watchdog.add_recycler(manager.recycle_if_bloated)
+    yield manager
+    _stop_playwright_trace(request)
+    request.config.process_leaks = manager.close()
+
+
+@pytest.fixture(scope="session")
+def profile_template(request, browser_manager) -> Generator[Optional[ProfileTemplate], None, None]:
+    """Chrome profile template warmed at BASE_URL once per run when --profile-template is given"""
+    if not request.config.getoption("--profile-template"):
+        yield None
+        return
+    template = ProfileTemplate(TestConfig.PROFILE_TEMPLATE_DIR, _profile_template_key(request.config))
+    try:
+        template.ensure(browser_manager.build_profile_template)
+    except Exception as e:
+        # Tests still run, with cold profiles; pytest shows the warning in its summary
+        warnings.warn(f"Browser profile template unavailable, tests use cold profiles: {e}")
+        yield None
+        return
+    yield template
+    request.config.results_store.update_run_info(
+        request.config.run_id, {"profile_template": {os.environ.get("PYTEST_XDIST_WORKER", "main"): template.stats}}
+    )
+
+
+def _profile_template_key(config) -> str:
+    """The run shares one template, a distributed node has no run of its own"""
+    return config.run_id or f"node-{os.getpid()}"
 
 
 @pytest.fixture(scope="function")
@@ -179,45 +537,42 @@ def driver(request, browser_manager):
     platform = request.config.getoption("--platform")
     browser = request.config.getoption("--browser")
     
-    driver = browser_manager.get_driver(platform, browser)
+    browser_name = (browser or TestConfig.BROWSER).lower()
+    
+    context_options = None
+    if request.config.getoption("--video") and platform == "web" and browser_name == "playwright":
+        context_options = _playwright_video_options()
+
+    # Only Chrome sessions use the template, building it launches a Chrome of its own
+    profile_template = None
+    user_data_dir = None
+    if platform == "web" and browser_name == "chrome":
+        profile_template = request.getfixturevalue("profile_template")
+    if profile_template:
+        user_data_dir = profile_template.clone(request.node.name)
+    driver = browser_manager.get_driver(platform, browser, context_options=context_options,
+                                        user_data_dir=user_data_dir)
+    # The browser manager launches a context per test, so its trace holds a single chunk
+    trace = None
+    if hasattr(driver, "goto") and request.config.getoption("--playwright-trace") != "off":
+        trace = PlaywrightTraceRecorder(driver.context, request.config.getoption("--playwright-trace"),
+                                        _playwright_trace_dir())
+        _start_trace_chunk(request, trace)
+    recorder = _start_video(request, driver)
     yield driver
-    browser_manager.quit_driver(driver)
-
-
-@pytest.fixture(scope="session", autouse=True)
-def performance_data():
-    """Fixture to collect performance data"""
-    data = {
-        "tests": {},
-        "summary": {
-            "total_duration": 0,
-            "average_duration": 0,
-            "slowest_tests": [],
-            "fastest_tests": []
-        }
-    }
-    yield data
-    
-    # Calculate summary statistics
-    if data["tests"]:
-        durations = [t["duration"] for t in data["tests"].values()]
-        data["summary"]["total_duration"] = sum(durations)
-        data["summary"]["average_duration"] = sum(durations) / len(durations)
-        
-        # Sort tests by duration
-        sorted_tests = sorted(data["tests"].items(), key=lambda x: x[1]["duration"])
-        data["summary"]["fastest_tests"] = sorted_tests[:5]
-        data["summary"]["slowest_tests"] = sorted_tests[-5:]
-        
-        # Save performance report
-        with open("framework/reports/results/performance_report.json", "w") as f:
-            json.dump(data, f, indent=2)
+    try:
+        _stop_trace_chunk(request, trace)
+        _stop_video(request, recorder)
+    finally:
+        browser_manager.quit_driver(driver)
+        if user_data_dir:
+            profile_template.discard(user_data_dir)
 
 
 @pytest.fixture(scope="session")
-def test_reporting():
+def test_reporting(request):
     """Fixture for test reporting instance"""
-    return TestReporting()
+    return TestReporting(TestConfig.REPORTS_DIR, store=request.config.results_store)
 
 
 def pytest_configure(config: Config):
@@ -228,19 +583,40 @@ def pytest_configure(config: Config):
     config.addinivalue_line("markers", "android: mark test as android test")
     config.addinivalue_line("markers", "ios: mark test as ios test")
     
-    if config.getoption("--parallel"):
-        workers = config.getoption("--workers") or ParallelConfig.get_worker_count()
-        config.option.numprocesses = int(workers)
-    
+    # A distributed node is one process pulling tests from the coordinator
+    if config.getoption("--distributed") and (config.getoption("--parallel")
+                                              or getattr(config.option, "numprocesses", None)
+                                              or getattr(config.option, "dist", "no") != "no"):
+        raise pytest.UsageError("--distributed cannot be combined with --parallel or xdist (-n/--dist), "
+                                "start more nodes instead")
+
+    if config.getoption("--launch-profile"):
+        TestConfig.LAUNCH_PROFILE = config.getoption("--launch-profile")
+
     # Create results directories
-    for dir_name in ["results", "videos", "screenshots", "logs", "trends"]:
-        os.makedirs(os.path.join("framework", "reports", dir_name), exist_ok=True)
+    for dir_name in ["results", "videos", "screenshots", "logs", "trends", "traces"]:
+        os.makedirs(os.path.join(TestConfig.REPORTS_DIR, dir_name), exist_ok=True)
+    
+    config.results_store = ResultsStore()
+    
+    # Size the worker pool from memory, browser footprint, devices and load unless given
+    worker_plan = None
+    if config.getoption("--parallel") and not hasattr(config, "workerinput"):
+        workers = config.getoption("--workers")
+        if not workers or workers == "auto":
+            worker_plan = WorkerPlanner(config.results_store).plan(
+                config.getoption("--platform"), config.getoption("--browser")
+            )
+            workers = worker_plan["workers"]
+            print(f"Worker plan: {worker_plan['reason']}")
+        config.option.numprocesses = int(workers)
     
     # Enhanced run info
     run_info = {
         "start_time": datetime.datetime.now().isoformat(),
         "platform": config.getoption("--platform"),
         "browser": config.getoption("--browser"),
+        "launch_profile": TestConfig.LAUNCH_PROFILE,
         "environment": config.getoption("--env"),
         "parallel": config.getoption("--parallel"),
         "workers": config.option.numprocesses if config.getoption("--parallel") else 1,
@@ -248,20 +624,100 @@ def pytest_configure(config: Config):
         "performance_monitoring": config.getoption("--performance"),
         "distributed": config.getoption("--distributed"),
         "node_id": config.getoption("--node-id") if config.getoption("--distributed") else None,
-        "master": config.getoption("--master") if config.getoption("--distributed") else None
+        "master": config.getoption("--master") if config.getoption("--distributed") else None,
+        "matrix_id": os.environ.get("MATRIX_ID"),
+        "combination": os.environ.get("MATRIX_COMBINATION"),
+        "worker_plan": worker_plan,
+        "regression_runs": config.getoption("--regression-runs")
     }
     
-    # Save run info with timestamp in filename
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_info_file = f"run_info_{timestamp}.json"
-    with open(os.path.join("framework", "reports", "results", run_info_file), "w") as f:
-        json.dump(run_info, f, indent=2)
+    # Register the run in the shared results store; workers reuse the controller's run and
+    # distributed nodes send their results to the coordinator, which records the run
+    if hasattr(config, "workerinput"):
+        config.run_id = config.workerinput["run_id"]
+    elif config.getoption("--distributed"):
+        config.run_id = None
+    else:
+        # Reap drivers and browsers left behind by sessions that crashed or were killed
+        run_info["process_leaks"] = {"previous_sessions": ProcessRegistry.reap_leftovers()}
+        config.run_id = config.results_store.start_run(run_info)
     
     # Register flaky marker
     config.addinivalue_line(
         "markers",
         "flaky(reruns=int): mark test as flaky and set retry count"
     )
+    config.addinivalue_line(
+        "markers",
+        "inplace_retry(reruns=int): retry the test body on the live driver instead of rebuilding its "
+        "fixtures; only for tests that navigate to their start page themselves and keep no state in "
+        "function-scoped fixtures"
+    )
+    config.addinivalue_line(
+        "markers",
+        "perf_budget(lcp_ms=..., transfer_kb=..., requests=..., mode='warn'|'fail'): limits on the web "
+        "performance metrics of the test, checked with --performance"
+    )
+    
+    # Performance budgets of tests and page classes, checked against the collected metrics
+    if config.getoption("--performance"):
+        config.pluginmanager.register(PerfBudgetPlugin(config.getoption("--perf-budget-mode")), "perf_budget")
+    
+    # Per-phase timing, streamed to one file per xdist worker or distributed node
+    if config.getoption("--performance"):
+        config.timing_collector = TimingCollector(
+            results_dir=os.path.join(TestConfig.REPORTS_DIR, "results"),
+            worker_id=_timing_worker_id(config)
+        )
+        if not hasattr(config, "workerinput"):
+            # Local nodes share the results directory, each one only clears its own file
+            config.timing_collector.reset(worker_only=config.getoption("--distributed"))
+    
+    # Change-based test selection; the controller decides and workers reuse its decision
+    impacted_since = None if config.getoption("--full") else config.getoption("--impacted-since")
+    if impacted_since or config.getoption("--record-impact"):
+        if hasattr(config, "workerinput"):
+            unaffected = set(config.workerinput.get("impact_unaffected", []))
+        elif impacted_since:
+            unaffected = ImpactAnalyzer(config.results_store).unaffected_tests(impacted_since)
+        else:
+            unaffected = set()
+        config.pluginmanager.register(
+            ImpactPlugin(config.results_store, unaffected, record=config.getoption("--record-impact")),
+            "impact_selection"
+        )
+    
+    # Memory watchdog in every process that runs tests, the xdist controller runs none
+    if config.getoption("--memory-watchdog") and not _is_xdist_controller(config):
+        if psutil is None:
+            print("psutil not installed. Memory watchdog disabled.")
+        else:
+            config.pluginmanager.register(
+                MemoryWatchdogPlugin(
+                    config.results_store,
+                    config.run_id,
+                    MemoryWatchdog(config.getoption("--recycle-rss-mb"), config.getoption("--throttle-available-mb")),
+                    worker_id=os.environ.get("PYTEST_XDIST_WORKER", "main")
+                ),
+                "memory_watchdog"
+            )
+    
+    # Content-addressed allure attachments, every process writes into the shared results directory
+    if config.getoption("--attachment-store") != "off":
+        config.pluginmanager.register(
+            AttachmentStorePlugin(
+                compress=config.getoption("--attachment-store") == "compress",
+                worker_id=os.environ.get("PYTEST_XDIST_WORKER", "main")
+            ),
+            "attachment_store"
+        )
+    
+    # Register command tracing only when requested so it costs nothing otherwise
+    if config.getoption("--trace-commands"):
+        config.pluginmanager.register(
+            CommandTracingPlugin(config.getoption("--trace-commands"), os.path.join(TestConfig.REPORTS_DIR, "traces")),
+            "command_tracing"
+        )
     
     # Configure test retries
     if config.getoption("--retries"):
@@ -269,22 +725,94 @@ def pytest_configure(config: Config):
         if config.getoption("--flaky-tests-only"):
             config.option.reruns_only_flaky = True
     
-    # Configure distributed testing
+    # Configure distributed testing: tests are pulled from the coordinator at --master
+    if config.getoption("--distributed") and not hasattr(config, "workerinput"):
+        if not config.getoption("--master"):
+            raise pytest.UsageError(
+                "--distributed needs --master <host:port> of a coordinator "
+                "(python -m framework.utils.distributed coordinator)"
+            )
+        config.pluginmanager.register(
+            DistributedNodePlugin(config.getoption("--master"), config.getoption("--node-id"), run_info=run_info),
+            "distributed_node"
+        )
+
+
+def _timing_worker_id(config) -> str:
+    """Timing file name of this process: the xdist worker, or the node of a distributed run"""
     if config.getoption("--distributed"):
-        try:
-            from xdist.scheduler import LoadScheduling
-            
-            class CustomScheduling(LoadScheduling):
-                def _split_scope(self, nodeid):
-                    """Custom logic to split tests across nodes"""
-                    platform = nodeid.split("::")[-2] if "::" in nodeid else "web"
-                    return platform
-            
-            config.option.dist = "load"
-            config.option.tx = [f"socket={config.getoption('--master')}"] if config.getoption("--master") else []
-            config.option.scheduling = CustomScheduling
-        except ImportError:
-            print("pytest-xdist not installed. Distributed testing disabled.")
+        return "node-" + re.sub(r"[^\w.-]+", "_", config.getoption("--node-id"))
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def _is_xdist_controller(config) -> bool:
+    """Whether this process hands tests to xdist workers instead of running them"""
+    if hasattr(config, "workerinput"):
+        return False
+    return bool(getattr(config.option, "numprocesses", None) or getattr(config.option, "tx", None))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """
+    Schedule tests longest-processing-time-first from historical durations. Only replaces
+    xdist's load scheduling; loadscope, loadfile, loadgroup and each keep their grouping.
+    """
+    if config.getoption("--schedule") != "lpt" or config.getvalue("dist") != "load":
+        return None
+    from framework.utils.scheduling import DurationScheduling
+    
+    prioritizer = _get_prioritizer(config)
+    config.scheduler = DurationScheduling(
+        config,
+        log,
+        estimates=config.results_store.get_duration_estimates(),
+        default_estimate=config.getoption("--default-duration"),
+        priority=prioritizer.priority if prioritizer else None
+    )
+    return config.scheduler
+
+
+def pytest_collection_modifyitems(config, items):
+    """Reorder tests from their history so failures surface in the first minutes"""
+    if hasattr(config, "workerinput"):
+        # xdist aborts when workers collect different orders, so all of them use the
+        # controller's snapshot instead of reading the history themselves
+        priorities = config.workerinput.get("test_priorities")
+        if priorities:
+            items[:] = HistoryPrioritizer.order_by(priorities, items)
+        return
+    prioritizer = _get_prioritizer(config)
+    if prioritizer:
+        items[:] = prioritizer.order(items)
+
+
+def _get_prioritizer(config) -> Optional[HistoryPrioritizer]:
+    """Build the history based test prioritizer for --order, once per process"""
+    strategy = config.getoption("--order")
+    if strategy == "none":
+        return None
+    if not hasattr(config, "prioritizer"):
+        config.prioritizer = HistoryPrioritizer(
+            config.results_store.get_test_history(),
+            strategy,
+            default_duration=config.getoption("--default-duration")
+        )
+    return config.prioritizer
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Pass the run id, test selection and test order to each xdist worker"""
+    node.workerinput["run_id"] = node.config.run_id
+    prioritizer = _get_prioritizer(node.config)
+    if prioritizer:
+        if not hasattr(node.config, "test_priorities"):
+            node.config.test_priorities = prioritizer.priorities()
+        node.workerinput["test_priorities"] = node.config.test_priorities
+    impact_plugin = node.config.pluginmanager.get_plugin("impact_selection")
+    if impact_plugin:
+        node.workerinput["impact_unaffected"] = sorted(impact_plugin.unaffected)
 
 
 def pytest_sessionstart(session):
@@ -305,66 +833,155 @@ def pytest_sessionfinish(session, exitstatus):
     """Enhanced session finish with reporting"""
     outcome = yield
     
+    # Merge the timing files of all workers on the controller
+    timing_collector = getattr(session.config, "timing_collector", None)
+    if timing_collector:
+        timing_collector.close()
+        if session.config.getoption("--distributed"):
+            timing_collector.merge(
+                os.path.join(timing_collector.results_dir, f"performance_report-{timing_collector.worker_id}.json"),
+                worker_only=True
+            )
+        elif not hasattr(session.config, "workerinput"):
+            timing_collector.merge()
+    
+    # Leaked driver/browser processes of this process, merged per worker into the run info
+    process_leaks = getattr(session.config, "process_leaks", None)
+    if process_leaks:
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        session.config.results_store.update_run_info(
+            session.config.run_id, {"process_leaks": {worker_id: process_leaks}}
+        )
+        if any(process_leaks.values()):
+            print(f"Reaped leaked driver/browser processes on {worker_id}: "
+                  f"{process_leaks['teardown']} at teardown, {process_leaks['session_end']} at session end")
+    
+    # The workers share the run's profile template, it is removed once all of them finished
+    if session.config.getoption("--profile-template") and not hasattr(session.config, "workerinput"):
+        ProfileTemplate(TestConfig.PROFILE_TEMPLATE_DIR, _profile_template_key(session.config)).cleanup()
+    
+    # Workers only append test results and distributed nodes hand them to the coordinator,
+    # the controller finishes the run and reports
+    if hasattr(session.config, "workerinput") or session.config.run_id is None:
+        session.config.results_store.close()
+        return
+    
+    results_store = session.config.results_store
+    scheduler = getattr(session.config, "scheduler", None)
+    if scheduler:
+        schedule_stats = scheduler.stats()
+        results_store.update_run_info(session.config.run_id, {"scheduling": schedule_stats})
+        terminal = session.config.pluginmanager.get_plugin("terminalreporter")
+        if terminal:
+            terminal.write_line(
+                f"LPT scheduling: predicted makespan {schedule_stats['predicted_makespan']:.1f}s, "
+                f"actual {schedule_stats['actual_makespan']:.1f}s, "
+                f"worker idle time {schedule_stats['total_idle_time']:.1f}s"
+            )
+    
+    # Compare durations with the previous runs before the exit status is stored
+    fail_on_regression = session.config.getoption("--fail-on-regression")
+    if fail_on_regression is not None:
+        regressions = RegressionDetector(
+            results_store, last_runs=session.config.getoption("--regression-runs")
+        ).detect(session.config.run_id)
+        write_regressions(regressions, os.path.join(TestConfig.REPORTS_DIR, "results", "regressions.json"))
+        print("\n".join(format_regressions(regressions)))
+        failing = regressions_above(regressions, fail_on_regression)
+        # The report renders this result, so it matches the one deciding the exit status
+        results_store.update_run_info(session.config.run_id, {
+            "regressions": dict(regressions, failing=len(failing), fail_above=fail_on_regression)
+        })
+        if failing and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+        exitstatus = session.exitstatus
+    
+    results_store.finish_run(session.config.run_id, exitstatus)
+    
+    # Reports are built from the stored results, off the session's critical path if requested
+    report_mode = session.config.getoption("--report-mode")
+    if report_mode == "off":
+        return
+    if report_mode == "background":
+        TestReporting.generate_in_background(session.config.run_id, TestConfig.REPORTS_DIR, results_store.db_path)
+        return
+    run_info = results_store.get_run(session.config.run_id)
+    
     # Get test reporting fixture
     test_reporting = None
     if hasattr(session, "test_reporting"):
         test_reporting = session.test_reporting
     else:
-        test_reporting = TestReporting()
-    
-    # Get latest run info file
-    results_dir = os.path.join("framework", "reports", "results")
-    run_info_files = [f for f in os.listdir(results_dir) if f.startswith("run_info_")]
-    if run_info_files:
-        latest_run_info = max(run_info_files)
-        with open(os.path.join(results_dir, latest_run_info)) as f:
-            run_info = json.load(f)
-        
-        # Add test statistics
-        run_info.update({
-            "end_time": datetime.datetime.now().isoformat(),
-            "exit_status": exitstatus,
-            "total_tests": session.testscollected,
-            "passed": len([item for item in session.items if item.session.testsfailed == 0]),
-            "failed": session.testsfailed,
-            "retry_stats": {
-                "total_retries": sum(getattr(item, "execution_count", 0) for item in session.items),
-                "retried_tests": len([item for item in session.items if getattr(item, "execution_count", 0) > 0]),
-                "flaky_tests": len([item for item in session.items if item.get_closest_marker("flaky")])
-            }
-        })
-        
-        # Save updated run info
-        with open(os.path.join(results_dir, latest_run_info), "w") as f:
-            json.dump(run_info, f, indent=2)
-        
-        # Generate reports
-        test_reporting.generate_run_report(run_info)
-        test_reporting.generate_trend_report()
+        test_reporting = TestReporting(TestConfig.REPORTS_DIR, store=results_store)
+    
+    # Generate reports
+    test_reporting.generate_run_report(run_info)
+    test_reporting.generate_trend_report()
 
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_protocol(item: Item, nextitem):
-    """Enhanced test protocol with retry support"""
+    """Enhanced test protocol with retry support, per-phase timing and result storage"""
     # Initialize execution count
     item.execution_count = getattr(item, "execution_count", 0)
     
-    # Start timing
-    start_time = time.time()
+    timing_collector = getattr(item.config, "timing_collector", None)
+    if timing_collector:
+        timing_collector.start_test(item.nodeid)
     
-    # Get performance data fixture
-    perf_data = item.session.performance_data if hasattr(item.session, "performance_data") else None
+    yield
     
-    outcome = yield
+    # Stream the phase and fixture durations to this worker's timing file
+    if timing_collector:
+        timing_collector.finish_test(item)
     
-    # Record performance data if enabled
-    if perf_data and item.config.getoption("--performance"):
-        duration = time.time() - start_time
-        perf_data["tests"][item.nodeid] = {
-            "duration": duration,
-            "outcome": "passed" if outcome.get_result().passed else "failed",
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+    # Append the result to the shared results store
+    phases, test_outcome = summarize_phases(item)
+    metrics = getattr(item, "performance_metrics", None)
+    metrics = dict(metrics["summary"], **metrics["cdp"]) if metrics else {}
+    if getattr(item, "browser_rss_mb", None) is not None:
+        metrics["browser_rss_mb"] = item.browser_rss_mb
+    metrics.update(getattr(item, "memory_metrics", {}))
+    metrics.update(getattr(item, "perf_budget_metrics", {}))
+    metrics.update({f"{PAGE_METRIC_PREFIX}{name}": duration
+                    for name, duration in getattr(item, "page_method_durations", {}).items()})
+    result = {
+        "outcome": test_outcome,
+        "phases": phases,
+        "worker": os.environ.get("PYTEST_XDIST_WORKER", "main"),
+        "retries": _retry_count(item),
+        "flaky": item.get_closest_marker("flaky") is not None,
+        "metrics": metrics,
+        "markers": sorted({marker.name for marker in item.iter_markers()} - IGNORED_MARKERS)
+    }
+    if item.config.run_id is None:
+        # Distributed nodes send the result to the coordinator, see DistributedNodePlugin
+        item.test_result = result
+        return
+    item.config.results_store.record_test(item.config.run_id, item.nodeid, **result)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Record fixture setup and teardown durations for the running test"""
+    timing_collector = getattr(request.config, "timing_collector", None)
+    if timing_collector is None:
+        yield
+        return
+    
+    # Finalizers run last-in-first-out, so these two bracket the fixture's own teardown
+    teardown_start = {}
+    
+    def record_teardown():
+        if "time" in teardown_start:
+            duration = time.perf_counter() - teardown_start.pop("time")
+            timing_collector.add_fixture(fixturedef.argname, fixturedef.scope, "teardown", duration)
+    
+    fixturedef.addfinalizer(record_teardown)
+    started = time.perf_counter()
+    yield
+    timing_collector.add_fixture(fixturedef.argname, fixturedef.scope, "setup", time.perf_counter() - started)
+    fixturedef.addfinalizer(lambda: teardown_start.update(time=time.perf_counter()))
 
 
 @pytest.hookimpl(hookwrapper=True)
@@ -373,108 +990,109 @@ def pytest_runtest_makereport(item: Item, call: CallInfo):
     outcome = yield
     report = outcome.get_result()
     
+    # Expose the phase report to fixtures (e.g. video recording on failure)
+    setattr(item, f"rep_{report.when}", report)
+    
     # Add retry information to the report
     if hasattr(item, "execution_count"):
         report.rerun = item.execution_count
     
-    # Handle test retries
-    if report.when == "call" and report.failed:
-        flaky_marker = item.get_closest_marker("flaky")
-        retries = item.config.getoption("--retries")
-        
-        if flaky_marker or (retries and not item.config.getoption("--flaky-tests-only")):
-            max_reruns = flaky_marker.kwargs.get("reruns", retries) if flaky_marker else retries
-            if getattr(item, "execution_count", 0) < max_reruns:
-                item.execution_count = getattr(item, "execution_count", 0) + 1
-                report.failed = False
-                report.outcome = "rerun"
-    
+    # Collect performance metrics for web tests in a single batched call
     if report.when == "call":
-        driver = _get_driver_from_item(item)
-        if driver:
-            # Handle video recording
-            if item.config.getoption("--video") and hasattr(driver, "stop_recording_screen"):
-                try:
-                    video_path = f"framework/reports/videos/{item.nodeid}.mp4"
-                    os.makedirs(os.path.dirname(video_path), exist_ok=True)
-                    driver.stop_recording_screen()
-                    allure.attach.file(
-                        video_path,
-                        name="Test Video",
-                        attachment_type=allure.attachment_type.MP4
-                    )
-                except Exception as e:
-                    allure.attach(
-                        str(e),
-                        "Video Recording Error",
-                        allure.attachment_type.TEXT
-                    )
-            
-            # Collect performance metrics for web tests
-            if item.config.getoption("--performance") and item.config.getoption("--platform") == "web":
-                try:
-                    metrics = _collect_performance_metrics(driver)
-                    allure.attach(
-                        json.dumps(metrics, indent=2),
-                        "Performance Metrics",
-                        allure.attachment_type.JSON
-                    )
-                except Exception as e:
-                    allure.attach(
-                        str(e),
-                        "Performance Metrics Error",
-                        allure.attachment_type.TEXT
-                    )
+        # Browser and driver processes are children of this worker, their peak is the worker footprint
+        if _get_driver_from_item(item) is not None:
+            item.browser_rss_mb = process_tree_rss_mb(include_root=False) or None
+        collector = getattr(item, "performance_collector", None)
+        if collector:
+            metrics = collector.collect()
+            item.performance_metrics = metrics
+            allure.attach(
+                json.dumps(metrics, indent=2),
+                "Performance Metrics",
+                allure.attachment_type.JSON
+            )
+            if metrics["errors"]:
+                allure.attach(
+                    "\n".join(metrics["errors"]),
+                    "Performance Metrics Error",
+                    allure.attachment_type.TEXT
+                )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Retry tests marked inplace_retry in place: only the test body runs again on the live
+    driver after it was reset to about:blank (or the app restarted), so function-scoped
+    fixtures keep the state the first attempt left behind. Other tests are retried by
+    pytest-rerunfailures with fresh fixtures. In-place retries share the rerun budget with
+    pytest-rerunfailures through item.execution_count, so a full fixture rebuild only
+    happens when the driver is no longer healthy.
+    """
+    inplace_marker = pyfuncitem.get_closest_marker("inplace_retry")
+    if not inplace_marker or pyfuncitem.config.getoption("--retry-mode") != "inplace":
+        return None
+    driver = _get_driver_from_item(pyfuncitem)
+    if driver is None:
+        return None
+    
+    flaky_marker = pyfuncitem.get_closest_marker("flaky")
+    default_retries = flaky_marker.kwargs.get("reruns") if flaky_marker else None
+    max_retries = inplace_marker.kwargs.get(
+        "reruns", default_retries or pyfuncitem.config.getoption("--retries") or 1
+    )
+    funcargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    while True:
+        try:
+            pyfuncitem.obj(**funcargs)
+            return True
+        except Exception as e:
+            if _retry_count(pyfuncitem) >= max_retries or not BrowserManager.is_driver_healthy(driver):
+                raise
+            allure.attach(
+                f"{type(e).__name__}: {e}",
+                f"In-place retry {_retry_count(pyfuncitem) + 1}",
+                allure.attachment_type.TEXT
+            )
+            BrowserManager.reset_driver(driver)
+            pyfuncitem.execution_count = getattr(pyfuncitem, "execution_count", 0) + 1
+
+
+def _retry_count(item: Item) -> int:
+    """Number of retries so far; pytest-rerunfailures counts the first run as 1"""
+    execution_count = getattr(item, "execution_count", 0)
+    if item.config.pluginmanager.hasplugin("rerunfailures"):
+        return max(0, execution_count - 1)
+    return execution_count
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item: Item):
+    """Install performance observers before the test body navigates"""
+    if not item.config.getoption("--performance"):
+        return
+    driver = _get_driver_from_item(item)
+    if PerformanceCollector.supports(driver):
+        collector = PerformanceCollector(driver)
+        collector.install()
+        item.performance_collector = collector
+
+
+# Built-in markers that say nothing about what a test covers, left out of the marker statistics
+IGNORED_MARKERS = {"parametrize", "usefixtures", "filterwarnings"}
+
+DRIVER_FIXTURES = ("driver", "selenium_driver", "playwright_page", "android_driver", "ios_driver")
 
 
 def _get_driver_from_item(item: Item) -> Optional[Any]:
     """Helper to get driver instance from test item"""
-    try:
-        for fixturedef in item._fixtureinfo.name2fixturedef.values():
-            if fixturedef.argname == "driver":
-                return item._request.getfixturevalue("driver")
-    except:
-        pass
+    funcargs = getattr(item, "funcargs", None) or {}
+    for name in DRIVER_FIXTURES:
+        if name in funcargs:
+            return funcargs[name]
     return None
 
 
-def _collect_performance_metrics(driver: Any) -> Dict:
-    """Collect performance metrics from browser"""
-    metrics = {}
-    
-    try:
-        if hasattr(driver, "execute_script"):
-            # Navigation Timing API metrics
-            timing = driver.execute_script("return window.performance.timing.toJSON()")
-            metrics["navigation_timing"] = timing
-            
-            # Memory usage
-            memory = driver.execute_script("return window.performance.memory")
-            if memory:
-                metrics["memory"] = {
-                    "used_js_heap_size": memory.usedJSHeapSize,
-                    "total_js_heap_size": memory.totalJSHeapSize,
-                    "js_heap_size_limit": memory.jsHeapSizeLimit
-                }
-            
-            # Resource timing
-            resources = driver.execute_script("""
-                var resources = window.performance.getEntriesByType('resource');
-                return resources.map(function(resource) {
-                    return {
-                        name: resource.name,
-                        duration: resource.duration,
-                        transferSize: resource.transferSize
-                    };
-                });
-            """)
-            metrics["resources"] = resources
-    except:
-        pass
-    
-    return metrics
-
-
 class TestReport:
     """Custom test report class"""
     def __init__(self, item: Item, when: str, outcome: str, exc_info=None):
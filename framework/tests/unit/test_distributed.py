@@ -0,0 +1,142 @@
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from framework.utils.distributed import Coordinator, WorkQueue
+from framework.utils.results_store import ResultsStore
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+NODE_CONFTEST = """
+    import pytest
+    from framework.utils.distributed import DistributedNodePlugin
+
+
+    def pytest_addoption(parser):
+        parser.addoption("--master")
+        parser.addoption("--node-id")
+
+
+    def pytest_configure(config):
+        config.pluginmanager.register(
+            DistributedNodePlugin(config.getoption("--master"), config.getoption("--node-id"), batch_size=2,
+                                  idle_interval=0.1, run_info={"platform": "web", "browser": "chrome",
+                                                               "node_id": config.getoption("--node-id")}),
+            "distributed_node"
+        )
+
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(item, call):
+        outcome = yield
+        setattr(item, "rep_" + call.when, outcome.get_result())
+"""
+
+NODE_TESTS = """
+    import time
+
+    import pytest
+
+
+    class TestFirst:
+        @pytest.mark.parametrize("index", range(6))
+        def test_passes(self, index):
+            time.sleep(0.05)
+
+
+    def test_fails():
+        assert False
+"""
+
+
+def _queue(*nodes, tests=None, batch_size=4):
+    queue = WorkQueue(batch_size=batch_size)
+    for node_id in nodes:
+        queue.register(node_id, tests or [f"test_{index}" for index in range(8)])
+    return queue
+
+
+class TestWorkQueue:
+
+    def test_longest_tests_are_queued_first(self):
+        queue = WorkQueue(batch_size=2, estimates={"b": 5.0, "c": 1.0})
+        queue.register("node-1", ["a", "b", "c"])
+        assert queue.pull("node-1") == (["b", "c"], False)
+
+    def test_register_rejects_a_different_collection(self):
+        queue = _queue("node-1")
+        with pytest.raises(ValueError):
+            queue.register("node-2", ["other"])
+
+    def test_steal_keeps_the_running_test_and_the_next_one(self):
+        queue = _queue("node-1", "node-2", tests=["a", "b", "c", "d", "e", "f"], batch_size=6)
+        queue.pull("node-1")
+        assert queue.pull("node-2") == (["e", "f"], False)
+        assert queue.assigned["node-1"] == ["a", "b", "c", "d"]
+        assert queue.take_revoked("node-1") == ["e", "f"]
+
+    def test_no_steal_from_a_batch_of_running_and_next_test(self):
+        queue = _queue("node-1", "node-2", tests=["a", "b"], batch_size=2)
+        queue.pull("node-1")
+        assert queue.pull("node-2") == ([], False)
+        assert queue.assigned["node-1"] == ["a", "b"]
+
+    def test_dead_node_tests_are_requeued_first(self):
+        queue = _queue("node-1", "node-2", tests=["a", "b", "c"], batch_size=2)
+        queue.pull("node-1")
+        now = queue.nodes["node-1"]["last_seen"] + queue.heartbeat_timeout + 1
+        queue.nodes["node-2"]["last_seen"] = now
+        assert queue.reap(now=now) == ["node-1"]
+        assert list(queue.pending) == ["a", "b", "c"]
+        assert queue.requeued == 2
+
+    def test_duplicate_results_are_ignored(self):
+        queue = _queue("node-1", "node-2", tests=["a"])
+        assert queue.complete("node-1", "a", {"outcome": "passed"})
+        assert not queue.complete("node-2", "a", {"outcome": "failed"})
+        assert queue.done
+
+
+class TestLocalNodes:
+
+    def test_coordinator_with_two_local_nodes(self, tmp_path):
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "pytest.ini").write_text("[pytest]\n")
+        (project / "conftest.py").write_text(textwrap.dedent(NODE_CONFTEST))
+        (project / "test_node.py").write_text(textwrap.dedent(NODE_TESTS))
+
+        store = ResultsStore(str(tmp_path / "results.db"))
+        coordinator = Coordinator("127.0.0.1", 0, batch_size=2, store=store)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+        nodes = [
+            subprocess.Popen(
+                [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--master", coordinator.address,
+                 "--node-id", f"local-{index}"],
+                cwd=str(project), env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            for index in range(2)
+        ]
+
+        def stop_when_nodes_exit():
+            for node in nodes:
+                node.communicate(timeout=120)
+            coordinator.stop()
+        threading.Thread(target=stop_when_nodes_exit, daemon=True).start()
+
+        summary = coordinator.serve(poll_interval=0.1)
+
+        assert summary["completed"] == summary["total_tests"] == 7
+        assert summary["outcomes"] == {"passed": 6, "failed": 1}
+        assert set(summary["nodes"]) == {"local-0", "local-1"}
+        tests = store.get_tests(coordinator.run_id)
+        assert len(tests) == 7
+        assert {test["worker"] for test in tests} <= {"local-0", "local-1"}
+        run = store.get_run(coordinator.run_id)
+        assert (run["platform"], run["browser"]) == ("web", "chrome")
+        assert "node_id" not in run
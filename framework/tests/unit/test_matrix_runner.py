@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+import pytest
+
+from framework.config.parallel_config import ParallelConfig
+from framework.utils.matrix_runner import Combination, MatrixRunner
+from framework.utils.results_store import ResultsStore
+
+
+class _Process:
+    def __init__(self):
+        self.terminated = False
+
+    def poll(self):
+        return -15 if self.terminated else None
+
+    def terminate(self):
+        self.terminated = True
+
+
+class _FakeRunner(MatrixRunner):
+    """Runs every combination as a short sleep instead of a pytest subprocess"""
+
+    def __init__(self, *args, failing=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failing = set(failing)
+        self.started = []
+        self.max_in_use = {}
+        self._lock = threading.Lock()
+        self._running = []
+
+    def _start(self, combination):
+        combination.status = "running"
+        combination.process = _Process()
+        with self._lock:
+            self.started.append(combination.name)
+            self._running.append(combination)
+            in_use = self._in_use(self._running, combination.resource)
+            self.max_in_use[combination.resource] = max(self.max_in_use.get(combination.resource, 0), in_use)
+        threading.Thread(target=self._finish, args=(combination,), daemon=True).start()
+
+    def _finish(self, combination):
+        if combination.name in self.failing:
+            self._events.put(("failure", combination))
+        time.sleep(0.1)
+        with self._lock:
+            self._running.remove(combination)
+        if combination.name in self.failing:
+            combination.returncode = 1
+        else:
+            combination.returncode = -15 if combination.process.terminated else 0
+        combination.status = {0: "passed", 1: "failed"}.get(combination.returncode, "cancelled")
+        self._events.put(("finished", combination))
+
+    def generate_reports(self, report):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The merged report is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+PLAN = ParallelConfig.generate_execution_list(platforms=["web", "mobile"])
+
+
+class TestCombination:
+
+    def test_web_combination(self):
+        combination = Combination(["-v", "--alluredir=shared", "--platform", "web", "--browser", "firefox"])
+        assert combination.name == "web-firefox"
+        assert combination.resource == "browser"
+        # Every combination gets allure results of its own
+        assert "--alluredir=shared" not in combination.args
+        assert combination.args[-1] == ParallelConfig.get_alluredir("web-firefox")
+        assert combination.reports_dir == os.path.join("framework", "reports", "matrix", "web-firefox")
+
+    def test_mobile_combination(self):
+        combination = Combination(["--platform", "android"])
+        assert (combination.name, combination.resource, combination.browser) == ("android", "android", None)
+
+
+class TestMatrixRunner:
+
+    def test_slots_bound_concurrency(self, store):
+        runner = _FakeRunner(PLAN, cpu_slots=2, store=store)
+        report = runner.run()
+
+        assert sorted(runner.started) == sorted(combination.name for combination in runner.combinations)
+        assert runner.max_in_use == {"browser": 2, "android": 1, "ios": 1}
+        assert report["status"] == "passed"
+
+    def test_fail_fast_cancels_the_rest(self, store):
+        runner = _FakeRunner(PLAN, cpu_slots=1, fail_fast=True, failing={"web-chrome"}, store=store)
+        report = runner.run()
+
+        statuses = {combination["name"]: combination["status"] for combination in report["combinations"]}
+        assert statuses["web-chrome"] == "failed"
+        assert statuses["web-firefox"] == statuses["web-playwright"] == "cancelled"
+        assert report["status"] == "failed"
+
+    def test_report_merges_stored_runs(self, store):
+        runner = _FakeRunner(PLAN[:2], store=store)
+        for name, outcomes in (("web-chrome", ["passed", "failed"]), ("web-firefox", ["passed", "skipped"])):
+            run_id = store.start_run({"start_time": "2026-01-01T00:00:00", "matrix_id": runner.matrix_id,
+                                      "combination": name})
+            for index, outcome in enumerate(outcomes):
+                store.record_test(run_id, f"test_a.py::test_{index}", outcome, {"call": 1.0})
+            store.finish_run(run_id, 0)
+
+        report = runner.run()
+        assert report["totals"] == {"total_tests": 4, "passed": 2, "failed": 1, "skipped": 1}
+        assert report["combinations"][0]["failed_tests"] == ["test_a.py::test_1"]
+        assert os.path.exists(os.path.join("framework", "reports", "results", "matrix_report.json"))
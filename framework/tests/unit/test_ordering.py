@@ -0,0 +1,85 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from framework.utils.ordering import HistoryPrioritizer
+
+
+def _result(outcome: str, duration: float = 1.0, retries: int = 0):
+    return {"outcome": outcome, "duration": duration, "retries": retries}
+
+
+HISTORY = {
+    "test_a.py::test_stable": [_result("passed", 2.0)] * 5,
+    "test_a.py::test_broken": [_result("failed", 4.0), _result("failed", 4.0), _result("passed", 4.0)],
+    "test_b.py::test_flaky": [_result("passed", 1.0, retries=1), _result("passed", 1.0)],
+    "test_b.py::test_slow": [_result("passed", 30.0), _result("failed", 30.0)],
+}
+
+
+def _items(*nodeids):
+    return [SimpleNamespace(nodeid=nodeid) for nodeid in nodeids]
+
+
+def _nodeids(items):
+    return [item.nodeid for item in items]
+
+
+class TestHistoryPrioritizer:
+
+    def test_failure_probability(self):
+        prioritizer = HistoryPrioritizer(HISTORY)
+
+        broken = prioritizer.failure_probability("test_a.py::test_broken")
+        flaky = prioritizer.failure_probability("test_b.py::test_flaky")
+        stable = prioritizer.failure_probability("test_a.py::test_stable")
+        assert broken > flaky > stable
+        # Tests without history are likely to fail
+        assert prioritizer.failure_probability("test_c.py::test_new") == 0.5
+
+    def test_recent_failures_weigh_more(self):
+        prioritizer = HistoryPrioritizer({
+            "recent": [_result("failed"), _result("passed")],
+            "old": [_result("passed"), _result("failed")]
+        })
+        assert prioritizer.failure_probability("recent") > prioritizer.failure_probability("old")
+
+    def test_strategies(self):
+        items = _items(*HISTORY)
+        assert _nodeids(HistoryPrioritizer(HISTORY, "failure-first").order(items))[0] == "test_a.py::test_broken"
+        assert _nodeids(HistoryPrioritizer(HISTORY, "fast-first").order(items))[0] == "test_b.py::test_flaky"
+        # The slow test fails often too, but finds failures more slowly
+        order = _nodeids(HistoryPrioritizer(HISTORY).order(items))
+        assert order.index("test_a.py::test_broken") < order.index("test_b.py::test_slow")
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            HistoryPrioritizer(HISTORY, "random")
+
+
+class TestPrioritySnapshot:
+
+    def test_snapshot_orders_like_the_prioritizer(self):
+        prioritizer = HistoryPrioritizer(HISTORY)
+        items = _items("test_c.py::test_new", *HISTORY, "test_c.py::test_other")
+
+        # Snapshots travel to xdist workers as JSON
+        snapshot = json.loads(json.dumps(prioritizer.priorities()))
+        assert _nodeids(HistoryPrioritizer.order_by(snapshot, items)) == _nodeids(prioritizer.order(items))
+
+    def test_snapshot_does_not_change_with_history(self):
+        history = {nodeid: list(results) for nodeid, results in HISTORY.items()}
+        snapshot = HistoryPrioritizer(history).priorities()
+        items = _items(*HISTORY)
+        expected = _nodeids(HistoryPrioritizer.order_by(snapshot, items))
+
+        # A run finishing meanwhile must not reorder the tests of another process
+        history["test_a.py::test_stable"][:0] = [_result("failed", 2.0)] * 5
+        assert _nodeids(HistoryPrioritizer.order_by(snapshot, items)) == expected
+        assert _nodeids(HistoryPrioritizer(history).order(items)) != expected
+
+    def test_ties_keep_collection_order(self):
+        snapshot = HistoryPrioritizer({}).priorities()
+        items = _items("test_z.py::test_a", "test_a.py::test_b", "test_m.py::test_c")
+        assert HistoryPrioritizer.order_by(snapshot, items) == items
@@ -0,0 +1,46 @@
+from framework.utils.impact import DependencyRecorder
+from framework.utils.patching import is_wrapper
+from framework.utils.tracing import instrument_class
+
+
+class _Page:
+    def open(self):
+        return "opened"
+
+
+class TestNestedWrappers:
+
+    def test_marker_is_not_inherited(self):
+        recorder = DependencyRecorder(".")
+        recorder.instrument(_Page)
+        restore = instrument_class(_Page)
+        try:
+            assert is_wrapper(vars(_Page)["open"], "traced")
+            assert not is_wrapper(vars(_Page)["open"], "recorded")
+            assert _Page().open() == "opened"
+        finally:
+            for undo in reversed(restore):
+                undo()
+            recorder.restore()
+
+    def test_restore_out_of_order(self):
+        original = vars(_Page)["open"]
+        recorder = DependencyRecorder(".")
+        recorder.instrument(_Page)
+        restore = instrument_class(_Page)
+        # The recorder was installed first but is restored first
+        recorder.restore()
+        for undo in reversed(restore):
+            undo()
+        assert vars(_Page)["open"] is original
+
+    def test_restore_in_order(self):
+        original = vars(_Page)["open"]
+        recorder = DependencyRecorder(".")
+        recorder.instrument(_Page)
+        restore = instrument_class(_Page)
+        for undo in reversed(restore):
+            undo()
+        assert is_wrapper(vars(_Page)["open"], "recorded")
+        recorder.restore()
+        assert vars(_Page)["open"] is original
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+import pytest
+
+from framework.utils.profile_template import ProfileTemplate
+
+
+def _write(path: str, content: str = "data"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def _build_profile(directory: str):
+    """A user data directory as left behind by a running Chrome"""
+    _write(os.path.join(directory, "Local State"), "{}")
+    _write(os.path.join(directory, "Default", "Preferences"), "{}")
+    _write(os.path.join(directory, "Default", "Cache", "Cache_Data", "f_000001"), "cached")
+    _write(os.path.join(directory, "SingletonLock"))
+    _write(os.path.join(directory, "Default", "LOCK"))
+
+
+class TestEnsure:
+
+    def test_builds_once(self, tmp_path):
+        builds = []
+
+        def build(directory):
+            builds.append(directory)
+            _build_profile(directory)
+
+        template = ProfileTemplate(str(tmp_path), "run")
+        template_dir = template.ensure(build)
+        assert template.ensure(build) == template_dir
+        assert len(builds) == 1
+        assert _read(os.path.join(template_dir, "Default", "Preferences")) == "{}"
+        # Lock files of the browser that built the template are removed
+        assert not os.path.exists(os.path.join(template_dir, "SingletonLock"))
+        assert sorted(os.listdir(os.path.join(tmp_path, "run"))) == ["template"]
+
+    def test_workers_share_one_build(self, tmp_path):
+        builds = []
+
+        def build(directory):
+            builds.append(directory)
+            time.sleep(0.5)
+            _build_profile(directory)
+
+        templates = [ProfileTemplate(str(tmp_path), "run") for _ in range(3)]
+        results = []
+        threads = [threading.Thread(target=lambda t=template: results.append(t.ensure(build)))
+                   for template in templates]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert results == [templates[0].template_dir] * 3
+
+    def test_failed_build_can_be_retried(self, tmp_path):
+        def fail(directory):
+            os.makedirs(directory)
+            raise RuntimeError("browser crashed")
+
+        template = ProfileTemplate(str(tmp_path), "run")
+        with pytest.raises(RuntimeError):
+            template.ensure(fail)
+        assert os.listdir(template.directory) == []
+        assert os.path.isdir(template.ensure(_build_profile))
+
+    def test_waiting_for_a_build_times_out(self, tmp_path):
+        template = ProfileTemplate(str(tmp_path), "run", build_timeout=0.1)
+        _write(os.path.join(template.directory, ".building"))
+        with pytest.raises(RuntimeError, match="not built"):
+            template.ensure(_build_profile)
+
+
+class TestClone:
+
+    @pytest.fixture
+    def template(self, tmp_path):
+        template = ProfileTemplate(str(tmp_path), "run")
+        template.ensure(_build_profile)
+        return template
+
+    def test_clone_is_independent(self, template):
+        clone_dir = template.clone("test_a.py::test_login[chrome]")
+
+        assert os.path.basename(clone_dir).startswith("test_a.py__test_login_chrome_-")
+        assert _read(os.path.join(clone_dir, "Local State")) == "{}"
+        assert not os.path.exists(os.path.join(clone_dir, "Default", "LOCK"))
+        _write(os.path.join(clone_dir, "Default", "Preferences"), "changed")
+        assert _read(os.path.join(template.template_dir, "Default", "Preferences")) == "{}"
+        assert template.stats["clones"] == 1
+
+    def test_cache_entries_are_hardlinked_without_reflinks(self, template):
+        template._reflink = False
+        clone_dir = template.clone("test")
+
+        cached = os.path.join("Default", "Cache", "Cache_Data", "f_000001")
+        assert os.path.samefile(os.path.join(clone_dir, cached), os.path.join(template.template_dir, cached))
+        assert not os.path.samefile(os.path.join(clone_dir, "Local State"),
+                                    os.path.join(template.template_dir, "Local State"))
+        assert (template.stats["hardlinked"], template.stats["copied"]) == (1, 2)
+
+    def test_discard_and_cleanup(self, template):
+        clone_dir = template.clone("test")
+        template.discard(clone_dir)
+        template.discard(None)
+        assert not os.path.exists(clone_dir)
+        assert os.path.isdir(template.template_dir)
+
+        template.cleanup()
+        assert not os.path.exists(template.directory)
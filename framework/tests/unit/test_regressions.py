@@ -0,0 +1,108 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from framework.utils.regressions import (RegressionDetector, format_regressions, mann_whitney_greater,
+                                         regressions_above)
+from framework.utils.results_store import ResultsStore
+
+TESTS = [f"test_a.py::test_{index}" for index in range(5)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+def _record_run(store: ResultsStore, start_time: datetime.datetime, durations, method_duration,
+                browser: str = "chrome") -> str:
+    """Store a finished run, every test calls Page.open once"""
+    run_id = store.start_run({"start_time": start_time.isoformat(), "platform": "web", "browser": browser})
+    for nodeid, duration in zip(TESTS, durations):
+        store.record_test(run_id, nodeid, "passed", {"call": duration},
+                          metrics={"page:Page.open": method_duration(nodeid)})
+    store.finish_run(run_id, 0)
+    return run_id
+
+
+def _history(store: ResultsStore, runs: int = 8, seed: int = 0, **kwargs):
+    """Previous runs with every test taking about 10s and Page.open about 0.5s"""
+    rng = np.random.default_rng(seed)
+    start = datetime.datetime.now() - datetime.timedelta(days=runs + 1)
+    for index in range(runs):
+        _record_run(store, start + datetime.timedelta(days=index), 10 + rng.normal(0, 0.2, len(TESTS)),
+                    lambda nodeid: 0.5 + rng.normal(0, 0.02), **kwargs)
+
+
+class TestRegressionDetector:
+
+    def test_slower_test_is_flagged(self, store):
+        _history(store)
+        run_id = _record_run(store, datetime.datetime.now(), [10, 10.1, 9.9, 10, 15], lambda nodeid: 0.5)
+
+        result = RegressionDetector(store).detect(run_id)
+        assert len(result["baseline_runs"]) == 8
+        assert [regression["name"] for regression in result["tests"]] == ["test_a.py::test_4"]
+        assert result["tests"][0]["slowdown"] == pytest.approx(0.5, abs=0.05)
+        assert result["page_methods"] == []
+
+    def test_slower_page_method_is_flagged(self, store):
+        _history(store)
+        run_id = _record_run(store, datetime.datetime.now(), [10] * len(TESTS), lambda nodeid: 0.8)
+
+        result = RegressionDetector(store).detect(run_id)
+        assert result["tests"] == []
+        assert [regression["name"] for regression in result["page_methods"]] == ["Page.open"]
+        assert result["page_methods"][0]["p_value"] < 0.01
+
+    def test_noise_is_not_flagged(self, store):
+        _history(store)
+        rng = np.random.default_rng(1)
+        run_id = _record_run(store, datetime.datetime.now(), 10 + rng.normal(0, 0.2, len(TESTS)),
+                             lambda nodeid: 0.5 + rng.normal(0, 0.02))
+
+        result = RegressionDetector(store).detect(run_id)
+        assert result["tests"] == [] and result["page_methods"] == []
+
+    def test_small_slowdowns_are_not_flagged(self, store):
+        _history(store)
+        # Significant, but below min_slowdown
+        run_id = _record_run(store, datetime.datetime.now(), [10, 10, 10, 10, 11], lambda nodeid: 0.55)
+
+        result = RegressionDetector(store).detect(run_id)
+        assert result["tests"] == [] and result["page_methods"] == []
+
+    def test_too_few_comparable_runs(self, store):
+        _history(store, browser="firefox")
+        _history(store, runs=3)
+        run_id = _record_run(store, datetime.datetime.now(), [20] * len(TESTS), lambda nodeid: 2.0)
+
+        result = RegressionDetector(store).detect(run_id)
+        assert len(result["baseline_runs"]) == 3
+        assert result["tests"] == [] and result["page_methods"] == []
+        assert format_regressions(result) == ["Duration regressions: not checked, 3 comparable previous runs"]
+
+    def test_regressions_above(self, store):
+        _history(store)
+        run_id = _record_run(store, datetime.datetime.now(), [10, 10, 10, 13, 15], lambda nodeid: 0.5)
+
+        result = RegressionDetector(store).detect(run_id)
+        assert [regression["name"] for regression in result["tests"]] == ["test_a.py::test_4", "test_a.py::test_3"]
+        assert [regression["name"] for regression in regressions_above(result, 40)] == ["test_a.py::test_4"]
+
+
+class TestMannWhitney:
+
+    def test_shifted_sample(self):
+        rng = np.random.default_rng(0)
+        assert mann_whitney_greater(rng.normal(1.5, 0.1, 20), rng.normal(1.0, 0.1, 40)) < 0.001
+
+    def test_same_distribution(self):
+        rng = np.random.default_rng(0)
+        assert mann_whitney_greater(rng.normal(1.0, 0.1, 20), rng.normal(1.0, 0.1, 40)) > 0.05
+
+    def test_identical_values(self):
+        assert mann_whitney_greater(np.ones(5), np.ones(10)) == 1.0
@@ -0,0 +1,125 @@
+import datetime
+
+import pytest
+
+from framework.utils.results_store import ResultsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    yield store
+    store.close()
+
+
+def _start_run(store: ResultsStore, start_time: datetime.datetime = None, **info) -> str:
+    start_time = start_time or datetime.datetime.now()
+    return store.start_run(dict(info, start_time=start_time.isoformat()))
+
+
+class TestRecordTest:
+
+    def test_insert_and_aggregate(self, store):
+        run_id = _start_run(store, platform="web")
+        store.record_test(run_id, "test_a.py::test_pass", "passed", {"setup": 0.5, "call": 1.0, "teardown": 0.25},
+                          metrics={"lcp_ms": 1200, "label": "ignored", "ok": True}, markers=["smoke"])
+        store.record_test(run_id, "test_a.py::test_fail", "failed", {"call": 2.0}, retries=2, flaky=True)
+        store.finish_run(run_id, 1)
+
+        tests = {test["nodeid"]: test for test in store.get_tests(run_id)}
+        assert tests["test_a.py::test_pass"]["duration"] == 1.75
+        assert tests["test_a.py::test_pass"]["setup_duration"] == 0.5
+        assert tests["test_a.py::test_fail"]["retries"] == 2
+        assert store.get_metrics(run_id, "lcp_ms") == {"test_a.py::test_pass": 1200}
+        assert store.get_metrics(run_id, "ok") == {}
+        assert list(store.get_markers(run_id).values()) == [["smoke"]]
+
+        run = store.get_run(run_id)
+        assert (run["total_tests"], run["passed"], run["failed"]) == (2, 1, 1)
+        assert run["platform"] == "web"
+        assert run["exit_status"] == 1
+
+    def test_update_run_info_merges_dictionaries(self, store):
+        run_id = _start_run(store, attachments={"gw0": {"attachments": 1}})
+        store.update_run_info(run_id, {"attachments": {"gw1": {"attachments": 2}}, "browser": "chrome"})
+
+        run = store.get_run(run_id)
+        assert run["attachments"] == {"gw0": {"attachments": 1}, "gw1": {"attachments": 2}}
+        assert run["browser"] == "chrome"
+
+    def test_unfinished_runs_are_not_listed(self, store):
+        finished = _start_run(store)
+        store.finish_run(finished, 0)
+        _start_run(store)
+
+        assert [run["run_id"] for run in store.get_runs()] == [finished]
+
+
+class TestTrendIndex:
+
+    def _finished_run(self, store, start_time, outcomes):
+        run_id = _start_run(store, start_time, platform="web")
+        for index, outcome in enumerate(outcomes):
+            store.record_test(run_id, f"test_a.py::test_{index}", outcome, {"call": 1.0})
+        store.finish_run(run_id, 0)
+        return run_id
+
+    def test_old_runs_are_rolled_up_per_day(self, store):
+        yesterday = datetime.datetime.combine(datetime.date.today() - datetime.timedelta(days=1), datetime.time(12))
+        self._finished_run(store, yesterday, ["passed", "passed"])
+        self._finished_run(store, yesterday + datetime.timedelta(minutes=1), ["passed", "failed", "failed", "passed"])
+        latest = self._finished_run(store, datetime.datetime.now(), ["passed"])
+
+        assert store.update_trend_index(raw_runs=1) == 3
+        rollup, single = store.get_trend_data()
+        assert rollup["date"] == yesterday.date().isoformat()
+        assert rollup["runs"] == 2
+        # Averaged per run, on the scale of single runs
+        assert (rollup["total_tests"], rollup["passed"], rollup["failed"]) == (3, 2, 1)
+        assert single["run_id"] == latest
+        assert (single["runs"], single["total_tests"]) == (1, 1)
+
+    def test_update_only_ingests_new_runs(self, store):
+        self._finished_run(store, datetime.datetime.now(), ["passed"])
+        assert store.update_trend_index() == 1
+        assert store.update_trend_index() == 0
+        self._finished_run(store, datetime.datetime.now(), ["failed"])
+        assert store.update_trend_index() == 1
+        assert len(store.get_trend_data()) == 2
+
+    def test_old_rollups_are_dropped(self, store):
+        self._finished_run(store, datetime.datetime.now() - datetime.timedelta(days=40), ["passed"])
+        self._finished_run(store, datetime.datetime.now(), ["passed"])
+
+        store.update_trend_index(raw_runs=1, rollup_days=30)
+        assert [entry["runs"] for entry in store.get_trend_data()] == [1]
+
+
+class TestPruneResults:
+
+    def test_prunes_ingested_runs_only(self, store):
+        old = datetime.datetime.now() - datetime.timedelta(days=30)
+        ingested = _start_run(store, old)
+        store.record_test(ingested, "test_a.py::test_a", "passed", {"call": 1.0}, metrics={"lcp_ms": 900},
+                          markers=["smoke"])
+        store.finish_run(ingested, 0)
+        store.update_trend_index()
+        # Finished after the last trend update, so its results are still needed
+        pending = _start_run(store, old)
+        store.finish_run(pending, 0)
+        recent = _start_run(store)
+        store.finish_run(recent, 0)
+
+        assert store.prune_results(retention_days=7) == 1
+        assert store.get_run(ingested) is None
+        assert store.get_tests(ingested) == []
+        assert store.connection.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 0
+        assert store.connection.execute("SELECT COUNT(*) FROM test_markers").fetchone()[0] == 0
+        assert store.get_run(pending) is not None
+        assert store.get_run(recent) is not None
+        # The trend index keeps the pruned run
+        assert len(store.get_trend_data()) == 1
+
+    def test_prunes_crashed_runs(self, store):
+        _start_run(store, datetime.datetime.now() - datetime.timedelta(days=30))
+        assert store.prune_results(retention_days=7) == 1
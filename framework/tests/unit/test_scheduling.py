@@ -0,0 +1,106 @@
+import pytest
+
+pytest.importorskip("xdist")
+
+from framework.utils.scheduling import DurationScheduling, predict_makespan  # noqa: E402
+
+
+class _Config:
+    """The options LoadScheduling reads from the pytest config"""
+
+    def __init__(self, workers: int):
+        self.options = {"tx": [f"{workers}*popen"], "maxschedchunk": None}
+
+    def getvalue(self, name):
+        return self.options[name]
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+class _Gateway:
+    def __init__(self, gateway_id: str):
+        self.id = gateway_id
+
+
+class _Node:
+    def __init__(self, gateway_id: str):
+        self.gateway = _Gateway(gateway_id)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+COLLECTION = ["test_a.py::test_short", "test_a.py::test_long", "test_b.py::test_medium",
+              "test_b.py::test_unknown", "test_c.py::test_longest"]
+ESTIMATES = {"test_a.py::test_short": 1.0, "test_a.py::test_long": 8.0, "test_b.py::test_medium": 4.0,
+             "test_c.py::test_longest": 20.0}
+
+
+def _schedule(workers: int = 2, **kwargs):
+    scheduler = DurationScheduling(_Config(workers), estimates=ESTIMATES, **kwargs)
+    nodes = [_Node(f"gw{index}") for index in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, COLLECTION)
+    scheduler.schedule()
+    return scheduler, nodes
+
+
+def _sent(nodes):
+    return [[COLLECTION[index] for index in node.sent] for node in nodes]
+
+
+class TestPredictMakespan:
+
+    def test_lpt_beats_dispatch_order(self):
+        durations = [3, 3, 3, 4, 5]
+        assert predict_makespan(durations, 2, lpt=False) == 11
+        assert predict_makespan(durations, 2) == 10
+
+    def test_single_worker_runs_everything(self):
+        assert predict_makespan([1, 2, 3], 0) == 6
+
+
+class TestDurationScheduling:
+
+    def test_longest_tests_are_sent_first(self):
+        scheduler, nodes = _schedule()
+
+        # Unknown tests take the median of the known estimates
+        assert scheduler.estimate("test_b.py::test_unknown") == 8.0
+        assert _sent(nodes) == [["test_c.py::test_longest", "test_a.py::test_long"],
+                                ["test_b.py::test_unknown", "test_b.py::test_medium"]]
+        assert scheduler.unknown_tests == 1
+
+    def test_first_idle_worker_gets_the_next_longest_test(self):
+        scheduler, nodes = _schedule()
+
+        scheduler.mark_test_complete(nodes[1], nodes[1].sent[0], duration=8.0)
+        assert _sent(nodes)[1][-1] == "test_a.py::test_short"
+        assert not scheduler.pending
+
+        scheduler.mark_test_complete(nodes[0], nodes[0].sent[0], duration=20.0)
+        assert nodes[0].shutting_down
+
+    def test_predicted_makespan(self):
+        scheduler, _ = _schedule()
+        assert scheduler.predicted_makespan == predict_makespan(
+            [ESTIMATES.get(nodeid, 8.0) for nodeid in COLLECTION], 2
+        )
+
+    def test_priority_takes_precedence(self):
+        _, nodes = _schedule(priority=lambda nodeid: nodeid == "test_a.py::test_short")
+        assert _sent(nodes)[0] == ["test_a.py::test_short", "test_c.py::test_longest"]
+
+    def test_crashed_node_tests_are_resorted(self):
+        scheduler, nodes = _schedule()
+
+        # The running test crashed the node, the one it held next goes back to pending
+        assert scheduler.remove_node(nodes[0]) == "test_c.py::test_longest"
+        assert [COLLECTION[index] for index in scheduler.pending] == ["test_a.py::test_long", "test_a.py::test_short"]
@@ -1,6 +1,7 @@
 import pytest
 import allure
 from framework.pages.web.google_page import GooglePage
+from framework.utils.soft_assert import text_contains
 
 
 @allure.feature("Search Functionality")
@@ -18,12 +19,12 @@ class TestGoogleSearch:
             google_page.search("Selenium with Python")
         
         with allure.step("Verify search results"):
-            google_page.soft_assert.assert_true(
-                google_page.is_element_visible(*GooglePage.FIRST_RESULT),
-                "Search results should be visible"
+            google_page.soft_assert.expect_page(
+                google_page,
+                {GooglePage.FIRST_RESULT: ["visible", text_contains("Selenium")]},
+                "Search results should be visible",
+                timeout=10
             )
-            first_result = google_page.get_first_result_text()
-            google_page.soft_assert.assert_that(first_result).contains("Selenium")
             google_page.soft_assert.verify_all()
 
     @allure.story("Search with Playwright")
@@ -38,10 +39,10 @@ class TestGoogleSearch:
             google_page.search("Playwright with Python")
         
         with allure.step("Verify search results"):
-            google_page.soft_assert.assert_true(
-                google_page.is_element_visible(*GooglePage.FIRST_RESULT),
-                "Search results should be visible"
+            google_page.soft_assert.expect_page(
+                google_page,
+                {GooglePage.FIRST_RESULT: ["visible", text_contains("Playwright")]},
+                "Search results should be visible",
+                timeout=10
             )
-            first_result = google_page.get_first_result_text()
-            google_page.soft_assert.assert_that(first_result).contains("Playwright")
             google_page.soft_assert.verify_all() 
\ No newline at end of file
@@ -0,0 +1,346 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import time
+import zlib
+from typing import Any, Dict, List
+
+import pytest
+
+try:
+    import allure_commons
+    from allure_commons import hookimpl
+    from allure_commons.logger import AllureFileLogger
+except ImportError:
+    allure_commons = None
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ATTACHMENT_SUFFIX = "-attachment"
+REPORT_FILE_PATTERNS = ("*-result.json", "*-container.json", "*-globals.json")
+
+
+def recompress_png(data: bytes, level: int = 9) -> bytes:
+    """
+    Losslessly re-deflate the image data of a PNG at the highest zlib level. Browser and
+    device screenshots are encoded for speed, so this usually saves 10-30%, at several
+    hundred milliseconds per full HD screenshot; see compress_attachments.
+    :return: The smaller encoding, the input if it is not a PNG or does not shrink
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    chunks, image_data = [], []
+    position = len(PNG_SIGNATURE)
+    try:
+        while position < len(data):
+            length, kind = struct.unpack(">I4s", data[position:position + 8])
+            body = data[position + 8:position + 8 + length]
+            position += length + 12
+            if kind == b"IDAT":
+                if not image_data:
+                    chunks.append((kind, None))
+                image_data.append(body)
+            else:
+                chunks.append((kind, body))
+        pixels = zlib.decompress(b"".join(image_data))
+    except (struct.error, zlib.error):
+        return data
+    encoded = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        if body is None:
+            body = zlib.compress(pixels, level)
+        encoded.append(struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body)))
+    recompressed = b"".join(encoded)
+    return recompressed if len(recompressed) < len(data) else data
+
+
+if allure_commons is not None:
+    class ContentAddressedFileLogger(AllureFileLogger):
+        """
+        Allure file logger writing each distinct attachment once, named by the SHA-256 of its
+        content. Later attachments with the same content only reference the existing blob:
+        the attachment sources are rewritten when their result or container is written.
+        Blobs are written atomically, so xdist workers can share the results directory.
+        """
+
+        def __init__(self, report_dir: str):
+            """
+            :param report_dir: Allure results directory
+            """
+            super().__init__(report_dir)
+            self.sources: Dict[str, str] = {}
+            self.stats = {"attachments": 0, "blobs_written": 0, "bytes": 0, "bytes_written": 0}
+
+        @hookimpl
+        def report_attached_data(self, body, file_name):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()
+            self.sources[file_name] = self._store(digest, file_name, len(body), lambda: body)
+
+        @hookimpl
+        def report_attached_file(self, source, file_name):
+            digest = hashlib.sha256()
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+
+            def read():
+                with open(source, "rb") as f:
+                    return f.read()
+
+            self.sources[file_name] = self._store(digest.hexdigest(), file_name, os.path.getsize(source), read,
+                                                  source=source)
+
+        @hookimpl
+        def report_result(self, result):
+            self._rewrite_sources(result)
+            super().report_result(result)
+
+        @hookimpl
+        def report_container(self, container):
+            self._rewrite_sources(container)
+            super().report_container(container)
+
+        @hookimpl
+        def report_globals(self, globals_item):
+            self._rewrite_sources(globals_item)
+            super().report_globals(globals_item)
+
+        def _store(self, digest: str, file_name: str, size: int, read, source: str = None) -> str:
+            """
+            Write the blob of an attachment unless it exists
+            :param read: Returns the attachment content, only called when the blob is written
+            :param source: File to copy instead of writing the content
+            :return: File name of the blob
+            """
+            extension = file_name.partition(ATTACHMENT_SUFFIX)[2]
+            blob_name = f"{digest}{ATTACHMENT_SUFFIX}{extension}"
+            destination = self._report_dir / blob_name
+            self.stats["attachments"] += 1
+            self.stats["bytes"] += size
+            if destination.exists():
+                return blob_name
+
+            temporary = self._report_dir / f"{blob_name}.{os.getpid()}.tmp"
+            if source is not None:
+                shutil.copyfile(source, temporary)
+            else:
+                with open(temporary, "wb") as f:
+                    f.write(read())
+            os.replace(temporary, destination)
+            self.stats["blobs_written"] += 1
+            self.stats["bytes_written"] += destination.stat().st_size
+            return blob_name
+
+        def _rewrite_sources(self, item: Any):
+            """Point the attachments of an item, its steps and fixtures to their blobs"""
+            for attachment in getattr(item, "attachments", None) or []:
+                attachment.source = self.sources.pop(attachment.source, attachment.source)
+            for child in (getattr(item, "steps", None) or []) + (getattr(item, "befores", None) or []) + \
+                    (getattr(item, "afters", None) or []):
+                self._rewrite_sources(child)
+
+
+class AttachmentStorePlugin:
+    """
+    pytest plugin swapping allure-pytest's file logger for a ContentAddressedFileLogger.
+    The swap happens at session start, after allure-pytest registered its logger, and is
+    undone at cleanup so allure-pytest unregisters its own logger as usual.
+
+    With compress, PNG blobs are recompressed by a detached process once the session
+    finishes, so the slow encoding never runs in a test's teardown.
+    """
+
+    def __init__(self, compress: bool = False, worker_id: str = "main"):
+        self.compress = compress
+        self.worker_id = worker_id
+        self.logger = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionstart(self, session):
+        report_dir = getattr(session.config.option, "allure_report_dir", None)
+        if allure_commons is None or not report_dir:
+            return
+        manager = allure_commons.plugin_manager
+        for plugin in manager.get_plugins():
+            if type(plugin) is AllureFileLogger:
+                name = manager.get_name(plugin)
+                self.logger = ContentAddressedFileLogger(os.path.abspath(report_dir))
+                manager.unregister(plugin)
+                manager.register(self.logger)
+
+                def restore(original=plugin, original_name=name):
+                    manager.unregister(self.logger)
+                    manager.register(original, original_name)
+
+                session.config.add_cleanup(restore)
+                break
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        report_dir = getattr(session.config.option, "allure_report_dir", None)
+        # The controller starts it after the workers finished writing blobs
+        if self.compress and report_dir and not hasattr(session.config, "workerinput"):
+            compress_in_background(report_dir)
+        if self.logger is None or not self.logger.stats["attachments"]:
+            return
+        stats = dict(self.logger.stats, dedup_ratio=dedup_ratio(self.logger.stats))
+        session.config.results_store.update_run_info(session.config.run_id, {"attachments": {self.worker_id: stats}})
+        print(f"Attachments on {self.worker_id}: {stats['attachments']} attached, "
+              f"{stats['blobs_written']} written, {_mb(stats['bytes'])} -> {_mb(stats['bytes_written'])} "
+              f"(dedup ratio {stats['dedup_ratio']:.1f}x)")
+
+
+def dedup_ratio(stats: Dict[str, int]) -> float:
+    """Attached bytes per byte written to disk"""
+    return stats["bytes"] / stats["bytes_written"] if stats["bytes_written"] else float(bool(stats["bytes"]))
+
+
+def referenced_sources(results_dir: str) -> Dict[str, int]:
+    """Count the references to each attachment file from the results, containers and globals"""
+    references: Dict[str, int] = {}
+
+    def collect(item: Any):
+        if isinstance(item, dict):
+            for attachment in item.get("attachments", []):
+                if "source" in attachment:
+                    references[attachment["source"]] = references.get(attachment["source"], 0) + 1
+            for key in ("steps", "befores", "afters"):
+                for child in item.get(key, []):
+                    collect(child)
+
+    for pattern in REPORT_FILE_PATTERNS:
+        for path in glob.glob(os.path.join(results_dir, pattern)):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    collect(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return references
+
+
+def attachment_files(results_dir: str) -> List[str]:
+    return [path for path in glob.glob(os.path.join(results_dir, f"*{ATTACHMENT_SUFFIX}*"))
+            if not path.endswith(".tmp")]
+
+
+def directory_stats(results_dir: str) -> Dict[str, Any]:
+    """Deduplication statistics of an allure results directory"""
+    references = referenced_sources(results_dir)
+    stats = {"attachments": sum(references.values()), "blobs_written": 0, "bytes": 0, "bytes_written": 0,
+             "unreferenced": 0}
+    for path in attachment_files(results_dir):
+        size = os.path.getsize(path)
+        count = references.get(os.path.basename(path), 0)
+        stats["blobs_written"] += 1
+        stats["bytes_written"] += size
+        stats["bytes"] += size * count
+        stats["unreferenced"] += count == 0
+    stats["dedup_ratio"] = dedup_ratio(stats)
+    return stats
+
+
+def collect_garbage(results_dir: str, min_age: float = 3600, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete attachment files no result, container or globals file references
+    :param min_age: Seconds a file must be old, protects blobs of tests still running
+    :param dry_run: Only count what would be deleted
+    :return: Number and bytes of the deleted files
+    """
+    references = referenced_sources(results_dir)
+    cutoff = time.time() - min_age
+    removed = {"files": 0, "bytes": 0}
+    for path in attachment_files(results_dir):
+        if os.path.basename(path) in references or os.path.getmtime(path) > cutoff:
+            continue
+        removed["files"] += 1
+        removed["bytes"] += os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+    return removed
+
+
+def compress_attachments(results_dir: str, level: int = 9) -> Dict[str, int]:
+    """
+    Recompress the PNG attachments of a results directory in place, see recompress_png.
+    Blobs keep their names, which are the digests of the content as attached.
+    :return: Number of recompressed files and the bytes saved
+    """
+    compressed = {"files": 0, "bytes_saved": 0}
+    for path in attachment_files(results_dir):
+        if not path.endswith(".png"):
+            continue
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        body = recompress_png(data, level)
+        if len(body) == len(data):
+            continue
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(body)
+        os.replace(temporary, path)
+        compressed["files"] += 1
+        compressed["bytes_saved"] += len(data) - len(body)
+    return compressed
+
+
+def compress_in_background(results_dir: str) -> subprocess.Popen:
+    """
+    Recompress the PNG attachments of a results directory in a detached process, so the
+    test session can exit
+    :return: Compression process, its output goes to attachment_compress.log next to results_dir
+    """
+    log_path = os.path.join(os.path.dirname(os.path.abspath(results_dir)), "attachment_compress.log")
+    with open(log_path, "a") as log:
+        return subprocess.Popen(
+            [sys.executable, "-m", "framework.utils.attachment_store", "compress", "--results-dir", results_dir],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 ** 2:.1f}MB"
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Maintain an allure results directory:
+        python -m framework.utils.attachment_store stats
+        python -m framework.utils.attachment_store gc [--min-age SECONDS] [--dry-run]
+        python -m framework.utils.attachment_store compress
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.attachment_store")
+    parser.add_argument("command", choices=["stats", "gc", "compress"])
+    parser.add_argument("--results-dir", default="framework/reports/allure-results")
+    parser.add_argument("--min-age", type=float, default=3600,
+                        help="Only collect attachments older than this many seconds")
+    parser.add_argument("--dry-run", action="store_true", help="Report what gc would delete")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        stats = directory_stats(args.results_dir)
+        print(f"{stats['attachments']} attachments stored in {stats['blobs_written']} files, "
+              f"{_mb(stats['bytes'])} -> {_mb(stats['bytes_written'])} (dedup ratio {stats['dedup_ratio']:.1f}x), "
+              f"{stats['unreferenced']} unreferenced")
+        return 0
+    if args.command == "compress":
+        compressed = compress_attachments(args.results_dir)
+        print(f"Recompressed {compressed['files']} PNG attachments, saved {_mb(compressed['bytes_saved'])}")
+        return 0
+    removed = collect_garbage(args.results_dir, args.min_age, args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {removed['files']} unreferenced attachments ({_mb(removed['bytes'])})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
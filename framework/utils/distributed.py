@@ -0,0 +1,481 @@
+import argparse
+import datetime
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from framework.utils.results_store import ResultsStore
+from framework.utils.timing import summarize_phases
+
+
+# Run info a node sends at registration; the coordinator stores it so distributed runs
+# are compared with the baselines of the same platform, browser and environment
+RUN_INFO_KEYS = ("platform", "browser", "environment", "launch_profile", "video_recording",
+                 "performance_monitoring", "regression_runs")
+
+
+class WorkQueue:
+    """
+    Test queue of the coordinator. Nodes pull batches of tests and run them in order, so
+    the first test assigned to a node is the one it is running and the second one is
+    already its pytest nextitem. An idle node steals half of the tests behind those two
+    from the busiest node's batch, and the tests of nodes that stop sending heartbeats go
+    back to the front of the queue.
+    """
+
+    def __init__(self, batch_size: int = 4, heartbeat_timeout: float = 30.0,
+                 estimates: Dict[str, float] = None):
+        """
+        :param batch_size: Maximum number of tests per pull
+        :param heartbeat_timeout: Seconds without contact after which a node is dead
+        :param estimates: Historical duration per node id, longest tests are queued first
+        """
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.estimates = estimates or {}
+        self.collection: Optional[List[str]] = None
+        self.pending: Deque[str] = deque()
+        self.assigned: Dict[str, List[str]] = {}
+        self.revoked: Dict[str, Set[str]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.steals = 0
+        self.requeued = 0
+        self.lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        """Whether every collected test has a result"""
+        return self.collection is not None and len(self.results) == len(self.collection)
+
+    def register(self, node_id: str, collection: List[str]):
+        """
+        Register a node with its collected tests. The first node defines the queue.
+        :raises ValueError: If the node collected different tests
+        """
+        with self.lock:
+            if self.collection is None:
+                self.collection = list(collection)
+                self.pending.extend(sorted(collection, key=lambda nodeid: self.estimates.get(nodeid, 0.0),
+                                           reverse=True))
+            elif set(collection) != set(self.collection):
+                raise ValueError(f"Node {node_id} collected {len(collection)} tests, "
+                                 f"expected the {len(self.collection)} tests of the first node")
+            # A restarted node gives up whatever it held before
+            self._requeue(node_id)
+            self.nodes[node_id] = {"last_seen": time.monotonic(), "alive": True, "finished": False,
+                                   "completed": 0, "stolen_from": 0}
+
+    def pull(self, node_id: str, max_tests: int = None) -> Tuple[List[str], bool]:
+        """
+        Assign the next tests to a node
+        :return: Tuple of (tests to run, whether all tests are done)
+        """
+        with self.lock:
+            self._touch(node_id)
+            count = min(max_tests or self.batch_size, self.batch_size)
+            tests = [self.pending.popleft() for _ in range(min(count, len(self.pending)))]
+            if not tests:
+                tests = self._steal(node_id)
+            self.assigned.setdefault(node_id, []).extend(tests)
+            # A requeued test can come back to the node it was revoked from
+            self.revoked.get(node_id, set()).difference_update(tests)
+            if self.done:
+                self.nodes[node_id]["finished"] = True
+            return tests, self.done
+
+    def complete(self, node_id: str, nodeid: str, result: Dict[str, Any]) -> bool:
+        """
+        Record the result of a test
+        :return: False if the test already had a result from another node
+        """
+        with self.lock:
+            self._touch(node_id)
+            if nodeid in self.assigned.get(node_id, []):
+                self.assigned[node_id].remove(nodeid)
+            if nodeid in self.results:
+                return False
+            if nodeid in self.pending:
+                self.pending.remove(nodeid)
+            self.results[nodeid] = dict(result, node=node_id)
+            self.nodes[node_id]["completed"] += 1
+            return True
+
+    def take_revoked(self, node_id: str) -> List[str]:
+        """Get and clear the tests that were taken away from a node"""
+        with self.lock:
+            return sorted(self.revoked.pop(node_id, set()))
+
+    def heartbeat(self, node_id: str):
+        with self.lock:
+            self._touch(node_id)
+
+    def reap(self, now: float = None) -> List[str]:
+        """
+        Requeue the tests of nodes that stopped sending heartbeats
+        :return: Ids of the nodes declared dead
+        """
+        now = time.monotonic() if now is None else now
+        dead = []
+        with self.lock:
+            for node_id, node in self.nodes.items():
+                if node["alive"] and not node["finished"] and now - node["last_seen"] > self.heartbeat_timeout:
+                    node["alive"] = False
+                    self._requeue(node_id)
+                    dead.append(node_id)
+        return dead
+
+    def all_nodes_finished(self) -> bool:
+        """Whether every live node has been told the run is done"""
+        with self.lock:
+            return all(node["finished"] or not node["alive"] for node in self.nodes.values())
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            outcomes: Dict[str, int] = {}
+            for result in self.results.values():
+                outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+            return {
+                "total_tests": len(self.collection or []),
+                "completed": len(self.results),
+                "pending": len(self.pending),
+                "running": {node_id: len(tests) for node_id, tests in self.assigned.items() if tests},
+                "outcomes": outcomes,
+                "steals": self.steals,
+                "requeued": self.requeued,
+                "nodes": {node_id: {"alive": node["alive"], "completed": node["completed"],
+                                    "stolen_from": node["stolen_from"]}
+                          for node_id, node in self.nodes.items()}
+            }
+
+    def _touch(self, node_id: str):
+        node = self.nodes.get(node_id)
+        if node is None:
+            raise ValueError(f"Unknown node {node_id}, register first")
+        node["last_seen"] = time.monotonic()
+        node["alive"] = True
+
+    def _steal(self, thief: str) -> List[str]:
+        # The head of a batch is running and the next test is its nextitem, whose module and
+        # class fixtures pytest keeps up; only the tests behind those two can move
+        victims = [(len(tests), node_id) for node_id, tests in self.assigned.items()
+                   if node_id != thief and len(tests) > 2 and self.nodes[node_id]["alive"]]
+        if not victims:
+            return []
+        size, victim = max(victims)
+        count = max(1, (size - 2) // 2)
+        stolen = self.assigned[victim][-count:]
+        del self.assigned[victim][-count:]
+        self.revoked.setdefault(victim, set()).update(stolen)
+        self.nodes[victim]["stolen_from"] += len(stolen)
+        self.steals += 1
+        return stolen
+
+    def _requeue(self, node_id: str):
+        tests = [nodeid for nodeid in self.assigned.pop(node_id, []) if nodeid not in self.results]
+        if tests:
+            self.pending.extendleft(reversed(tests))
+            self.revoked.setdefault(node_id, set()).update(tests)
+            self.requeued += len(tests)
+
+
+class Coordinator:
+    """
+    HTTP coordinator of a distributed run. Nodes register their collection, pull
+    batches, post results and heartbeats; results are aggregated into the coordinator's
+    results store, the only place they are recorded.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 5000, batch_size: int = 4,
+                 heartbeat_timeout: float = 30.0, store: Optional[ResultsStore] = None):
+        self.store = store
+        estimates = store.get_duration_estimates() if store else {}
+        self.queue = WorkQueue(batch_size, heartbeat_timeout, estimates)
+        self.server = ThreadingHTTPServer((host, port), _CoordinatorHandler)
+        self.server.coordinator = self
+        self.run_id = None
+        if store:
+            self.run_id = store.start_run({
+                "start_time": datetime.datetime.now().isoformat(),
+                "distributed": True,
+                "coordinator": self.address
+            })
+        self._stopped = threading.Event()
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def handle(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one request, ValueError is returned to the node as a conflict"""
+        if path == "/status":
+            return self.queue.summary()
+        node_id = payload["node_id"]
+        if path == "/register":
+            first = self.queue.collection is None
+            self.queue.register(node_id, payload["collection"])
+            if first and self.store:
+                run_info = payload.get("run_info") or {}
+                self.store.update_run_info(self.run_id, {key: run_info[key] for key in RUN_INFO_KEYS
+                                                         if key in run_info})
+            return {"run_id": self.run_id}
+        if path == "/heartbeat":
+            self.queue.heartbeat(node_id)
+            return {"revoked": self.queue.take_revoked(node_id)}
+        if path == "/pull":
+            tests, done = self.queue.pull(node_id, payload.get("max_tests"))
+            return {"tests": tests, "done": done, "revoked": self.queue.take_revoked(node_id)}
+        if path == "/result":
+            result = payload["result"]
+            if self.queue.complete(node_id, payload["nodeid"], result) and self.store:
+                self.store.record_test(
+                    self.run_id, payload["nodeid"], result["outcome"], result["phases"],
+                    duration=result.get("duration"), worker=node_id, retries=result.get("retries", 0),
+                    flaky=result.get("flaky", False), metrics=result.get("metrics"), markers=result.get("markers")
+                )
+            return {"revoked": self.queue.take_revoked(node_id)}
+        raise KeyError(path)
+
+    def serve(self, poll_interval: float = 1.0) -> Dict[str, Any]:
+        """
+        Serve until every test has a result and every live node has been told so
+        :return: Summary of the run
+        """
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            while not self._stopped.wait(poll_interval):
+                for node_id in self.queue.reap():
+                    print(f"Node {node_id} stopped sending heartbeats, its tests were requeued")
+                if self.queue.done and self.queue.all_nodes_finished():
+                    break
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+
+        summary = self.queue.summary()
+        if self.store:
+            self.store.update_run_info(self.run_id, {"distribution": summary})
+            self.store.finish_run(self.run_id, 1 if summary["outcomes"].get("failed") else 0)
+        return summary
+
+    def stop(self):
+        self._stopped.set()
+
+
+class _CoordinatorHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._respond({})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._respond(json.loads(self.rfile.read(length) or b"{}"))
+
+    def _respond(self, payload: Dict[str, Any]):
+        try:
+            status, body = 200, self.server.coordinator.handle(self.path, payload)
+        except KeyError:
+            status, body = 404, {"error": f"Unknown endpoint {self.path}"}
+        except ValueError as e:
+            status, body = 409, {"error": str(e)}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CoordinatorClient:
+    """Node side of the coordinator protocol"""
+
+    def __init__(self, address: str, node_id: str, timeout: float = 30.0, attempts: int = 5):
+        self.url = address if address.startswith("http") else f"http://{address}"
+        self.node_id = node_id
+        self.timeout = timeout
+        self.attempts = attempts
+
+    def register(self, collection: List[str], run_info: Dict[str, Any] = None) -> Dict[str, Any]:
+        return self._post("/register", {"collection": collection, "run_info": run_info or {}})
+
+    def pull(self, max_tests: int = None) -> Dict[str, Any]:
+        return self._post("/pull", {"max_tests": max_tests})
+
+    def complete(self, nodeid: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        return self._post("/result", {"nodeid": nodeid, "result": result})
+
+    def heartbeat(self) -> Dict[str, Any]:
+        return self._post("/heartbeat", {})
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps(dict(payload, node_id=self.node_id)).encode()
+        for attempt in range(self.attempts):
+            request = urllib.request.Request(self.url + path, data=data,
+                                             headers={"Content-Type": "application/json"})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                raise ValueError(json.loads(e.read()).get("error", str(e)))
+            except urllib.error.URLError:
+                if attempt == self.attempts - 1:
+                    raise
+                time.sleep(2 ** attempt * 0.5)
+
+
+class DistributedNodePlugin:
+    """
+    pytest plugin replacing the run loop of a node: tests are pulled from the
+    coordinator in batches instead of running the local collection.
+    """
+
+    def __init__(self, address: str, node_id: str, batch_size: int = 4,
+                 heartbeat_interval: float = 5.0, idle_interval: float = 1.0,
+                 run_info: Dict[str, Any] = None):
+        """
+        :param address: Coordinator host:port
+        :param node_id: Name of this node
+        :param batch_size: Tests pulled at once
+        :param heartbeat_interval: Seconds between heartbeats
+        :param idle_interval: Seconds between pulls while other nodes hold all work
+        :param run_info: Run info of the node, the coordinator records it for the run
+        """
+        self.client = CoordinatorClient(address, node_id)
+        self.run_info = {key: run_info[key] for key in RUN_INFO_KEYS if key in (run_info or {})}
+        self.batch_size = batch_size
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_interval = idle_interval
+        self._revoked: Set[str] = set()
+        self._stop = threading.Event()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} errors during collection")
+        if session.config.option.collectonly:
+            return True
+
+        items = {item.nodeid: item for item in session.items}
+        try:
+            self.client.register(list(items), self.run_info)
+        except ValueError as e:
+            raise pytest.UsageError(f"Coordinator rejected node: {e}")
+
+        heartbeat = threading.Thread(target=self._send_heartbeats, daemon=True)
+        heartbeat.start()
+        queue: Deque[str] = deque()
+        done = False
+        try:
+            while True:
+                # Fetch the next batch before the last test runs so fixtures stay up between batches
+                if len(queue) <= 1 and not done:
+                    response = self.client.pull(self.batch_size)
+                    self._revoked.update(response["revoked"])
+                    self._revoked.difference_update(response["tests"])
+                    queue.extend(response["tests"])
+                    done = response["done"]
+                queue = deque(nodeid for nodeid in queue if nodeid not in self._revoked)
+                if not queue:
+                    if done:
+                        break
+                    # Other nodes are still running, wait for stealable or requeued work
+                    time.sleep(self.idle_interval)
+                    continue
+
+                item = items[queue.popleft()]
+                nextitem = items[queue[0]] if queue else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+                if session.shouldfail:
+                    raise session.Failed(session.shouldfail)
+                if session.shouldstop:
+                    raise session.Interrupted(session.shouldstop)
+
+                # The node stores nothing itself, the coordinator records the result with its metrics
+                result = getattr(item, "test_result", None)
+                if result is None:
+                    phases, outcome = summarize_phases(item)
+                    result = {"outcome": outcome, "phases": phases,
+                              "flaky": item.get_closest_marker("flaky") is not None}
+                response = self.client.complete(item.nodeid, dict(result, duration=sum(result["phases"].values())))
+                self._revoked.update(response["revoked"])
+        finally:
+            self._stop.set()
+        return True
+
+    def _send_heartbeats(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self._revoked.update(self.client.heartbeat()["revoked"])
+            except (ValueError, urllib.error.URLError):
+                pass
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Command line entry point.
+
+    Coordinator for remote nodes:
+        python -m framework.utils.distributed coordinator --port 5000
+        pytest --distributed --master <host>:5000 --node-id <name>   (on every node)
+
+    Coordinator and local node processes:
+        python -m framework.utils.distributed local --nodes 3 -- -m web   (pytest arguments after --)
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.distributed")
+    parser.add_argument("command", choices=["coordinator", "local"])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--heartbeat-timeout", type=float, default=30.0)
+    parser.add_argument("--nodes", type=int, default=2, help="Number of local node processes")
+    parser.add_argument("--db", default="framework/reports/results.db", help="Results database of the coordinator")
+    argv = sys.argv[1:] if argv is None else argv
+    pytest_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+
+    local = args.command == "local"
+    coordinator = Coordinator(
+        "127.0.0.1" if local else args.host,
+        0 if local else args.port,
+        batch_size=args.batch_size,
+        heartbeat_timeout=args.heartbeat_timeout,
+        store=ResultsStore(args.db)
+    )
+    print(f"Coordinator listening on {coordinator.address}")
+
+    processes = []
+    if local:
+        for index in range(args.nodes):
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "pytest", "--distributed", "--master", coordinator.address,
+                "--node-id", f"local-{index}", *pytest_args
+            ]))
+
+        def stop_when_nodes_exit():
+            for process in processes:
+                process.wait()
+            coordinator.stop()
+        threading.Thread(target=stop_when_nodes_exit, daemon=True).start()
+
+    summary = coordinator.serve()
+    print(json.dumps(summary, indent=2))
+    node_failed = any(process.wait() not in (0, 1) for process in processes)
+    incomplete = not summary["nodes"] or summary["completed"] < summary["total_tests"]
+    return 1 if summary["outcomes"].get("failed") or node_failed or incomplete else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+PHASES = ("setup", "call", "teardown")
+
+
+def split_nodeid(nodeid: str) -> Tuple[str, Optional[str]]:
+    """Get the module and the class (None for module level tests) of a node id"""
+    parts = nodeid.split("::")
+    return parts[0], "::".join(parts[:-1]) if len(parts) > 2 else None
+
+
+def group_percentiles(labels: Sequence[str], values: np.ndarray, top: int = None) -> List[Dict[str, Any]]:
+    """
+    Duration percentiles per group, computed for all groups at once: the values are sorted
+    by (group, value) and each percentile is interpolated linearly inside its group's slice,
+    as numpy.percentile does
+    :param labels: Group of each value
+    :param values: Values to aggregate
+    :param top: Only return the groups with the largest total
+    :return: Groups with name, count, total, mean and the PERCENTILES, largest total first
+    """
+    if not len(values):
+        return []
+    names, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse, minlength=len(names))
+    totals = np.bincount(inverse, weights=values, minlength=len(names))
+    ordered = values[np.lexsort((values, inverse))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    columns = {}
+    for percentile in PERCENTILES:
+        position = starts + (counts - 1) * percentile / 100
+        lower = np.floor(position).astype(int)
+        upper = np.minimum(lower + 1, starts + counts - 1)
+        columns[f"p{percentile}"] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    order = np.argsort(-totals, kind="stable")[:top]
+    return [
+        dict(
+            {"name": str(names[index]), "count": int(counts[index]), "total": round(float(totals[index]), 3),
+             "mean": round(float(totals[index] / counts[index]), 3)},
+            **{name: round(float(column[index]), 3) for name, column in columns.items()}
+        )
+        for index in order
+    ]
+
+
+def summarize_run(tests: List[Dict[str, Any]], markers: Dict[int, List[str]] = None, platform: str = None,
+                  top: int = 20) -> Dict[str, Any]:
+    """
+    Duration statistics of a run for the run report
+    :param tests: Stored test results, see ResultsStore.get_tests
+    :param markers: Marker names by test id, see ResultsStore.get_markers
+    :param platform: Platform of the run
+    :param top: Rows in the top-N tables
+    :return: Overall and per phase percentiles, percentiles by module, class, marker and
+        platform, the slowest tests and the tests spending more time in setup than in the body
+    """
+    tests = [test for test in tests if test["duration"] is not None]
+    if not tests:
+        return {}
+    markers = markers or {}
+    durations = np.array([test["duration"] for test in tests], dtype=float)
+    phases = np.array([[test[f"{phase}_duration"] or 0.0 for phase in PHASES] for test in tests], dtype=float)
+    modules, classes = zip(*(split_nodeid(test["nodeid"]) for test in tests))
+
+    in_class = np.array([name is not None for name in classes])
+    marker_rows = [(name, index) for index, test in enumerate(tests) for name in markers.get(test["id"], [])]
+    marker_names, marker_index = zip(*marker_rows) if marker_rows else ((), ())
+
+    phase_totals = phases.sum(axis=0)
+    phase_percentiles = np.percentile(phases, PERCENTILES, axis=0)
+    setup_bound = np.flatnonzero(phases[:, 0] > phases[:, 1])
+
+    def rows(indexes) -> List[Dict[str, Any]]:
+        return [
+            dict({"nodeid": tests[index]["nodeid"], "outcome": tests[index]["outcome"],
+                  "duration": round(float(durations[index]), 3)},
+                 **{phase: round(float(phases[index, column]), 3) for column, phase in enumerate(PHASES)})
+            for index in indexes
+        ]
+
+    return {
+        "count": len(tests),
+        "total": round(float(durations.sum()), 3),
+        "percentiles": {f"p{percentile}": round(float(value), 3)
+                        for percentile, value in zip(PERCENTILES, np.percentile(durations, PERCENTILES))},
+        "phases": [
+            dict({"phase": phase, "total": round(float(phase_totals[column]), 3),
+                  "share": round(float(phase_totals[column] / phase_totals.sum()), 3) if phase_totals.sum() else 0.0},
+                 **{f"p{percentile}": round(float(phase_percentiles[row, column]), 3)
+                    for row, percentile in enumerate(PERCENTILES)})
+            for column, phase in enumerate(PHASES)
+        ],
+        "by_module": group_percentiles(modules, durations, top),
+        "by_class": group_percentiles(np.asarray(classes, dtype=object)[in_class].astype(str),
+                                      durations[in_class], top),
+        "by_marker": group_percentiles(marker_names, durations[list(marker_index)], top),
+        "by_platform": group_percentiles([platform or "unknown"] * len(tests), durations, top),
+        "slowest": rows(np.argsort(-durations, kind="stable")[:top]),
+        "setup_bound": rows(setup_bound[np.argsort(-phases[setup_bound, 0], kind="stable")][:top])
+    }
+
+
+def compact_timeline(tests: List[Dict[str, Any]], start_time: str) -> Dict[str, Any]:
+    """
+    Timeline of a run as parallel columns, the run report pages through it client side.
+    Tests are stored when they finish, so each test starts its duration before its timestamp.
+    :param tests: Stored test results, see ResultsStore.get_tests
+    :param start_time: Start time of the run
+    :return: Node ids, start offsets and durations in seconds, outcome and worker codes
+        with their names; ordered by start
+    """
+    tests = [test for test in tests if test["timestamp"]]
+    if not tests:
+        return {"nodeids": [], "starts": [], "durations": [], "outcomes": [], "outcome_names": [],
+                "workers": [], "worker_names": [], "span": 0}
+    finished = np.array([test["timestamp"] for test in tests], dtype="datetime64[ms]")
+    durations = np.array([test["duration"] or 0.0 for test in tests], dtype=float)
+    starts = (finished - np.datetime64(start_time, "ms")) / np.timedelta64(1, "s") - durations
+    starts = np.maximum(starts, 0.0)
+    order = np.argsort(starts, kind="stable")
+    outcome_names, outcomes = np.unique(np.array([test["outcome"] for test in tests], dtype=str), return_inverse=True)
+    worker_names, workers = np.unique(np.array([test["worker"] or "main" for test in tests], dtype=str),
+                                      return_inverse=True)
+    return {
+        "nodeids": [tests[index]["nodeid"] for index in order],
+        "starts": np.round(starts[order], 2).tolist(),
+        "durations": np.round(durations[order], 2).tolist(),
+        "outcomes": outcomes.ravel()[order].tolist(),
+        "outcome_names": outcome_names.tolist(),
+        "workers": workers.ravel()[order].tolist(),
+        "worker_names": worker_names.tolist(),
+        "span": round(float((starts + durations).max()), 2)
+    }
@@ -0,0 +1,282 @@
+import ast
+import functools
+import inspect
+import os
+import subprocess
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import pytest
+
+from framework.utils.patching import is_wrapper, mark_wrapper, patch
+from framework.utils.results_store import ResultsStore
+
+
+# Changes to these files can affect any test, so they disable selection
+GLOBAL_FILES = {"requirements.txt", "pytest.ini", "setup.cfg", ".env"}
+
+
+def repo_toplevel(path: str = ".") -> str:
+    """
+    Get the root of the git work tree containing path, so recorded and changed paths
+    match whatever directory pytest was started from
+    :return: Absolute path of the work tree, path itself outside a git repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"], cwd=path, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return os.path.abspath(path)
+
+
+class DependencyRecorder:
+    """
+    Records the page classes, page methods, locators and framework modules a test
+    exercises by wrapping the methods of every BasePage subclass.
+    """
+
+    def __init__(self, repo_root: str = None):
+        self.repo_root = os.path.abspath(repo_root or repo_toplevel())
+        self.current: Optional[Dict[str, Set[str]]] = None
+        self._locators: Dict[type, Dict[Any, str]] = {}
+        self._restore: List[Callable[[], None]] = []
+
+    def instrument(self, base_class: type):
+        """Wrap the public methods of base_class and all its subclasses"""
+        pending = [base_class]
+        while pending:
+            cls = pending.pop()
+            pending.extend(cls.__subclasses__())
+            for name, attr in list(vars(cls).items()):
+                if name.startswith("_") or not inspect.isfunction(attr) or is_wrapper(attr, "recorded"):
+                    continue
+                self._restore.append(patch(cls, name, self._wrap(attr, f"{cls.__name__}.{name}")))
+
+    def restore(self):
+        """Remove the wrappers added by instrument()"""
+        for restore in reversed(self._restore):
+            restore()
+        self._restore = []
+
+    def start(self, test_file: str, fixture_modules: Iterable[str] = ()):
+        """Start recording a test"""
+        self.current = {"class": set(), "method": set(), "locator": set(),
+                        "module": {test_file, *fixture_modules}}
+
+    def finish(self) -> Dict[str, Set[str]]:
+        """Stop recording and return the dependencies of the test"""
+        dependencies, self.current = self.current, None
+        return dependencies or {}
+
+    def _wrap(self, func, method_name: str):
+        recorder = self
+
+        @functools.wraps(func)
+        def wrapper(page, *args, **kwargs):
+            if recorder.current is not None:
+                recorder._record(page, method_name, args)
+            return func(page, *args, **kwargs)
+        return mark_wrapper(wrapper, "recorded")
+
+    def _record(self, page: Any, method_name: str, args: tuple):
+        page_class = type(page)
+        self.current["class"].add(page_class.__name__)
+        self.current["method"].add(method_name)
+        for cls in page_class.__mro__:
+            if cls.__module__.startswith("framework."):
+                self.current["module"].add(self.relative_path(sys.modules[cls.__module__].__file__))
+
+        # Locators are passed either as (by, value) or by value alone
+        locators = self._locator_index(page_class)
+        if len(args) >= 2 and (args[0], args[1]) in locators:
+            self.current["locator"].add(locators[(args[0], args[1])])
+        elif len(args) >= 2 and isinstance(args[1], str) and args[1] in locators:
+            self.current["locator"].add(locators[args[1]])
+
+    def _locator_index(self, page_class: type) -> Dict[Any, str]:
+        if page_class not in self._locators:
+            index = {}
+            for cls in reversed(page_class.__mro__):
+                for name, value in vars(cls).items():
+                    if not name.isupper():
+                        continue
+                    if isinstance(value, tuple) and len(value) == 2:
+                        index[value] = f"{cls.__name__}.{name}"
+                    elif isinstance(value, str):
+                        index[value] = f"{cls.__name__}.{name}"
+            self._locators[page_class] = index
+        return self._locators[page_class]
+
+    def relative_path(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.repo_root).replace(os.sep, "/")
+
+
+class ImpactAnalyzer:
+    """Finds the tests whose recorded dependencies did not change since a git ref"""
+
+    def __init__(self, store: ResultsStore, repo_root: str = None):
+        """
+        :param store: Results store holding the recorded dependencies
+        :param repo_root: Root of the git work tree, defaults to the one containing the working directory
+        """
+        self.store = store
+        self.repo_root = repo_root or repo_toplevel()
+
+    def unaffected_tests(self, ref: str) -> Set[str]:
+        """
+        Get the tests that can be skipped. Tests without recorded dependencies are
+        never skipped.
+        :param ref: Git ref to compare the working tree against
+        :return: Node ids of unaffected tests
+        """
+        changed_modules: Set[str] = set()
+        changed_pages: Dict[str, Optional[Set[str]]] = {}
+        for path in self.changed_files(ref):
+            if path in GLOBAL_FILES:
+                return set()
+            if not path.endswith(".py") or not path.startswith("framework/"):
+                continue
+            if path.startswith("framework/pages/"):
+                changed_pages[path] = self.changed_symbols(ref, path)
+            elif path.startswith("framework/core/") or (
+                    path.startswith("framework/tests/") and os.path.basename(path) != "conftest.py"):
+                changed_modules.add(path)
+            else:
+                # conftest, config and utils can change how every test runs
+                return set()
+
+        unaffected = set()
+        for nodeid, dependencies in self.store.get_test_dependencies().items():
+            modules = dependencies.get("module", set())
+            symbols = dependencies.get("method", set()) | dependencies.get("locator", set())
+            impacted = bool(modules & changed_modules)
+            for path, changed in changed_pages.items():
+                if path in modules and (changed is None or changed & symbols):
+                    impacted = True
+            if not impacted:
+                unaffected.add(nodeid)
+        return unaffected
+
+    def changed_files(self, ref: str) -> List[str]:
+        """Get tracked files changed since ref (including uncommitted changes) and untracked files"""
+        changed = self._git("diff", "--name-only", ref).splitlines()
+        untracked = self._git("ls-files", "--others", "--exclude-standard").splitlines()
+        return sorted(set(changed + untracked))
+
+    def changed_symbols(self, ref: str, path: str) -> Optional[Set[str]]:
+        """
+        Get the class attributes and methods that changed in a page module
+        :return: Names like 'GooglePage.search', None if the whole module is affected
+        """
+        try:
+            old_source = self._git("show", f"{ref}:{path}")
+        except subprocess.CalledProcessError:
+            return None
+        new_path = os.path.join(self.repo_root, path)
+        if not os.path.exists(new_path):
+            return None
+        with open(new_path) as f:
+            new_source = f.read()
+
+        old_symbols = _module_symbols(ast.parse(old_source))
+        new_tree = ast.parse(new_source)
+        new_symbols = _module_symbols(new_tree)
+        changed = {name for name in old_symbols.keys() | new_symbols.keys()
+                   if old_symbols.get(name) != new_symbols.get(name)}
+        # Module level code or class bases changed
+        if any("." not in name for name in changed):
+            return None
+
+        # A changed locator also affects every method of the class that references it
+        changed_attributes = {name.split(".", 1)[1] for name in changed if "." in name}
+        for node in new_tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    referenced = {n.attr for n in ast.walk(item) if isinstance(n, ast.Attribute)}
+                    if referenced & changed_attributes:
+                        changed.add(f"{node.name}.{item.name}")
+        return changed
+
+    def _git(self, *args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=self.repo_root, check=True, capture_output=True, text=True
+        ).stdout
+
+
+def _module_symbols(tree: ast.Module) -> Dict[str, str]:
+    """Map every class attribute and method to its AST dump, everything else goes to '<module>'"""
+    symbols: Dict[str, str] = {}
+    module_level = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            symbols[node.name] = ast.dump(ast.Tuple(elts=node.bases + node.decorator_list, ctx=ast.Load()))
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    # Docstring edits do not change behaviour
+                    body = [stmt for stmt in item.body if not _is_docstring(stmt)]
+                    symbols[f"{node.name}.{item.name}"] = ast.dump(
+                        ast.Tuple(elts=[item.args, *item.decorator_list, *body], ctx=ast.Load())
+                    )
+                elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                    targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            symbols[f"{node.name}.{target.id}"] = ast.dump(item.value)
+        elif not _is_docstring(node):
+            module_level.append(ast.dump(node))
+    symbols["<module>"] = "\n".join(module_level)
+    return symbols
+
+
+def _is_docstring(node: ast.stmt) -> bool:
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+
+
+class ImpactPlugin:
+    """
+    pytest plugin recording test dependencies and deselecting tests not impacted
+    by changes since --impacted-since.
+    """
+
+    # Fixtures whose implementation lives in framework/core
+    FIXTURE_MODULES = {
+        "driver": "framework/core/browser_manager.py",
+        "browser_manager": "framework/core/browser_manager.py"
+    }
+
+    def __init__(self, store: ResultsStore, unaffected: Set[str], record: bool = False):
+        self.store = store
+        self.unaffected = unaffected
+        self.record = record
+        self.recorder = DependencyRecorder()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        if not self.unaffected:
+            return
+        selected = [item for item in items if item.nodeid not in self.unaffected]
+        deselected = [item for item in items if item.nodeid in self.unaffected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def pytest_collection_finish(self, session):
+        if self.record:
+            from framework.core.base_page import BasePage
+            self.recorder.instrument(BasePage)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        if not self.record:
+            yield
+            return
+        fixture_modules = {module for name, module in self.FIXTURE_MODULES.items() if name in item.fixturenames}
+        self.recorder.start(self.recorder.relative_path(str(item.fspath)), fixture_modules)
+        yield
+        self.store.record_test_dependencies(item.nodeid, self.recorder.finish())
+
+    def pytest_sessionfinish(self, session):
+        self.recorder.restore()
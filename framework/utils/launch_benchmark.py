@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from framework.config.config import Config
+from framework.utils.results_store import ResultsStore
+
+PROFILES = ("default", "fast")
+
+
+def benchmark_launch(browser: str, url: str, iterations: int = 5) -> Dict[str, Any]:
+    """
+    Time browser startup and the first page load per launch profile. Profiles alternate per
+    iteration so network and machine load affect both alike.
+    :param browser: chrome, firefox or playwright
+    :param url: Page loaded after startup
+    :param iterations: Launches per profile
+    :return: Per profile median startup, navigation and total seconds, and the gains of fast
+    """
+    # Only this command needs the browser drivers, comparing stored runs does not
+    from framework.core.browser_manager import BrowserManager
+
+    samples: Dict[str, Dict[str, List[float]]] = {
+        profile: {"startup": [], "navigation": [], "total": []} for profile in PROFILES
+    }
+    configured = Config.LAUNCH_PROFILE
+    manager = BrowserManager()
+    try:
+        for _ in range(iterations):
+            for profile in PROFILES:
+                Config.LAUNCH_PROFILE = profile
+                started = time.perf_counter()
+                driver = manager.get_driver("web", browser)
+                launched = time.perf_counter()
+                try:
+                    if hasattr(driver, "goto"):  # Playwright
+                        driver.goto(url, wait_until="load")
+                    else:
+                        driver.get(url)
+                    loaded = time.perf_counter()
+                finally:
+                    manager.quit_driver(driver)
+                samples[profile]["startup"].append(launched - started)
+                samples[profile]["navigation"].append(loaded - launched)
+                samples[profile]["total"].append(loaded - started)
+    finally:
+        Config.LAUNCH_PROFILE = configured
+        manager.close()
+
+    result = {"browser": browser, "url": url, "iterations": iterations, "profiles": {}}
+    for profile, phases in samples.items():
+        result["profiles"][profile] = {phase: round(statistics.median(values), 3) for phase, values in phases.items()}
+    result["gains"] = _gains(result["profiles"], ("startup", "navigation", "total"))
+    return result
+
+
+def compare_runs(store: ResultsStore, last_runs: int = 20) -> Dict[str, Any]:
+    """
+    Compare the test durations of the stored runs per launch profile, grouped by platform
+    and browser as durations are only comparable within one browser
+    :param last_runs: Most recent finished runs per profile and browser to include
+    :return: Per group and profile the runs, tests and median passed test duration, and the gains of fast
+    """
+    groups: Dict[str, Dict[str, List[str]]] = {}
+    for run in reversed(store.get_runs()):
+        group = f"{run.get('platform')}/{run.get('browser')}"
+        run_ids = groups.setdefault(group, {}).setdefault(run.get("launch_profile") or "default", [])
+        if len(run_ids) < last_runs:
+            run_ids.append(run["run_id"])
+
+    result = {}
+    for group, profiles in sorted(groups.items()):
+        result[group] = {"profiles": {}}
+        for profile, run_ids in profiles.items():
+            durations = [row["duration"] for row in store.get_passed_durations(run_ids)]
+            if durations:
+                result[group]["profiles"][profile] = {
+                    "runs": len(run_ids), "tests": len(durations),
+                    "median_test_duration": round(statistics.median(durations), 3),
+                    "total_test_duration": round(sum(durations) / len(run_ids), 3)
+                }
+        result[group]["gains"] = _gains(result[group]["profiles"], ("median_test_duration", "total_test_duration"))
+    return result
+
+
+def _gains(profiles: Dict[str, Dict[str, float]], metrics: tuple) -> Dict[str, float]:
+    """Relative time saved by the fast profile per metric, 0.3 is 30% faster"""
+    if "default" not in profiles or "fast" not in profiles:
+        return {}
+    return {metric: round(1 - profiles["fast"][metric] / profiles["default"][metric], 3)
+            for metric in metrics if profiles["default"][metric] > 0}
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Measure what the fast launch profile saves:
+        python -m framework.utils.launch_benchmark launch [--browser chrome] [--iterations 5] [--url URL]
+        python -m framework.utils.launch_benchmark runs [--last-runs 20]
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.launch_benchmark")
+    parser.add_argument("--reports-dir", default="framework/reports")
+    parser.add_argument("--output", help="Also write the result as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    launch = commands.add_parser("launch", help="Launch the browser with each profile and time startup")
+    launch.add_argument("--browser", default=Config.BROWSER, choices=["chrome", "firefox", "playwright"])
+    launch.add_argument("--url", default=Config.BASE_URL)
+    launch.add_argument("--iterations", type=int, default=5)
+    runs = commands.add_parser("runs", help="Compare the test durations of stored runs per profile")
+    runs.add_argument("--last-runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "launch":
+        result = benchmark_launch(args.browser, args.url, args.iterations)
+        for profile, medians in result["profiles"].items():
+            print(f"{profile}: startup {medians['startup']}s, first load {medians['navigation']}s, "
+                  f"total {medians['total']}s")
+        for metric, gain in result["gains"].items():
+            print(f"fast saves {gain:.0%} of {metric}")
+    else:
+        result = compare_runs(ResultsStore(os.path.join(args.reports_dir, "results.db")), args.last_runs)
+        if not result:
+            print("No finished runs in the results store")
+        for group, comparison in result.items():
+            for profile, stats in comparison["profiles"].items():
+                print(f"{group} {profile}: {stats['runs']} runs, median test {stats['median_test_duration']}s, "
+                      f"{stats['total_test_duration']}s of tests per run")
+            for metric, gain in comparison["gains"].items():
+                print(f"{group} fast saves {gain:.0%} of {metric}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
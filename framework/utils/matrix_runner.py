@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from framework.config.parallel_config import ParallelConfig
+from framework.utils.reporting import TestReporting
+from framework.utils.results_store import ResultsStore
+
+
+# Outcome printed by pytest -v after each test
+RESULT_PATTERN = re.compile(r"\b(PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS|RERUN)\b")
+MOBILE_PLATFORMS = ("android", "ios")
+
+
+class Combination:
+    """One pytest invocation of the execution plan"""
+
+    def __init__(self, args: List[str]):
+        self.args = args
+        self.platform = self._option("--platform") or "web"
+        self.browser = self._option("--browser")
+        self.name = self.platform if self.platform in MOBILE_PLATFORMS else f"{self.platform}-{self.browser}"
+        self.reports_dir = ParallelConfig.get_reports_dir(self.name)
+        # Concurrent combinations must not share allure results, older plans all use the same directory
+        self.args = [arg for arg in self.args if not arg.startswith("--alluredir")]
+        self.args.append(ParallelConfig.get_alluredir(self.name))
+        # Browsers share the CPU slots, each mobile platform is bounded by its devices
+        self.resource = self.platform if self.platform in MOBILE_PLATFORMS else "browser"
+        self.process: Optional[subprocess.Popen] = None
+        self.status = "pending"
+        self.returncode: Optional[int] = None
+        self.counts: Dict[str, int] = {}
+        self.started = 0.0
+        self.duration = 0.0
+
+    def _option(self, name: str) -> Optional[str]:
+        if name in self.args and self.args.index(name) + 1 < len(self.args):
+            return self.args[self.args.index(name) + 1]
+        return None
+
+
+class MatrixRunner:
+    """
+    Runs the combinations of an execution plan concurrently as pytest subprocesses.
+    Browser combinations share a pool of CPU slots and every mobile platform gets one
+    slot per device; results of all combinations go to the shared results store under
+    one matrix id and are merged into a single report. Every combination writes its
+    reports, timings and allure results to a directory of its own; the HTML reports are
+    generated once all combinations finished.
+    """
+
+    def __init__(self, execution_list: List[List[str]], cpu_slots: int = None,
+                 device_slots: Dict[str, int] = None, fail_fast: bool = False, verbose: bool = False,
+                 store: Optional[ResultsStore] = None):
+        """
+        :param execution_list: pytest arguments per combination, see ParallelConfig.generate_execution_list
+        :param cpu_slots: Concurrent browser combinations, defaults to ParallelConfig.get_worker_count()
+        :param device_slots: Concurrent combinations per mobile platform, defaults to 1
+        :param fail_fast: Stop the whole matrix at the first failing test
+        :param verbose: Stream all output instead of test results only
+        """
+        self.combinations = [Combination(args) for args in execution_list]
+        self.capacity = {"browser": cpu_slots or ParallelConfig.get_worker_count()}
+        for platform in MOBILE_PLATFORMS:
+            self.capacity[platform] = max(1, (device_slots or {}).get(platform, 1))
+        self.fail_fast = fail_fast
+        self.verbose = verbose
+        self.store = store or ResultsStore()
+        self.matrix_id = uuid.uuid4().hex
+        self._events: "queue.Queue" = queue.Queue()
+        self._print_lock = threading.Lock()
+        self._stopping = False
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all combinations
+        :return: Merged report, also written to results/matrix_report.json
+        """
+        started = time.monotonic()
+        pending = list(self.combinations)
+        running: List[Combination] = []
+        while pending or running:
+            for combination in list(pending):
+                if self._stopping:
+                    combination.status = "cancelled"
+                    pending.remove(combination)
+                elif self._in_use(running, combination.resource) < self.capacity[combination.resource]:
+                    pending.remove(combination)
+                    running.append(combination)
+                    self._start(combination)
+            if not running:
+                continue
+
+            kind, combination = self._events.get()
+            if kind == "failure" and self.fail_fast and not self._stopping:
+                self._emit(f"[matrix] {combination.name} failed, stopping the matrix")
+                self._stopping = True
+                for other in running:
+                    if other.process.poll() is None:
+                        other.process.terminate()
+            elif kind == "finished":
+                running.remove(combination)
+                self._emit(f"[matrix] {combination.name} {combination.status} in {combination.duration:.1f}s "
+                           f"{self._format_counts(combination.counts)}")
+        report = self.report(time.monotonic() - started)
+        self.generate_reports(report)
+        return report
+
+    def generate_reports(self, report: Dict[str, Any]):
+        """Generate the run report of every combination in its directory and the trend report once"""
+        for combination in report["combinations"]:
+            if "run_id" in combination:
+                reports_dir = ParallelConfig.get_reports_dir(combination["name"])
+                TestReporting(reports_dir, store=self.store).generate_reports(combination["run_id"], trends=False)
+        TestReporting(store=self.store).generate_trend_report()
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        """Merge the stored runs of all combinations into one report"""
+        runs = {run.get("combination"): run for run in self.store.get_runs_by_info("matrix_id", self.matrix_id)}
+        combinations = []
+        totals = {"total_tests": 0, "passed": 0, "failed": 0, "skipped": 0}
+        for combination in self.combinations:
+            run = runs.get(combination.name)
+            entry = {
+                "name": combination.name,
+                "args": combination.args,
+                "reports_dir": combination.reports_dir,
+                "status": combination.status,
+                "returncode": combination.returncode,
+                "duration": round(combination.duration, 3)
+            }
+            if run:
+                entry["run_id"] = run["run_id"]
+                entry.update({key: run[key] for key in totals})
+                entry["failed_tests"] = [test["nodeid"] for test in self.store.get_tests(run["run_id"])
+                                         if test["outcome"] == "failed"]
+                for key in totals:
+                    totals[key] += run[key]
+            combinations.append(entry)
+
+        report = {
+            "matrix_id": self.matrix_id,
+            "duration": round(duration, 3),
+            "status": "passed" if all(c.status == "passed" for c in self.combinations) else "failed",
+            "totals": totals,
+            "combinations": combinations
+        }
+        os.makedirs(os.path.join("framework", "reports", "results"), exist_ok=True)
+        with open(os.path.join("framework", "reports", "results", "matrix_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def _start(self, combination: Combination):
+        env = dict(os.environ, MATRIX_ID=self.matrix_id, MATRIX_COMBINATION=combination.name,
+                   REPORTS_DIR=combination.reports_dir)
+        combination.started = time.monotonic()
+        combination.status = "running"
+        combination.process = subprocess.Popen(
+            [sys.executable, "-m", "pytest", *combination.args, "--report-mode", "off"],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=env
+        )
+        self._emit(f"[matrix] started {combination.name}")
+        threading.Thread(target=self._stream, args=(combination,), daemon=True).start()
+
+    def _stream(self, combination: Combination):
+        failure_reported = False
+        for line in combination.process.stdout:
+            line = line.rstrip()
+            # Lines starting with the outcome belong to the short test summary
+            match = RESULT_PATTERN.search(line) if "::" in line and not RESULT_PATTERN.match(line) else None
+            if match:
+                outcome = match.group(1).lower()
+                combination.counts[outcome] = combination.counts.get(outcome, 0) + 1
+                if outcome in ("failed", "error") and not failure_reported:
+                    failure_reported = True
+                    self._events.put(("failure", combination))
+            if self.verbose or match:
+                self._emit(f"[{combination.name}] {line}")
+
+        combination.returncode = combination.process.wait()
+        combination.duration = time.monotonic() - combination.started
+        if self._stopping and combination.returncode not in (0, 1):
+            combination.status = "cancelled"
+        else:
+            # 5: no tests collected for this combination
+            combination.status = "passed" if combination.returncode in (0, 5) else "failed"
+        if combination.status == "failed" and not failure_reported:
+            self._events.put(("failure", combination))
+        self._events.put(("finished", combination))
+
+    def _emit(self, line: str):
+        with self._print_lock:
+            done = sum(1 for c in self.combinations if c.status not in ("pending", "running"))
+            print(f"{line}  ({done}/{len(self.combinations)} done)" if line.startswith("[matrix]") else line,
+                  flush=True)
+
+    @staticmethod
+    def _in_use(running: List[Combination], resource: str) -> int:
+        return sum(1 for combination in running if combination.resource == resource)
+
+    @staticmethod
+    def _format_counts(counts: Dict[str, int]) -> str:
+        return ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) or "no tests"
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Command line entry point:
+        python -m framework.utils.matrix_runner --platforms web mobile --fail-fast
+        python -m framework.utils.matrix_runner --plan execution_plan.json
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.matrix_runner")
+    parser.add_argument("--plan", help="Execution plan written by ParallelConfig.save_execution_plan")
+    parser.add_argument("--platforms", nargs="*", help="Platforms to generate the plan for (web, mobile)")
+    parser.add_argument("--markers", nargs="*", help="Markers to generate the plan for")
+    parser.add_argument("--cpu-slots", type=int, help="Concurrent browser combinations")
+    parser.add_argument("--android-devices", type=int, default=1, help="Concurrent Android combinations")
+    parser.add_argument("--ios-devices", type=int, default=1, help="Concurrent iOS combinations")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop the matrix at the first failing test")
+    parser.add_argument("--verbose", action="store_true", help="Stream the full output of every combination")
+    args = parser.parse_args(argv)
+
+    if args.plan:
+        execution_list = ParallelConfig.load_execution_plan(args.plan)
+    else:
+        execution_list = ParallelConfig.generate_execution_list(args.markers, args.platforms)
+
+    runner = MatrixRunner(
+        execution_list,
+        cpu_slots=args.cpu_slots,
+        device_slots={"android": args.android_devices, "ios": args.ios_devices},
+        fail_fast=args.fail_fast,
+        verbose=args.verbose
+    )
+    report = runner.run()
+    print(f"[matrix] {report['status']}: {report['totals']['passed']} passed, {report['totals']['failed']} failed, "
+          f"{report['totals']['skipped']} skipped in {report['duration']:.1f}s")
+    return 0 if report["status"] == "passed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from framework.utils.resources import available_memory_mb, process_tree_rss_mb, psutil
+from framework.utils.results_store import ResultsStore
+
+
+class MemoryWatchdog:
+    """
+    Samples the RSS of a worker and of its browser/driver process tree from a background
+    thread. Between tests it has drivers that outlive a test relaunched when their process
+    tree exceeds the recycle threshold, and holds back the next test while the machine is
+    short of memory. Processes leaked by quit drivers are left to the ProcessRegistry.
+    """
+
+    def __init__(self, recycle_rss_mb: float = 2048, throttle_available_mb: float = 1024,
+                 interval: float = 1.0, throttle_timeout: float = 60.0):
+        """
+        :param recycle_rss_mb: Browser/driver tree RSS above which a live driver is relaunched
+        :param throttle_available_mb: Available system memory below which new tests wait
+        :param interval: Seconds between samples
+        :param throttle_timeout: Longest a test start is held back
+        """
+        self.recycle_rss_mb = recycle_rss_mb
+        self.throttle_available_mb = throttle_available_mb
+        self.interval = interval
+        self.throttle_timeout = throttle_timeout
+        self.samples: List[Dict[str, Any]] = []
+        self.recycles = 0
+        self._recyclers: List[Callable[[float], int]] = []
+        self.throttled_seconds = 0.0
+        self._peak = {"worker_rss_mb": 0.0, "browser_rss_mb": 0.0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="memory-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample of the worker and its child processes"""
+        sample = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "worker_rss_mb": round(psutil.Process().memory_info().rss / 1024 ** 2, 1),
+            "browser_rss_mb": round(process_tree_rss_mb(include_root=False) or 0, 1),
+            "available_mb": round(available_memory_mb() or 0)
+        }
+        with self._lock:
+            self.samples.append(sample)
+            for key in self._peak:
+                self._peak[key] = max(self._peak[key], sample[key])
+        return sample
+
+    def take_samples(self) -> List[Dict[str, Any]]:
+        """Get and clear the samples taken so far"""
+        with self._lock:
+            samples, self.samples = self.samples, []
+            return samples
+
+    def take_peak(self) -> Dict[str, float]:
+        """Get and reset the peak RSS since the last call"""
+        with self._lock:
+            peak = dict(self._peak)
+            self._peak = {key: 0.0 for key in self._peak}
+            return peak
+
+    def add_recycler(self, recycle: Callable[[float], int]):
+        """
+        Register a callback closing the live drivers whose process tree exceeds the given RSS
+        in MB and returning how many it closed, e.g. BrowserManager.recycle_if_bloated
+        """
+        self._recyclers.append(recycle)
+
+    def recycle_if_needed(self) -> int:
+        """
+        Have the registered recyclers close bloated live drivers. Called between tests, so
+        the next test's fixture launches a fresh driver.
+        :return: Number of drivers recycled
+        """
+        recycled = sum(recycle(self.recycle_rss_mb) for recycle in self._recyclers)
+        self.recycles += recycled
+        return recycled
+
+    def throttle(self) -> float:
+        """
+        Wait while available system memory is below the throttle threshold
+        :return: Seconds waited
+        """
+        started = time.monotonic()
+        while (available_memory_mb() or float("inf")) < self.throttle_available_mb:
+            if time.monotonic() - started > self.throttle_timeout:
+                break
+            time.sleep(self.interval)
+        waited = time.monotonic() - started
+        self.throttled_seconds += waited
+        return waited
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+class MemoryWatchdogPlugin:
+    """
+    pytest plugin running a MemoryWatchdog in every worker. Peak RSS per test is exposed
+    as item.memory_metrics and the samples are stored in the results store.
+    """
+
+    def __init__(self, store: ResultsStore, run_id: str, watchdog: MemoryWatchdog,
+                 worker_id: str = "main"):
+        self.store = store
+        self.run_id = run_id
+        self.watchdog = watchdog
+        self.worker_id = worker_id
+
+    def pytest_sessionstart(self, session):
+        self.watchdog.start()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        # Before the fixtures of the test start a browser
+        waited = self.watchdog.throttle()
+        if waited >= self.watchdog.interval:
+            item.add_report_section("setup", "memory", f"Start held back {waited:.1f}s, system memory low")
+        self.watchdog.take_peak()
+        self.watchdog.sample()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        # Fixtures are torn down at this point, the driver of this test has been quit
+        self.watchdog.sample()
+        peak = self.watchdog.take_peak()
+        item.memory_metrics = {
+            "worker_rss_peak_mb": peak["worker_rss_mb"],
+            "browser_rss_peak_mb": peak["browser_rss_mb"],
+            "recycled_drivers": self.watchdog.recycle_if_needed()
+        }
+        self._store_samples()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        self.watchdog.stop()
+        self._store_samples()
+
+    def _store_samples(self):
+        samples = self.watchdog.take_samples()
+        # Distributed nodes have no run of their own to store samples under
+        if self.run_id is not None:
+            self.store.record_memory_samples(self.run_id, self.worker_id, samples)
@@ -0,0 +1,89 @@
+import statistics
+from typing import Any, Dict, List, Optional
+
+
+STRATEGIES = ("failure-per-second", "failure-first", "fast-first")
+
+
+class HistoryPrioritizer:
+    """
+    Orders tests from their stored outcomes and durations so that a broken build shows
+    up in the first minutes. Recent runs weigh more than old ones, retried (flaky)
+    passes count as half a failure and tests without history are treated as likely
+    to fail.
+    """
+
+    def __init__(self, history: Dict[str, List[Dict[str, Any]]], strategy: str = "failure-per-second",
+                 decay: float = 0.8, default_duration: Optional[float] = None):
+        """
+        :param history: Results per node id, newest first, with outcome, retries and duration
+        :param strategy: One of STRATEGIES
+        :param decay: Weight factor applied per older run
+        :param default_duration: Duration assumed for tests without history
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported ordering strategy: {strategy}")
+        self.history = history
+        self.strategy = strategy
+        self.decay = decay
+        durations = {nodeid: self._median_duration(results) for nodeid, results in history.items()}
+        self.durations = {nodeid: duration for nodeid, duration in durations.items() if duration is not None}
+        known = sorted(self.durations.values())
+        self.default_duration = default_duration or (known[len(known) // 2] if known else 10.0)
+
+    def failure_probability(self, nodeid: str, prior: float = 0.5, prior_weight: float = 1.0) -> float:
+        """
+        Estimate the probability that a test fails in this run
+        :return: Recency weighted failure rate smoothed towards prior
+        """
+        weighted_failures = 0.0
+        total_weight = 0.0
+        weight = 1.0
+        for result in self.history.get(nodeid, []):
+            if result["outcome"] == "failed":
+                weighted_failures += weight
+            elif result["outcome"] == "passed" and result["retries"]:
+                weighted_failures += 0.5 * weight
+            elif result["outcome"] != "passed":
+                continue
+            total_weight += weight
+            weight *= self.decay
+        return (weighted_failures + prior * prior_weight) / (total_weight + prior_weight)
+
+    def duration(self, nodeid: str) -> float:
+        """Get the expected duration of a test"""
+        return self.durations.get(nodeid, self.default_duration)
+
+    def priority(self, nodeid: str) -> float:
+        """Get the priority of a test, higher runs first"""
+        if self.strategy == "failure-first":
+            return self.failure_probability(nodeid)
+        if self.strategy == "fast-first":
+            return -self.duration(nodeid)
+        return self.failure_probability(nodeid) / max(self.duration(nodeid), 0.001)
+
+    def order(self, items: List[Any]) -> List[Any]:
+        """Sort pytest items by priority, keeping collection order for ties"""
+        return sorted(items, key=lambda item: self.priority(item.nodeid), reverse=True)
+
+    def priorities(self) -> Dict[str, Any]:
+        """
+        Snapshot of the priorities, so other processes order tests exactly the same way
+        :return: Priority per node id with history and the priority of tests without history
+        """
+        return {
+            "tests": {nodeid: self.priority(nodeid) for nodeid in self.history},
+            "default": self.priority("")
+        }
+
+    @staticmethod
+    def order_by(priorities: Dict[str, Any], items: List[Any]) -> List[Any]:
+        """Sort pytest items by a snapshot taken with priorities(), keeping collection order for ties"""
+        tests = priorities["tests"]
+        default = priorities["default"]
+        return sorted(items, key=lambda item: tests.get(item.nodeid, default), reverse=True)
+
+    @staticmethod
+    def _median_duration(results: List[Dict[str, Any]]) -> Optional[float]:
+        durations = [result["duration"] for result in results if result["duration"] is not None]
+        return statistics.median(durations) if durations else None
@@ -0,0 +1,46 @@
+from typing import Any, Callable, List, Tuple
+
+# Every patch still installed by patch(), oldest first
+_patches: List[Tuple[type, str, Any]] = []
+
+
+def patch(owner: type, name: str, replacement: Callable) -> Callable[[], None]:
+    """
+    Replace a class attribute. Patches of all plugins share one stack, so a wrapper
+    installed on top of another one is never left behind by restoring out of order.
+    :return: Callable restoring the attribute, see unpatch
+    """
+    entry = (owner, name, vars(owner)[name])
+    setattr(owner, name, replacement)
+    _patches.append(entry)
+    return lambda: unpatch(entry)
+
+
+def unpatch(entry: Tuple[type, str, Any]):
+    """
+    Restore a patch in strict last-in-first-out order: patches installed after it are
+    restored first. Restoring a patch that was already undone this way does nothing.
+    """
+    if not any(patched is entry for patched in _patches):
+        return
+    while _patches:
+        patched = _patches.pop()
+        owner, name, original = patched
+        setattr(owner, name, original)
+        if patched is entry:
+            return
+
+
+def mark_wrapper(wrapper: Callable, kind: str) -> Callable:
+    """
+    Mark a function as a wrapper of the given kind. Call it after functools.wraps, which
+    copies the __dict__ of the wrapped function and with it any marker of an inner wrapper.
+    """
+    wrapper.__framework_wrapper__ = (kind, wrapper)
+    return wrapper
+
+
+def is_wrapper(func: Any, kind: str) -> bool:
+    """Check whether func itself, not a function it wraps, was marked with mark_wrapper"""
+    marker = getattr(func, "__framework_wrapper__", None)
+    return marker is not None and marker[0] == kind and marker[1] is func
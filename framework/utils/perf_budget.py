@@ -0,0 +1,165 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import allure
+import pytest
+
+# Metrics of PerformanceCollector.summarize a budget can limit
+BUDGET_METRICS = ("lcp_ms", "fcp_ms", "cls", "inp_ms", "fid_ms", "ttfb_ms", "total_blocking_time_ms",
+                  "requests", "transfer_kb")
+
+
+class PerfBudgetWarning(pytest.PytestWarning):
+    """A test exceeded its performance budget in warn mode"""
+
+
+def track_page(page: Any):
+    """Remember the PERF_BUDGET of a page object created by the running test"""
+    if PerfBudgetPlugin.active is not None:
+        PerfBudgetPlugin.active.track(page)
+
+
+def page_budgets(pages: Iterable[Any]) -> Dict[str, Dict[str, float]]:
+    """Get the PERF_BUDGET of every page object among pages, keyed by class name"""
+    return {type(page).__name__: type(page).PERF_BUDGET for page in pages if getattr(type(page), "PERF_BUDGET", None)}
+
+
+def resolve_budget(item: Any, pages: Dict[str, Dict[str, float]]) -> Tuple[Dict[str, Tuple[float, str]], str]:
+    """
+    Combine the budgets of a test. Page classes contribute their strictest limits, then
+    perf_budget markers override them from the module down to the test function.
+    :param pages: Budgets of the page classes the test uses, keyed by class name
+    :return: Limit and source per metric, and the mode a marker asks for (None for the default)
+    """
+    budget: Dict[str, Tuple[float, str]] = {}
+    for page, limits in pages.items():
+        for metric, limit in limits.items():
+            if metric not in budget or limit < budget[metric][0]:
+                budget[metric] = (limit, page)
+    mode = None
+    for marker in reversed(list(item.iter_markers("perf_budget"))):
+        limits = dict(marker.kwargs)
+        mode = limits.pop("mode", mode)
+        budget.update({metric: (limit, "marker") for metric, limit in limits.items()})
+    return budget, mode
+
+
+def evaluate(summary: Dict[str, Any], budget: Dict[str, Tuple[float, str]]) -> Dict[str, Any]:
+    """
+    Check measured metrics against a budget
+    :param summary: Summary of PerformanceCollector.collect
+    :param budget: Limit and source per metric, see resolve_budget
+    :return: Per metric results, the violations and the metrics that could not be checked
+    """
+    result = {"checks": [], "violations": [], "unchecked": []}
+    for metric, (limit, source) in sorted(budget.items()):
+        if metric not in BUDGET_METRICS or summary.get(metric) is None:
+            result["unchecked"].append(metric)
+            continue
+        check = {"metric": metric, "limit": limit, "actual": summary[metric], "source": source}
+        result["checks"].append(check)
+        if summary[metric] > limit:
+            result["violations"].append(check)
+    return result
+
+
+def _describe(check: Dict[str, Any]) -> str:
+    operator = ">" if check["actual"] > check["limit"] else "<="
+    return f"{check['metric']} {check['actual']:g} {operator} {check['limit']:g} ({check['source']})"
+
+
+class PerfBudgetPlugin:
+    """
+    pytest plugin evaluating perf_budget markers and page PERF_BUDGETs against the metrics
+    collected with --performance. Violations warn, or fail the test in fail mode, and are
+    listed in a terminal summary section of their own.
+
+    Pages created while a test sets up or runs are tracked under its node id; pages
+    created earlier by class or module scoped fixtures are found among the fixture values
+    of every later test.
+    """
+
+    # Plugin of this process, page objects report their budget to it
+    active: Optional["PerfBudgetPlugin"] = None
+
+    def __init__(self, mode: str = "warn"):
+        """
+        :param mode: warn or fail, a perf_budget(mode=...) marker overrides it per test
+        """
+        self.mode = mode
+        self.results: List[Tuple[str, str, Dict[str, Any]]] = []
+        self.page_budgets: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._nodeid: Optional[str] = None
+        PerfBudgetPlugin.active = self
+
+    def track(self, page: Any):
+        """Remember the budget of a page object under the running test"""
+        if self._nodeid is not None:
+            self.page_budgets.setdefault(self._nodeid, {}).update(page_budgets([page]))
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        # Before the fixtures of the test create page objects
+        self._nodeid = item.nodeid
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when == "teardown":
+            self.page_budgets.pop(item.nodeid, None)
+            self._nodeid = None
+        metrics = getattr(item, "performance_metrics", None)
+        if report.when != "call" or metrics is None:
+            return
+        pages = dict(page_budgets(getattr(item, "funcargs", {}).values()), **self.page_budgets.get(item.nodeid, {}))
+        budget, mode = resolve_budget(item, pages)
+        if not budget:
+            return
+        mode = mode or self.mode
+        result = evaluate(metrics["summary"], budget)
+        item.perf_budget_metrics = {"perf_budget_violations": len(result["violations"])}
+
+        lines = [f"{'EXCEEDED' if check in result['violations'] else 'ok'}: {_describe(check)}"
+                 for check in result["checks"]]
+        lines += [f"not measured: {metric}" for metric in result["unchecked"]]
+        report.sections.append(("perf budget", "\n".join(lines)))
+        report.user_properties.append(("perf_budget", dict(result, mode=mode)))
+        allure.attach(json.dumps(dict(result, mode=mode), indent=2), "Performance Budget",
+                      allure.attachment_type.JSON)
+
+        if not result["violations"]:
+            return
+        message = "Performance budget exceeded: " + ", ".join(_describe(check) for check in result["violations"])
+        if mode == "fail" and report.passed:
+            report.outcome = "failed"
+            report.longrepr = message
+        elif mode != "fail":
+            item.warn(PerfBudgetWarning(message))
+
+    def pytest_runtest_logreport(self, report):
+        # Reports of xdist workers arrive here on the controller with their user properties
+        for name, result in report.user_properties:
+            if name == "perf_budget":
+                self.results.append((report.nodeid, report.when, result))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        exceeded = [(nodeid, result) for nodeid, _, result in self.results if result["violations"]]
+        terminalreporter.section("performance budgets")
+        terminalreporter.write_line(f"{len(self.results)} tests checked, {len(exceeded)} over budget")
+        for nodeid, result in exceeded:
+            terminalreporter.write_line(
+                f"{result['mode'].upper()} {nodeid}: " + ", ".join(_describe(check) for check in result["violations"])
+            )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        PerfBudgetPlugin.active = None
+        if hasattr(session.config, "workerinput") or not self.results:
+            return
+        session.config.results_store.update_run_info(session.config.run_id, {"perf_budget": {
+            "checked": len(self.results),
+            "exceeded": sum(1 for _, _, result in self.results if result["violations"])
+        }})
@@ -0,0 +1,197 @@
+from typing import Any, Dict, List, Optional
+
+
+# Installed before any page script runs (CDP / Playwright init script). Observers use
+# buffered entries, so installing it late still picks up what the page already recorded.
+OBSERVER_SCRIPT = """
+(function () {
+    if (window !== window.top || window.__perfCollector) { return; }
+    var STORAGE_KEY = '__perfCollectorNavigations';
+    var state = {lcp: 0, cls: 0, fid: null, inp: 0, longTasks: 0, longTaskTime: 0, blockingTime: 0};
+
+    function observe(type, callback, options) {
+        try {
+            var init = options || {};
+            init.type = type;
+            init.buffered = true;
+            new PerformanceObserver(function (list) { list.getEntries().forEach(callback); }).observe(init);
+        } catch (e) {
+            // Entry type not supported by this browser
+        }
+    }
+
+    observe('largest-contentful-paint', function (e) { state.lcp = e.renderTime || e.loadTime || e.startTime; });
+    observe('layout-shift', function (e) { if (!e.hadRecentInput) { state.cls += e.value; } });
+    observe('first-input', function (e) { state.fid = e.processingStart - e.startTime; });
+    observe('event', function (e) {
+        if (e.interactionId) { state.inp = Math.max(state.inp, e.duration); }
+    }, {durationThreshold: 16});
+    observe('longtask', function (e) {
+        state.longTasks += 1;
+        state.longTaskTime += e.duration;
+        state.blockingTime += Math.max(0, e.duration - 50);
+    });
+
+    function snapshot() {
+        var nav = performance.getEntriesByType('navigation')[0];
+        var paints = {};
+        performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+        var resources = performance.getEntriesByType('resource');
+        var transferSize = 0;
+        resources.forEach(function (r) { transferSize += r.transferSize || 0; });
+        var slowest = resources.slice().sort(function (a, b) { return b.duration - a.duration; }).slice(0, 5)
+            .map(function (r) {
+                return {name: r.name, duration: r.duration, transfer_size: r.transferSize,
+                        initiator_type: r.initiatorType};
+            });
+        return {
+            url: location.href,
+            navigation: nav ? {
+                type: nav.type,
+                ttfb: nav.responseStart,
+                dom_content_loaded: nav.domContentLoadedEventEnd,
+                load: nav.loadEventEnd,
+                transfer_size: nav.transferSize
+            } : null,
+            fcp: paints['first-contentful-paint'] || null,
+            lcp: state.lcp || null,
+            cls: state.cls,
+            fid: state.fid,
+            inp: state.inp || null,
+            long_tasks: {count: state.longTasks, total_time: state.longTaskTime,
+                         total_blocking_time: state.blockingTime},
+            resources: {count: resources.length, transfer_size: transferSize, slowest: slowest}
+        };
+    }
+
+    // Keep the metrics of every navigation within the origin of the tab
+    addEventListener('pagehide', function () {
+        try {
+            var saved = JSON.parse(sessionStorage.getItem(STORAGE_KEY) || '[]');
+            saved.push(snapshot());
+            sessionStorage.setItem(STORAGE_KEY, JSON.stringify(saved));
+        } catch (e) {
+            // Storage is unavailable on opaque origins
+        }
+    });
+
+    window.__perfCollector = {
+        collect: function () {
+            var navigations = [];
+            try {
+                navigations = JSON.parse(sessionStorage.getItem(STORAGE_KEY) || '[]');
+                sessionStorage.removeItem(STORAGE_KEY);
+            } catch (e) {
+                // Storage is unavailable on opaque origins
+            }
+            navigations.push(snapshot());
+            return navigations;
+        }
+    };
+})();
+"""
+
+# Single round trip: installs the observers if they are missing and returns every navigation
+COLLECT_SCRIPT = OBSERVER_SCRIPT + "\nreturn window.__perfCollector ? window.__perfCollector.collect() : [];"
+
+
+class PerformanceCollector:
+    """
+    Collects Web Vitals (LCP, CLS, INP/FID), long tasks and resource timing through
+    PerformanceObservers installed at navigation, plus CDP Performance.getMetrics on
+    Chromium. Works with Selenium WebDriver and Playwright pages.
+    """
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.errors: List[str] = []
+        self._is_playwright = hasattr(driver, 'goto')
+        self._cdp_session = None
+        self._selenium_cdp = False
+
+    @staticmethod
+    def supports(driver: Any) -> bool:
+        """Check if the driver is a web session (Appium sessions are not)"""
+        if driver is None or hasattr(driver, 'start_recording_screen'):
+            return False
+        return hasattr(driver, 'goto') or hasattr(driver, 'execute_script')
+
+    def install(self):
+        """
+        Install the observers for every following navigation and enable CDP metrics.
+        Failures are recorded in errors and reported with the collected metrics.
+        """
+        try:
+            if self._is_playwright:
+                self.driver.add_init_script(OBSERVER_SCRIPT)
+                if self.driver.context.browser.browser_type.name == 'chromium':
+                    self._cdp_session = self.driver.context.new_cdp_session(self.driver)
+                    self._cdp_session.send('Performance.enable')
+            elif hasattr(self.driver, 'execute_cdp_cmd'):
+                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': OBSERVER_SCRIPT})
+                self.driver.execute_cdp_cmd('Performance.enable', {})
+                self._selenium_cdp = True
+        except Exception as e:
+            self.errors.append(f"install: {e}")
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Collect all metrics of the current test
+        :return: Dictionary with per-navigation breakdowns, a summary and CDP metrics
+        """
+        metrics: Dict[str, Any] = {"navigations": [], "summary": {}, "cdp": {}, "errors": list(self.errors)}
+
+        try:
+            if self._is_playwright:
+                navigations = self.driver.evaluate(f"() => {{ {COLLECT_SCRIPT} }}")
+            else:
+                navigations = self.driver.execute_script(COLLECT_SCRIPT)
+            metrics["navigations"] = navigations or []
+        except Exception as e:
+            metrics["errors"].append(f"web vitals: {e}")
+
+        try:
+            metrics["cdp"] = self._get_cdp_metrics()
+        except Exception as e:
+            metrics["errors"].append(f"cdp: {e}")
+
+        metrics["summary"] = self.summarize(metrics["navigations"])
+        return metrics
+
+    def _get_cdp_metrics(self) -> Dict[str, float]:
+        if self._cdp_session:
+            result = self._cdp_session.send('Performance.getMetrics')
+        elif self._selenium_cdp:
+            result = self.driver.execute_cdp_cmd('Performance.getMetrics', {})
+        else:
+            return {}
+        return {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+
+    @staticmethod
+    def summarize(navigations: List[Dict]) -> Dict[str, Optional[float]]:
+        """
+        Reduce per-navigation metrics to one value per metric for the whole test
+        :param navigations: Navigation snapshots returned by the observer script
+        :return: Worst-case vitals and totals for network usage
+        """
+        def worst(key: str) -> Optional[float]:
+            values = [nav[key] for nav in navigations if nav.get(key) is not None]
+            return max(values) if values else None
+
+        ttfb = [nav["navigation"]["ttfb"] for nav in navigations if nav.get("navigation")]
+        transfer = sum(
+            nav["resources"]["transfer_size"] + ((nav.get("navigation") or {}).get("transfer_size") or 0)
+            for nav in navigations
+        )
+        return {
+            "navigations": len(navigations),
+            "lcp_ms": worst("lcp"),
+            "fcp_ms": worst("fcp"),
+            "cls": worst("cls"),
+            "inp_ms": worst("inp"),
+            "fid_ms": worst("fid"),
+            "ttfb_ms": max(ttfb) if ttfb else None,
+            "total_blocking_time_ms": sum(nav["long_tasks"]["total_blocking_time"] for nav in navigations),
+            "requests": sum(nav["resources"]["count"] for nav in navigations),
+            "transfer_kb": round(transfer / 1024, 1)
+        }
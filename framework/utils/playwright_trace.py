@@ -0,0 +1,69 @@
+import os
+import re
+from typing import Any, Dict, Optional
+
+# Trace modes: off, on keeps every test's chunk, retain-on-failure only those of failed tests
+TRACE_MODES = ("off", "on", "retain-on-failure")
+
+
+class PlaywrightTraceRecorder:
+    """
+    Records a Playwright trace of a browser context as one chunk per test. Tracing is
+    started once for the context, so the browser keeps its tracing state across tests and
+    only the chunks that are kept are exported; the others are stopped without a path and
+    never written to disk.
+    """
+
+    def __init__(self, context: Any, mode: str = "retain-on-failure",
+                 output_dir: str = "framework/reports/traces/playwright"):
+        """
+        :param context: Playwright browser context to trace
+        :param mode: on or retain-on-failure
+        :param output_dir: Directory of the kept trace zips
+        """
+        self.context = context
+        self.mode = mode
+        self.output_dir = output_dir
+        self.started = False
+        self.stats = {"chunks": 0, "kept": 0, "bytes_written": 0}
+
+    def start(self):
+        """Start tracing the context, once for all the tests using it"""
+        if self.started:
+            return
+        self.context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        self.started = True
+
+    def start_test(self, nodeid: str):
+        """Start the trace chunk of a test"""
+        self.start()
+        self.context.tracing.start_chunk(title=nodeid)
+
+    def stop_test(self, nodeid: str, failed: bool, attempt: int = 0) -> Optional[str]:
+        """
+        Stop the trace chunk of a test, exporting it when the mode keeps it
+        :param failed: Whether the test failed
+        :param attempt: Retry attempt, so the chunks of every attempt are kept
+        :return: Path of the trace zip if it was kept
+        """
+        self.stats["chunks"] += 1
+        if self.mode != "on" and not failed:
+            self.context.tracing.stop_chunk()
+            return None
+        safe_name = re.sub(r"[^\w.-]+", "_", nodeid).strip("_")
+        path = os.path.join(self.output_dir, f"{safe_name}-{attempt}.zip" if attempt else f"{safe_name}.zip")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.context.tracing.stop_chunk(path=path)
+        self.stats["kept"] += 1
+        self.stats["bytes_written"] += os.path.getsize(path)
+        return path
+
+    def stop(self) -> Dict[str, int]:
+        """
+        Stop tracing, the remaining trace data is discarded
+        :return: Chunks recorded, kept and bytes written
+        """
+        if self.started:
+            self.context.tracing.stop()
+            self.started = False
+        return self.stats
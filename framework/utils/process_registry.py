@@ -0,0 +1,178 @@
+import glob
+import json
+import os
+import socket
+from typing import Dict, List, Set, Tuple
+
+from framework.utils.resources import psutil
+
+
+class ProcessRegistry:
+    """
+    Tracks the processes spawned for every driver (driver servers, browsers and their
+    children) and reaps the ones that outlive their driver. The tracked processes are
+    mirrored to a registry file per owning process, so the next session can reap the
+    leftovers of a session that crashed or was killed.
+    Tracking is a no-op when psutil is not installed.
+    """
+
+    def __init__(self, registry_dir: str = "framework/reports/pids", grace_period: float = 3.0):
+        """
+        :param registry_dir: Directory of the registry files, shared by all sessions on a host
+        :param grace_period: Seconds processes get to exit on their own before they count as leaked
+        """
+        self.registry_dir = registry_dir
+        self.grace_period = grace_period
+        self.path = os.path.join(registry_dir, f"{socket.gethostname()}-{os.getpid()}.json")
+        self.tracked: Dict[str, List[Dict]] = {}
+
+    @staticmethod
+    def snapshot() -> Set[Tuple[int, float]]:
+        """Get the (pid, create time) of all descendants of the current process"""
+        if psutil is None:
+            return set()
+        processes = set()
+        for child in psutil.Process().children(recursive=True):
+            try:
+                processes.add((child.pid, child.create_time()))
+            except psutil.Error:
+                continue
+        return processes
+
+    def rss_mb(self, key: str) -> float:
+        """
+        Get the resident memory of the processes of a driver and their children in MB
+        :param key: Identifier of the driver
+        """
+        if psutil is None:
+            return 0.0
+        processes = {}
+        for process in self.tracked.get(key, []):
+            if not self._is_running(process):
+                continue
+            try:
+                root = psutil.Process(process["pid"])
+                processes[root.pid] = root
+                # Renderers are started after launch and were never snapshotted
+                processes.update((child.pid, child) for child in root.children(recursive=True))
+            except psutil.Error:
+                continue
+        total = 0
+        for process in processes.values():
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1024 ** 2
+
+    def track(self, key: str, before: Set[Tuple[int, float]]) -> int:
+        """
+        Record the processes started since a snapshot
+        :param key: Identifier of the driver
+        :param before: Snapshot taken before the driver was launched
+        :return: Number of processes tracked
+        """
+        if psutil is None:
+            return 0
+        # Processes started in between for another driver, e.g. a shared Playwright server, stay theirs
+        owned = {(process["pid"], process["create_time"]) for processes in self.tracked.values()
+                 for process in processes}
+        started = [{"pid": pid, "create_time": create_time}
+                   for pid, create_time in self.snapshot() - before - owned]
+        self.tracked.setdefault(key, []).extend(started)
+        self._save()
+        return len(started)
+
+    def reap(self, key: str) -> int:
+        """
+        Kill the processes of a driver that are still running after it was quit
+        :return: Number of leaked processes
+        """
+        leaked = self._reap(self.tracked.pop(key, []), self.grace_period)
+        self._save()
+        return leaked
+
+    def reap_all(self) -> int:
+        """Kill every tracked process still running and remove the registry file"""
+        processes = [process for processes in self.tracked.values() for process in processes]
+        self.tracked = {}
+        leaked = self._reap(processes, self.grace_period)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return leaked
+
+    @classmethod
+    def reap_leftovers(cls, registry_dir: str = "framework/reports/pids") -> int:
+        """
+        Reap the processes of previous sessions on this host whose owner is gone
+        :return: Number of leftover processes killed
+        """
+        if psutil is None:
+            return 0
+        leaked = 0
+        for path in glob.glob(os.path.join(registry_dir, f"{socket.gethostname()}-*.json")):
+            try:
+                with open(path) as f:
+                    registry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if cls._is_running(registry["owner"]):
+                continue
+            leaked += cls._reap(registry["processes"], grace_period=0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return leaked
+
+    def _save(self):
+        if psutil is None:
+            return
+        os.makedirs(self.registry_dir, exist_ok=True)
+        owner = psutil.Process()
+        registry = {
+            "owner": {"pid": owner.pid, "create_time": owner.create_time()},
+            "processes": [process for processes in self.tracked.values() for process in processes]
+        }
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(registry, f)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    @staticmethod
+    def _is_running(process: Dict) -> bool:
+        """Check a recorded process still runs, the create time guards against reused pids"""
+        try:
+            return psutil.Process(process["pid"]).create_time() == process["create_time"]
+        except psutil.Error:
+            return False
+
+    @classmethod
+    def _reap(cls, processes: List[Dict], grace_period: float) -> int:
+        if psutil is None:
+            return 0
+        alive = []
+        for process in processes:
+            if not cls._is_running(process):
+                continue
+            try:
+                root = psutil.Process(process["pid"])
+                alive.append(root)
+                # Browsers spawn renderers after launch, those were never snapshotted
+                alive.extend(root.children(recursive=True))
+            except psutil.Error:
+                continue
+        alive = list({process.pid: process for process in alive}.values())
+        if grace_period and alive:
+            _, alive = psutil.wait_procs(alive, timeout=grace_period)
+        for process in alive:
+            try:
+                process.terminate()
+            except psutil.Error:
+                pass
+        _, remaining = psutil.wait_procs(alive, timeout=5)
+        for process in remaining:
+            try:
+                process.kill()
+            except psutil.Error:
+                pass
+        return len(alive)
@@ -0,0 +1,143 @@
+import errno
+import os
+import shutil
+import sys
+import time
+import uuid
+from typing import Callable, Optional
+
+# Linux ioctl cloning a file's extents copy-on-write (btrfs, xfs, bcachefs, overlayfs on those)
+FICLONE = 0x40049409
+# Held by the running browser, a copy must not inherit them
+LOCK_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "LOCK"}
+# Profile directories of cache entries clones may share as hardlinks: Chrome checksums every
+# entry, so a clone updating a shared entry at worst turns it into a cache miss elsewhere.
+# All other profile files are databases written in place and are always copied.
+CACHE_DIRS = {"Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "GraphiteDawnCache"}
+
+
+class ProfileTemplate:
+    """
+    A browser user data directory warmed once per session and cloned for every test, so
+    each browser starts with a primed HTTP and code cache and without first-run work.
+    Workers of a run share the template: the first one builds it while the others wait.
+    """
+
+    def __init__(self, root: str, key: str, build_timeout: float = 180):
+        """
+        :param root: Directory holding the templates and clones, on one filesystem so hardlinks work
+        :param key: Identifies the template, the run id shares it between the workers of a run
+        :param build_timeout: Seconds to wait for another worker building the template
+        """
+        self.directory = os.path.join(root, key)
+        self.template_dir = os.path.join(self.directory, "template")
+        self.build_timeout = build_timeout
+        self.stats = {"clones": 0, "reflinked": 0, "hardlinked": 0, "copied": 0}
+        self._reflink = sys.platform.startswith("linux")
+
+    def ensure(self, build: Callable[[str], None]) -> str:
+        """
+        Build the template unless this or another worker already did
+        :param build: Warms a user data directory, e.g. BrowserManager.build_profile_template
+        :return: Template directory
+        """
+        if os.path.isdir(self.template_dir):
+            return self.template_dir
+        os.makedirs(self.directory, exist_ok=True)
+        marker = os.path.join(self.directory, ".building")
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return self._wait_for_template(marker)
+
+        staging = os.path.join(self.directory, f"staging-{uuid.uuid4().hex}")
+        try:
+            build(staging)
+            for lock in LOCK_FILES:
+                self._remove(os.path.join(staging, lock))
+            os.rename(staging, self.template_dir)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            self._remove(marker)
+        return self.template_dir
+
+    def _wait_for_template(self, marker: str) -> str:
+        deadline = time.monotonic() + self.build_timeout
+        while os.path.exists(marker) and time.monotonic() < deadline:
+            time.sleep(0.5)
+        if not os.path.isdir(self.template_dir):
+            raise RuntimeError(f"Browser profile template was not built in {self.directory}")
+        return self.template_dir
+
+    def clone(self, name: str) -> str:
+        """
+        Create the user data directory of one browser from the template, copy-on-write where
+        the filesystem supports it, otherwise hardlinking cache entries and copying the rest
+        :param name: Readable part of the clone's directory name, e.g. the test name
+        :return: Clone directory, remove it with discard() after the browser quit
+        """
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)[-80:]
+        clone_dir = os.path.join(self.directory, "clones", f"{safe_name}-{uuid.uuid4().hex[:8]}")
+        for current, dirs, files in os.walk(self.template_dir):
+            relative = os.path.relpath(current, self.template_dir)
+            target = os.path.normpath(os.path.join(clone_dir, relative))
+            os.makedirs(target, exist_ok=True)
+            shared = bool(CACHE_DIRS.intersection(relative.split(os.sep)))
+            for file_name in files:
+                if file_name not in LOCK_FILES:
+                    self._clone_file(os.path.join(current, file_name), os.path.join(target, file_name), shared)
+        self.stats["clones"] += 1
+        return clone_dir
+
+    def _clone_file(self, source: str, target: str, shared: bool):
+        if self._reflink and _reflink(source, target):
+            self.stats["reflinked"] += 1
+            return
+        # The first failed clone means the filesystem has no copy-on-write support
+        self._reflink = False
+        if shared:
+            try:
+                os.link(source, target)
+                self.stats["hardlinked"] += 1
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+        self.stats["copied"] += 1
+
+    def discard(self, clone_dir: Optional[str]):
+        """Remove a clone after its browser quit"""
+        if clone_dir:
+            shutil.rmtree(clone_dir, ignore_errors=True)
+
+    def cleanup(self):
+        """Remove the template and any clones left over"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _reflink(source: str, target: str) -> bool:
+    """Clone a file copy-on-write with the FICLONE ioctl"""
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EPERM):
+                raise
+            failed = True
+        else:
+            failed = False
+    if failed:
+        os.remove(target)
+        return False
+    shutil.copystat(source, target)
+    return True
+
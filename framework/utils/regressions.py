@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from framework.utils.results_store import ResultsStore
+
+# Metric name prefix of the per test page-object method durations recorded with --trace-commands
+PAGE_METRIC_PREFIX = "page:"
+# Scales the median absolute deviation to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+
+class RegressionDetector:
+    """
+    Compares the durations of a run against the previous runs with the same platform,
+    browser and environment. Only passed tests are compared, failures end early or time out.
+    - Tests have one duration per run: it is flagged when its robust z-score against the
+      median and MAD of the previous runs exceeds z_threshold.
+    - Page-object methods have many durations per run: the run's durations are compared
+      with the pooled durations of the previous runs by a one-sided Mann-Whitney U test.
+    Both also have to be min_slowdown slower than the baseline median, so significant but
+    negligible changes are not flagged.
+    """
+
+    def __init__(self, store: ResultsStore, last_runs: int = 20, min_runs: int = 5, z_threshold: float = 3.5,
+                 p_threshold: float = 0.01, min_slowdown: float = 0.2, min_delta: float = 0.25):
+        """
+        :param store: Results store holding the run and its history
+        :param last_runs: Previous runs forming the baseline
+        :param min_runs: Fewest baseline durations needed to judge a test or method
+        :param z_threshold: Robust z-score above which a test duration is significant
+        :param p_threshold: Mann-Whitney p-value below which a method slowdown is significant
+        :param min_slowdown: Smallest relative slowdown flagged, 0.2 is 20% slower
+        :param min_delta: Smallest absolute test slowdown in seconds flagged
+        """
+        self.store = store
+        self.last_runs = last_runs
+        self.min_runs = min_runs
+        self.z_threshold = z_threshold
+        self.p_threshold = p_threshold
+        self.min_slowdown = min_slowdown
+        self.min_delta = min_delta
+
+    def detect(self, run_id: str) -> Dict[str, Any]:
+        """
+        Find the tests and page-object methods of a run that got slower
+        :return: Baseline runs, settings and the regressions, largest slowdown first
+        """
+        baseline_runs = self.store.get_comparable_runs(run_id, last_runs=self.last_runs)
+        result = {
+            "run_id": run_id,
+            "baseline_runs": baseline_runs,
+            "settings": {"last_runs": self.last_runs, "min_runs": self.min_runs, "z_threshold": self.z_threshold,
+                         "p_threshold": self.p_threshold, "min_slowdown": self.min_slowdown,
+                         "min_delta": self.min_delta},
+            "tests": [],
+            "page_methods": []
+        }
+        if len(baseline_runs) < self.min_runs:
+            return result
+        result["tests"] = self._test_regressions(run_id, baseline_runs)
+        result["page_methods"] = self._method_regressions(run_id, baseline_runs)
+        return result
+
+    def _test_regressions(self, run_id: str, baseline_runs: List[str]) -> List[Dict[str, Any]]:
+        current: Dict[str, float] = {}
+        history: Dict[str, List[float]] = {}
+        for row in self.store.get_passed_durations([run_id, *baseline_runs]):
+            if row["run_id"] == run_id:
+                current[row["nodeid"]] = row["duration"]
+            else:
+                history.setdefault(row["nodeid"], []).append(row["duration"])
+
+        regressions = []
+        for nodeid, duration in current.items():
+            samples = np.array(history.get(nodeid, []), dtype=float)
+            if len(samples) < self.min_runs:
+                continue
+            median = float(np.median(samples))
+            mad = float(np.median(np.abs(samples - median)))
+            # A test with identical past durations has no spread, floor the scale at 5% of the median
+            scale = max(MAD_SCALE * mad, 0.05 * median, 0.01)
+            z_score = (duration - median) / scale
+            slowdown = _slowdown(duration, median)
+            if z_score >= self.z_threshold and slowdown >= self.min_slowdown and duration - median >= self.min_delta:
+                regressions.append({
+                    "name": nodeid, "baseline_median": round(median, 3), "baseline_mad": round(mad, 3),
+                    "current": round(duration, 3), "slowdown": round(slowdown, 3), "z_score": round(z_score, 2),
+                    "samples": len(samples)
+                })
+        return sorted(regressions, key=lambda regression: -regression["slowdown"])
+
+    def _method_regressions(self, run_id: str, baseline_runs: List[str]) -> List[Dict[str, Any]]:
+        current: Dict[str, List[float]] = {}
+        history: Dict[str, List[float]] = {}
+        for row in self.store.get_metric_values([run_id, *baseline_runs], PAGE_METRIC_PREFIX):
+            samples = current if row["run_id"] == run_id else history
+            samples.setdefault(row["name"][len(PAGE_METRIC_PREFIX):], []).append(row["value"])
+
+        regressions = []
+        for method, values in current.items():
+            samples = np.array(history.get(method, []), dtype=float)
+            values = np.array(values, dtype=float)
+            if len(samples) < self.min_runs or len(values) < 3:
+                continue
+            median, baseline_median = float(np.median(values)), float(np.median(samples))
+            slowdown = _slowdown(median, baseline_median)
+            if slowdown < self.min_slowdown:
+                continue
+            p_value = mann_whitney_greater(values, samples)
+            if p_value < self.p_threshold:
+                regressions.append({
+                    "name": method, "baseline_median": round(baseline_median, 4), "current": round(median, 4),
+                    "slowdown": round(slowdown, 3), "p_value": float(f"{p_value:.3g}"),
+                    "calls": len(values), "samples": len(samples)
+                })
+        return sorted(regressions, key=lambda regression: -regression["slowdown"])
+
+
+def mann_whitney_greater(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    One-sided Mann-Whitney U test that x tends to be larger than y
+    :return: p-value from the normal approximation with tie and continuity correction
+    """
+    n1, n2 = len(x), len(y)
+    values = np.concatenate((x, y))
+    ranks = _average_ranks(values)
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    _, ties = np.unique(values, return_counts=True)
+    variance = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks, tied values get the average of their ranks"""
+    order = np.argsort(values, kind="mergesort")
+    _, first, counts = np.unique(values[order], return_index=True, return_counts=True)
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(first + (counts + 1) / 2, counts)
+    return ranks
+
+
+def _slowdown(current: float, baseline: float) -> float:
+    return current / baseline - 1 if baseline > 0 else float(current > 0)
+
+
+def write_regressions(result: Dict[str, Any], path: str):
+    """Write the regressions of a run as JSON for CI tooling"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+
+
+def regressions_above(result: Dict[str, Any], percent: float) -> List[Dict[str, Any]]:
+    """Get the flagged tests and methods slowed down by at least percent"""
+    return [regression for regression in result["tests"] + result["page_methods"]
+            if regression["slowdown"] * 100 >= percent]
+
+
+def format_regressions(result: Dict[str, Any]) -> List[str]:
+    """Summary lines for the terminal"""
+    if len(result["baseline_runs"]) < result["settings"]["min_runs"]:
+        return [f"Duration regressions: not checked, {len(result['baseline_runs'])} comparable previous runs"]
+    lines = [f"Duration regressions against {len(result['baseline_runs'])} previous runs: "
+             f"{len(result['tests'])} tests, {len(result['page_methods'])} page methods"]
+    for regression in result["tests"] + result["page_methods"]:
+        lines.append(f"  {regression['name']}: {regression['baseline_median']}s -> {regression['current']}s "
+                     f"(+{regression['slowdown']:.0%})")
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Check a stored run for duration regressions, exits 1 on regressions above --fail-above:
+        python -m framework.utils.regressions [--run-id RUN_ID] [--fail-above PERCENT]
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.regressions")
+    parser.add_argument("--run-id", help="Run to check, defaults to the latest finished run")
+    parser.add_argument("--reports-dir", default="framework/reports")
+    parser.add_argument("--last-runs", type=int, default=20, help="Previous runs forming the baseline")
+    parser.add_argument("--fail-above", type=float, default=None, metavar="PERCENT",
+                        help="Exit 1 when a regression is at least PERCENT slower")
+    parser.add_argument("--output", help="JSON output, defaults to results/regressions.json in the reports dir")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(os.path.join(args.reports_dir, "results.db"))
+    run_id: Optional[str] = args.run_id
+    if run_id is None:
+        latest = store.get_runs(limit=1)
+        if not latest:
+            print("No finished runs in the results store")
+            return 1
+        run_id = latest[0]["run_id"]
+    result = RegressionDetector(store, last_runs=args.last_runs).detect(run_id)
+    write_regressions(result, args.output or os.path.join(args.reports_dir, "results", "regressions.json"))
+    print("\n".join(format_regressions(result)))
+    if args.fail_above is not None and regressions_above(result, args.fail_above):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,51 @@
-import json
 import os
+import sys
+import argparse
 import datetime
-import pandas as pd
-import plotly.graph_objects as go
-from typing import Dict, List, Any
-from jinja2 import Environment, FileSystemLoader
+import shutil
+import functools
+import subprocess
+import importlib.util
+from typing import Dict, List, Any, Optional
+import numpy as np
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from framework.config.config import Config
+from framework.utils.duration_stats import compact_timeline, summarize_run
+from framework.utils.regressions import RegressionDetector, write_regressions
+from framework.utils.results_store import ResultsStore
+
+
+@functools.lru_cache(maxsize=None)
+def _get_environment(templates_dir: str, cache_dir: str) -> Environment:
+    """
+    Get the shared Jinja environment of a templates directory. Compiled templates are
+    cached in memory and as bytecode on disk, so report processes do not recompile them.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(templates_dir),
+        bytecode_cache=FileSystemBytecodeCache(cache_dir)
+    )
 
 
 class TestReporting:
-    def __init__(self, reports_dir: str = "framework/reports"):
+    def __init__(self, reports_dir: str = "framework/reports", store: Optional[ResultsStore] = None,
+                 raw_runs: int = None, rollup_days: int = None, retention_days: int = None):
+        """
+        :param reports_dir: Root directory of the reports
+        :param store: Results store, defaults to results.db in reports_dir
+        :param raw_runs: Runs kept individually in the trend index, older runs become daily rollups
+        :param rollup_days: Days of daily rollups kept in the trend index
+        :param retention_days: Days of raw results kept in the results store
+        """
         self.reports_dir = reports_dir
+        self.raw_runs = raw_runs or Config.TREND_RAW_RUNS
+        self.rollup_days = rollup_days or Config.TREND_ROLLUP_DAYS
+        self.retention_days = retention_days or Config.RESULTS_RETENTION_DAYS
         self.results_dir = os.path.join(reports_dir, "results")
         self.trends_dir = os.path.join(reports_dir, "trends")
         self.templates_dir = os.path.join("framework", "templates")
+        self.store = store or ResultsStore(os.path.join(reports_dir, "results.db"))
         
         # Create necessary directories
         for dir_path in [self.results_dir, self.trends_dir]:
@@ -25,152 +58,265 @@ class TestReporting:
             return
         
         # Create trend graphs
-        self._create_pass_fail_trend(trend_data)
-        self._create_duration_trend(trend_data)
-        self._create_flaky_tests_trend(trend_data)
+        figures = {
+            "pass_fail_trend": self._create_pass_fail_trend(trend_data),
+            "duration_trend": self._create_duration_trend(trend_data),
+            "flaky_tests_trend": self._create_flaky_tests_trend(trend_data)
+        }
         
         # Generate HTML report
-        self._generate_trend_html(trend_data)
+        self._generate_trend_html(trend_data, figures)
     
     def generate_run_report(self, run_info: Dict):
         """Generate detailed HTML report for current test run"""
         # Load performance data
-        perf_data = self._load_performance_data()
+        perf_data = self._load_performance_data(run_info["run_id"])
         
         # Generate test execution timeline
-        timeline_data = self._generate_timeline(perf_data)
+        timeline_data = self._generate_timeline(perf_data, run_info["start_time"])
+        
+        # Duration percentiles by module, class, marker and platform, slowest tests and setup cost
+        duration_stats = summarize_run(perf_data["tests"], perf_data["markers"], run_info.get("platform"))
+        
+        # Tests and page methods significantly slower than in the previous runs, also as JSON for CI.
+        # With --fail-on-regression the session already detected them, its result is reused.
+        regressions = run_info.get("regressions")
+        if not regressions or "settings" not in regressions:
+            regressions = RegressionDetector(
+                self.store, last_runs=run_info.get("regression_runs") or 20
+            ).detect(run_info["run_id"])
+        write_regressions(regressions, os.path.join(self.results_dir, "regressions.json"))
         
         # Generate performance graphs
         perf_graphs = self._generate_performance_graphs(perf_data)
         
         # Create HTML report
-        self._generate_run_html(run_info, timeline_data, perf_graphs)
+        self._generate_run_html(run_info, timeline_data, perf_graphs, duration_stats, regressions)
     
+    def generate_reports(self, run_id: str, trends: bool = True):
+        """
+        Generate the reports of a stored run
+        :param run_id: Run to report, see ResultsStore.start_run
+        :param trends: Also regenerate the trend report
+        """
+        run_info = self.store.get_run(run_id)
+        if run_info is None:
+            raise ValueError(f"Unknown run: {run_id}")
+        self.generate_run_report(run_info)
+        if trends:
+            self.generate_trend_report()
+
+    @staticmethod
+    def generate_in_background(run_id: str, reports_dir: str = "framework/reports",
+                               db_path: str = None) -> subprocess.Popen:
+        """
+        Generate the reports of a run in a detached process, so the test session can exit
+        :param db_path: Results store, defaults to results.db in reports_dir
+        :return: Report process, its output goes to logs/report.log
+        """
+        os.makedirs(os.path.join(reports_dir, "logs"), exist_ok=True)
+        with open(os.path.join(reports_dir, "logs", "report.log"), "a") as log:
+            return subprocess.Popen(
+                [sys.executable, "-m", "framework.utils.reporting", "report", "--run-id", run_id,
+                 "--reports-dir", reports_dir, *(["--db", db_path] if db_path else [])],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+
+    def _get_template(self, name: str):
+        environment = _get_environment(self.templates_dir, os.path.join(self.reports_dir, ".template_cache"))
+        return environment.get_template(name)
+
     def _collect_historical_data(self) -> List[Dict]:
-        """Collect data from previous test runs"""
-        trend_data = []
-        for filename in os.listdir(self.results_dir):
-            if filename.startswith("run_info_") and filename.endswith(".json"):
-                with open(os.path.join(self.results_dir, filename)) as f:
-                    run_data = json.load(f)
-                    trend_data.append(run_data)
-        return sorted(trend_data, key=lambda x: x["start_time"])
+        """
+        Collect data from previous test runs, only runs finished since the last report are ingested.
+        Raw results beyond the retention window are pruned once they are in the trend index.
+        """
+        self.store.update_trend_index(self.raw_runs, self.rollup_days)
+        self.store.prune_results(self.retention_days)
+        return self.store.get_trend_data()
     
-    def _create_pass_fail_trend(self, trend_data: List[Dict]):
+    def _create_pass_fail_trend(self, trend_data: List[Dict]) -> Dict:
         """Create pass/fail trend graph"""
-        dates = [run["start_time"][:10] for run in trend_data]
-        passed = [run.get("passed", 0) for run in trend_data]
-        failed = [run.get("failed", 0) for run in trend_data]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=passed, name="Passed", line=dict(color="green")))
-        fig.add_trace(go.Scatter(x=dates, y=failed, name="Failed", line=dict(color="red")))
-        
-        fig.update_layout(title="Test Results Trend", xaxis_title="Date", yaxis_title="Number of Tests")
-        fig.write_html(os.path.join(self.trends_dir, "pass_fail_trend.html"))
+        dates = [run["date"] for run in trend_data]
+        return _figure(
+            [_line(dates, [run.get("passed", 0) for run in trend_data], "Passed", "#28a745"),
+             _line(dates, [run.get("failed", 0) for run in trend_data], "Failed", "#dc3545")],
+            "Test Results Trend", "Date", "Number of Tests"
+        )
     
-    def _create_duration_trend(self, trend_data: List[Dict]):
+    def _create_duration_trend(self, trend_data: List[Dict]) -> Dict:
         """Create test duration trend graph"""
-        dates = [run["start_time"][:10] for run in trend_data]
-        durations = []
-        
-        for run in trend_data:
-            start = datetime.datetime.fromisoformat(run["start_time"])
-            end = datetime.datetime.fromisoformat(run["end_time"])
-            duration = (end - start).total_seconds() / 60  # Convert to minutes
-            durations.append(duration)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=durations, name="Duration"))
-        
-        fig.update_layout(title="Test Duration Trend", xaxis_title="Date", yaxis_title="Duration (minutes)")
-        fig.write_html(os.path.join(self.trends_dir, "duration_trend.html"))
+        dates = [run["date"] for run in trend_data]
+        return _figure(
+            [_line(dates, [run["duration_minutes"] for run in trend_data], "Duration", "#17a2b8")],
+            "Test Duration Trend", "Date", "Duration (minutes)"
+        )
     
-    def _create_flaky_tests_trend(self, trend_data: List[Dict]):
+    def _create_flaky_tests_trend(self, trend_data: List[Dict]) -> Dict:
         """Create flaky tests trend graph"""
-        dates = [run["start_time"][:10] for run in trend_data]
-        flaky_tests = [run.get("retry_stats", {}).get("flaky_tests", 0) for run in trend_data]
-        retried_tests = [run.get("retry_stats", {}).get("retried_tests", 0) for run in trend_data]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=flaky_tests, name="Flaky Tests"))
-        fig.add_trace(go.Scatter(x=dates, y=retried_tests, name="Retried Tests"))
-        
-        fig.update_layout(title="Test Flakiness Trend", xaxis_title="Date", yaxis_title="Number of Tests")
-        fig.write_html(os.path.join(self.trends_dir, "flaky_tests_trend.html"))
+        dates = [run["date"] for run in trend_data]
+        return _figure(
+            [_line(dates, [run.get("flaky_tests", 0) for run in trend_data], "Flaky Tests", "#ffc107"),
+             _line(dates, [run.get("retried_tests", 0) for run in trend_data], "Retried Tests", "#fd7e14")],
+            "Test Flakiness Trend", "Date", "Number of Tests"
+        )
     
-    def _load_performance_data(self) -> Dict:
+    def _load_performance_data(self, run_id: str) -> Dict:
         """Load performance data from current run"""
-        perf_file = os.path.join(self.results_dir, "performance_report.json")
-        if os.path.exists(perf_file):
-            with open(perf_file) as f:
-                return json.load(f)
-        return {}
+        heap_sizes = self.store.get_metrics(run_id, "JSHeapUsedSize")
+        tests = self.store.get_tests(run_id)
+        for test in tests:
+            if test["nodeid"] in heap_sizes:
+                test["memory"] = {"used_js_heap_size": heap_sizes[test["nodeid"]]}
+        return {"tests": tests, "markers": self.store.get_markers(run_id)}
     
-    def _generate_timeline(self, perf_data: Dict) -> Dict:
-        """Generate test execution timeline"""
-        timeline = []
-        for test_id, test_data in perf_data.get("tests", {}).items():
-            timeline.append({
-                "test_id": test_id,
-                "start_time": test_data["timestamp"],
-                "duration": test_data["duration"],
-                "outcome": test_data["outcome"]
-            })
-        return sorted(timeline, key=lambda x: x["start_time"])
+    def _generate_timeline(self, perf_data: Dict, start_time: str) -> Dict:
+        """Generate test execution timeline as compact columns, paged through by timeline.js"""
+        return compact_timeline(perf_data["tests"], start_time)
     
     def _generate_performance_graphs(self, perf_data: Dict) -> Dict:
-        """Generate performance-related graphs"""
+        """Generate performance-related graphs as Plotly figure data"""
         graphs = {}
         
-        # Test duration distribution
-        durations = [t["duration"] for t in perf_data.get("tests", {}).values()]
-        if durations:
-            fig = go.Figure(data=[go.Histogram(x=durations)])
-            fig.update_layout(title="Test Duration Distribution", xaxis_title="Duration (seconds)", yaxis_title="Count")
-            graphs["duration_dist"] = fig.to_html()
+        # Test duration distribution, binned here so the payload does not grow with the suite
+        durations = np.array([t["duration"] for t in perf_data["tests"] if t["duration"] is not None], dtype=float)
+        if len(durations):
+            counts, edges = np.histogram(durations, bins=30)
+            graphs["duration_dist"] = _figure(
+                [{"type": "bar", "x": np.round((edges[:-1] + edges[1:]) / 2, 3).tolist(), "y": counts.tolist(),
+                  "marker": {"color": "#17a2b8"}}],
+                "Test Duration Distribution", "Duration (seconds)", "Count"
+            )
         
         # Memory usage over time (if available)
-        memory_data = []
-        for test_data in perf_data.get("tests", {}).values():
-            if "memory" in test_data:
-                memory_data.append({
-                    "timestamp": test_data["timestamp"],
-                    "used_memory": test_data["memory"]["used_js_heap_size"] / (1024 * 1024)  # Convert to MB
-                })
-        
+        memory_data = sorted(
+            (test_data["timestamp"], round(test_data["memory"]["used_js_heap_size"] / (1024 * 1024), 2))
+            for test_data in perf_data["tests"] if "memory" in test_data
+        )
         if memory_data:
-            df = pd.DataFrame(memory_data)
-            fig = go.Figure(data=[go.Scatter(x=df["timestamp"], y=df["used_memory"])])
-            fig.update_layout(title="Memory Usage Over Time", xaxis_title="Time", yaxis_title="Used Memory (MB)")
-            graphs["memory_usage"] = fig.to_html()
+            timestamps, used_memory = zip(*memory_data)
+            graphs["memory_usage"] = _figure(
+                [_line(list(timestamps), list(used_memory), "Used JS heap", "#6f42c1")],
+                "Memory Usage Over Time", "Time", "Used Memory (MB)"
+            )
         
         return graphs
     
-    def _generate_trend_html(self, trend_data: List[Dict]):
+    def _write_assets(self) -> Dict[str, str]:
+        """
+        Copy the shared report assets to reports_dir/assets once: the stylesheet, the lazy
+        chart loader and the plotly.js bundle of the installed plotly package
+        :return: Asset paths relative to a report directory
+        """
+        assets_dir = os.path.join(self.reports_dir, "assets")
+        os.makedirs(assets_dir, exist_ok=True)
+        sources = {
+            "css": os.path.join(self.templates_dir, "assets", "report.css"),
+            "js": os.path.join(self.templates_dir, "assets", "report.js"),
+            "timeline": os.path.join(self.templates_dir, "assets", "timeline.js"),
+            "plotly": _plotly_bundle()
+        }
+        assets = {}
+        for name, source in sources.items():
+            target = os.path.join(assets_dir, os.path.basename(source))
+            if not os.path.exists(target) or os.path.getsize(target) != os.path.getsize(source):
+                shutil.copyfile(source, target)
+            assets[name] = f"../assets/{os.path.basename(source)}"
+        return assets
+    
+    def _generate_trend_html(self, trend_data: List[Dict], figures: Dict):
         """Generate HTML trend report"""
-        env = Environment(loader=FileSystemLoader(self.templates_dir))
-        template = env.get_template("trend_report.html")
+        template = self._get_template("trend_report.html")
         
         html_content = template.render(
             trend_data=trend_data,
+            figures=figures,
+            assets=self._write_assets(),
             generated_at=datetime.datetime.now().isoformat()
         )
         
         with open(os.path.join(self.trends_dir, "trend_report.html"), "w") as f:
             f.write(html_content)
     
-    def _generate_run_html(self, run_info: Dict, timeline_data: List[Dict], perf_graphs: Dict):
+    def _generate_run_html(self, run_info: Dict, timeline_data: Dict, perf_graphs: Dict, duration_stats: Dict,
+                           regressions: Dict):
         """Generate HTML report for current run"""
-        env = Environment(loader=FileSystemLoader(self.templates_dir))
-        template = env.get_template("run_report.html")
+        template = self._get_template("run_report.html")
+        
+        run_info = dict(run_info)
+        if run_info.get("end_time"):
+            run_info["duration_minutes"] = (
+                datetime.datetime.fromisoformat(run_info["end_time"])
+                - datetime.datetime.fromisoformat(run_info["start_time"])
+            ).total_seconds() // 60
         
         html_content = template.render(
             run_info=run_info,
             timeline_data=timeline_data,
             perf_graphs=perf_graphs,
+            duration_stats=duration_stats,
+            regressions=regressions,
+            assets=self._write_assets(),
             generated_at=datetime.datetime.now().isoformat()
         )
         
         with open(os.path.join(self.results_dir, "run_report.html"), "w") as f:
-            f.write(html_content) 
\ No newline at end of file
+            f.write(html_content) 
+
+
+def _figure(traces: List[Dict], title: str, xaxis_title: str, yaxis_title: str) -> Dict:
+    """Build Plotly figure data, rendered in the browser by report.js"""
+    return {
+        "data": traces,
+        "layout": {"title": {"text": title}, "xaxis": {"title": {"text": xaxis_title}},
+                   "yaxis": {"title": {"text": yaxis_title}}, "margin": {"t": 50}}
+    }
+
+
+def _line(x: List, y: List, name: str, color: str) -> Dict:
+    return {"type": "scatter", "mode": "lines+markers", "x": x, "y": y, "name": name, "line": {"color": color}}
+
+
+def _plotly_bundle() -> str:
+    """
+    Path of the plotly.js bundle shipped with the plotly package. Reports must open without
+    network access, so there is no CDN fallback.
+    """
+    spec = importlib.util.find_spec("plotly")
+    bundle = None
+    if spec and spec.origin:
+        bundle = os.path.join(os.path.dirname(spec.origin), "package_data", "plotly.min.js")
+    if bundle is None or not os.path.exists(bundle):
+        raise RuntimeError("The plotly.js bundle of the plotly package is needed for the reports, "
+                           "install the requirements (pip install -r requirements.txt)")
+    return bundle
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Generate reports from the stored results:
+        python -m framework.utils.reporting report [--run-id RUN_ID] [--no-trends]
+    """
+    parser = argparse.ArgumentParser(prog="python -m framework.utils.reporting")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--run-id", help="Run to report, defaults to the latest finished run")
+    parser.add_argument("--reports-dir", default="framework/reports")
+    parser.add_argument("--db", help="Results store, defaults to results.db in the reports dir")
+    parser.add_argument("--no-trends", action="store_true", help="Skip the trend report")
+    args = parser.parse_args(argv)
+
+    reporting = TestReporting(args.reports_dir, store=ResultsStore(args.db) if args.db else None)
+    run_id = args.run_id
+    if run_id is None:
+        latest = reporting.store.get_runs(limit=1)
+        if not latest:
+            print("No finished runs in the results store")
+            return 1
+        run_id = latest[0]["run_id"]
+    reporting.generate_reports(run_id, trends=not args.no_trends)
+    print(f"Reports generated for run {run_id} in {args.reports_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import json
+import math
+import os
+import shutil
+import subprocess
+from typing import Any, Dict, Optional
+
+from framework.utils.results_store import ResultsStore
+
+try:
+    import psutil
+except ImportError:  # Memory based planning falls back to sysconf, footprints are not measured
+    psutil = None
+
+
+# Footprint assumed per worker when no run has measured it yet, in MB
+DEFAULT_FOOTPRINTS_MB = {
+    "chrome": 700,
+    "firefox": 600,
+    "playwright": 500,
+    "android": 300,
+    "ios": 300
+}
+
+
+def available_memory_mb() -> Optional[float]:
+    """Get the memory available to new processes in MB"""
+    if psutil:
+        return psutil.virtual_memory().available / 1024 ** 2
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def process_tree_rss_mb(pid: int = None, include_root: bool = True) -> Optional[float]:
+    """
+    Get the resident memory of a process and all its descendants in MB
+    :param pid: Root process, defaults to the current process
+    :param include_root: Include the root process itself
+    :return: RSS in MB, None if psutil is not installed or the process is gone
+    """
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(pid)
+        processes = root.children(recursive=True) + ([root] if include_root else [])
+    except psutil.Error:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 1024 ** 2
+
+
+def device_inventory(platform: str) -> Optional[int]:
+    """
+    Count the connected devices and booted simulators for a mobile platform
+    :return: Number of devices, None if the platform tooling is not installed
+    """
+    try:
+        if platform == "android" and shutil.which("adb"):
+            output = subprocess.run(["adb", "devices"], capture_output=True, text=True, timeout=10).stdout
+            return sum(1 for line in output.splitlines()[1:] if line.strip().endswith("\tdevice"))
+        if platform == "ios" and shutil.which("xcrun"):
+            output = subprocess.run(["xcrun", "simctl", "list", "devices", "booted", "-j"],
+                                    capture_output=True, text=True, timeout=10).stdout
+            return sum(len(devices) for devices in json.loads(output)["devices"].values())
+    except (subprocess.SubprocessError, ValueError, KeyError):
+        return None
+    return None
+
+
+class WorkerPlanner:
+    """
+    Chooses the number of xdist workers from the resources that actually bound a run:
+    CPU cores, current load, available memory divided by the measured per-worker browser
+    footprint, and for mobile runs the number of connected devices.
+    """
+
+    def __init__(self, store: ResultsStore, reserved_memory_mb: float = 1024):
+        """
+        :param store: Results store with the browser_rss_mb metric of previous runs
+        :param reserved_memory_mb: Memory left for the system and the pytest processes
+        """
+        self.store = store
+        self.reserved_memory_mb = reserved_memory_mb
+
+    def footprint_mb(self, platform: str, browser: str) -> Dict[str, Any]:
+        """Get the measured or default memory footprint of one worker"""
+        engine = platform if platform in ("android", "ios") else browser
+        measured = self.store.get_metric_percentile(
+            "browser_rss_mb", 0.9, {"platform": platform, "browser": browser}
+        )
+        if measured:
+            return {"engine": engine, "footprint_mb": round(measured, 1), "source": "measured (p90)"}
+        return {"engine": engine, "footprint_mb": DEFAULT_FOOTPRINTS_MB.get(engine, 700), "source": "default"}
+
+    def plan(self, platform: str, browser: str, devices: int = None) -> Dict[str, Any]:
+        """
+        Decide the worker count
+        :param platform: Target platform
+        :param browser: Target browser
+        :param devices: Number of devices, detected when omitted
+        :return: Decision with the limit of every resource and the one that bound it
+        """
+        mobile = platform in ("android", "ios")
+        cpu_count = os.cpu_count() or 1
+        limits: Dict[str, int] = {}
+        inputs: Dict[str, Any] = {"cpu_count": cpu_count}
+
+        if mobile:
+            devices = devices if devices is not None else device_inventory(platform)
+            if devices is not None:
+                inputs["devices"] = devices
+                limits["devices"] = max(1, devices)
+        # Mobile sessions run on the devices, cores only bound them without a device inventory
+        if not mobile or "devices" not in limits:
+            limits["cpu"] = max(1, cpu_count - 1)
+
+        if hasattr(os, "getloadavg"):
+            load = os.getloadavg()[0]
+            inputs["load_average"] = round(load, 2)
+            limits["load"] = max(1, math.floor(cpu_count - load))
+
+        memory = available_memory_mb()
+        footprint = self.footprint_mb(platform, browser)
+        inputs.update(footprint)
+        if memory is not None:
+            inputs["available_memory_mb"] = round(memory)
+            limits["memory"] = max(1, int((memory - self.reserved_memory_mb) // footprint["footprint_mb"]))
+
+        bound_by = min(limits, key=limits.get)
+        return {
+            "workers": limits[bound_by],
+            "bound_by": bound_by,
+            "limits": limits,
+            "inputs": inputs,
+            "reason": f"{limits[bound_by]} workers limited by {bound_by} "
+                      f"({', '.join(f'{name}={value}' for name, value in limits.items())})"
+        }
@@ -0,0 +1,549 @@
+import datetime
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+
+class ResultsStore:
+    """
+    Append-only SQLite results store shared by all processes of a run. The database is
+    in WAL mode, so xdist workers can append test results concurrently while reports
+    read from it.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            start_time TEXT NOT NULL,
+            end_time TEXT,
+            exit_status INTEGER,
+            info TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            nodeid TEXT NOT NULL,
+            worker TEXT,
+            outcome TEXT NOT NULL,
+            duration REAL,
+            setup_duration REAL,
+            call_duration REAL,
+            teardown_duration REAL,
+            retries INTEGER DEFAULT 0,
+            flaky INTEGER DEFAULT 0,
+            timestamp TEXT
+        );
+        CREATE TABLE IF NOT EXISTS metrics (
+            test_id INTEGER NOT NULL REFERENCES tests(id),
+            name TEXT NOT NULL,
+            value REAL
+        );
+        CREATE TABLE IF NOT EXISTS test_markers (
+            test_id INTEGER NOT NULL REFERENCES tests(id),
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS test_dependencies (
+            nodeid TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (nodeid, kind, name)
+        );
+        CREATE TABLE IF NOT EXISTS memory_samples (
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            worker TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            worker_rss_mb REAL,
+            browser_rss_mb REAL,
+            available_mb REAL
+        );
+        CREATE TABLE IF NOT EXISTS trend_runs (
+            run_id TEXT PRIMARY KEY,
+            start_time TEXT NOT NULL,
+            day TEXT NOT NULL,
+            platform TEXT,
+            browser TEXT,
+            environment TEXT,
+            total_tests INTEGER,
+            passed INTEGER,
+            failed INTEGER,
+            skipped INTEGER,
+            retried_tests INTEGER,
+            flaky_tests INTEGER,
+            duration_minutes REAL
+        );
+        CREATE TABLE IF NOT EXISTS trend_daily (
+            day TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL,
+            total_tests INTEGER,
+            passed INTEGER,
+            failed INTEGER,
+            skipped INTEGER,
+            retried_tests INTEGER,
+            flaky_tests INTEGER,
+            duration_minutes REAL
+        );
+        CREATE TABLE IF NOT EXISTS trend_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_end_time ON runs(end_time);
+        CREATE INDEX IF NOT EXISTS idx_tests_run ON tests(run_id);
+        CREATE INDEX IF NOT EXISTS idx_memory_samples_run ON memory_samples(run_id);
+        CREATE INDEX IF NOT EXISTS idx_tests_nodeid ON tests(nodeid);
+        CREATE INDEX IF NOT EXISTS idx_metrics_test ON metrics(test_id);
+        CREATE INDEX IF NOT EXISTS idx_test_markers_test ON test_markers(test_id);
+    """
+
+    def __init__(self, db_path: str = "framework/reports/results.db", timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front and waits up to timeout for other writers
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def close(self):
+        """Close the connection of this process"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def start_run(self, run_info: Dict[str, Any]) -> str:
+        """
+        Register a new run
+        :param run_info: Run configuration, must contain start_time
+        :return: Run id to pass to the workers
+        """
+        run_id = uuid.uuid4().hex
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO runs (run_id, start_time, info) VALUES (?, ?, ?)",
+                (run_id, run_info["start_time"], json.dumps(run_info))
+            )
+        return run_id
+
+    def finish_run(self, run_id: str, exit_status: int):
+        """Mark a run as finished"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE runs SET end_time = ?, exit_status = ? WHERE run_id = ?",
+                (datetime.datetime.now().isoformat(), int(exit_status), run_id)
+            )
+
+    def record_test(self, run_id: str, nodeid: str, outcome: str, phases: Dict[str, float],
+                    duration: float = None, worker: str = "main", retries: int = 0, flaky: bool = False,
+                    metrics: Dict[str, Any] = None, markers: Iterable[str] = None, timestamp: str = None):
+        """
+        Append the result of one test
+        :param run_id: Run the test belongs to
+        :param nodeid: pytest node id
+        :param outcome: Final outcome of the test
+        :param phases: Durations of the setup/call/teardown phases in seconds
+        :param duration: Total duration, defaults to the sum of the phases
+        :param worker: xdist worker id
+        :param retries: Number of retries the test needed
+        :param flaky: Whether the test is marked as flaky
+        :param metrics: Numeric metrics of the test (e.g. web vitals)
+        :param markers: Names of the markers of the test
+        :param timestamp: Start time of the test
+        """
+        numeric_metrics = [(name, value) for name, value in (metrics or {}).items()
+                           if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO tests (run_id, nodeid, worker, outcome, duration, setup_duration, call_duration, "
+                "teardown_duration, retries, flaky, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, nodeid, worker, outcome,
+                 duration if duration is not None else sum(phases.values()),
+                 phases.get("setup"), phases.get("call"), phases.get("teardown"),
+                 retries, int(flaky), timestamp or datetime.datetime.now().isoformat())
+            )
+            if numeric_metrics:
+                connection.executemany(
+                    "INSERT INTO metrics (test_id, name, value) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, name, value) for name, value in numeric_metrics]
+                )
+            if markers:
+                connection.executemany(
+                    "INSERT INTO test_markers (test_id, name) VALUES (?, ?)",
+                    [(cursor.lastrowid, name) for name in markers]
+                )
+
+    def record_memory_samples(self, run_id: str, worker: str, samples: List[Dict[str, Any]]):
+        """
+        Append RSS samples of a worker
+        :param samples: Samples with timestamp, worker_rss_mb, browser_rss_mb and available_mb
+        """
+        if not samples:
+            return
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT INTO memory_samples (run_id, worker, timestamp, worker_rss_mb, browser_rss_mb, available_mb) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, worker, sample["timestamp"], sample["worker_rss_mb"], sample["browser_rss_mb"],
+                  sample["available_mb"]) for sample in samples]
+            )
+
+    def get_memory_samples(self, run_id: str) -> List[Dict[str, Any]]:
+        """Get the RSS samples of all workers of a run ordered by time"""
+        rows = self.connection.execute(
+            "SELECT * FROM memory_samples WHERE run_id = ? ORDER BY timestamp", (run_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def update_run_info(self, run_id: str, values: Dict[str, Any]):
+        """Merge additional values into the info of a run, dictionaries are merged one level deep"""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT info FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return
+            info = json.loads(row["info"])
+            for key, value in values.items():
+                # Workers add their own entries to shared dictionaries
+                if isinstance(value, dict) and isinstance(info.get(key), dict):
+                    info[key].update(value)
+                else:
+                    info[key] = value
+            connection.execute("UPDATE runs SET info = ? WHERE run_id = ?", (json.dumps(info), run_id))
+
+    def get_duration_estimates(self, last_runs: int = 10) -> Dict[str, float]:
+        """
+        Estimate test durations from the most recent finished runs
+        :param last_runs: Number of runs to look back
+        :return: Median duration in seconds keyed by node id
+        """
+        rows = self.connection.execute(
+            """
+            SELECT nodeid, duration FROM tests
+            WHERE outcome IN ('passed', 'failed') AND duration IS NOT NULL AND run_id IN (
+                SELECT run_id FROM runs WHERE end_time IS NOT NULL ORDER BY start_time DESC LIMIT ?
+            )
+            """,
+            (last_runs,)
+        ).fetchall()
+        durations: Dict[str, List[float]] = {}
+        for row in rows:
+            durations.setdefault(row["nodeid"], []).append(row["duration"])
+        return {nodeid: statistics.median(values) for nodeid, values in durations.items()}
+
+    def get_metric_percentile(self, name: str, percentile: float, info: Dict[str, Any] = None,
+                              last_runs: int = 10) -> Optional[float]:
+        """
+        Get a percentile of a metric over the most recent finished runs
+        :param name: Metric name
+        :param percentile: Percentile between 0 and 1
+        :param info: Only use runs whose info has these values, e.g. {"browser": "chrome"}
+        :param last_runs: Number of matching runs to look back
+        :return: Metric value, None without samples
+        """
+        conditions = ["end_time IS NOT NULL"]
+        params: List[Any] = []
+        for key, value in (info or {}).items():
+            conditions.append("json_extract(info, ?) IS ?")
+            params.extend([f"$.{key}", value])
+        rows = self.connection.execute(
+            f"""
+            SELECT metrics.value FROM metrics JOIN tests ON tests.id = metrics.test_id
+            WHERE metrics.name = ? AND metrics.value IS NOT NULL AND tests.run_id IN (
+                SELECT run_id FROM runs WHERE {" AND ".join(conditions)} ORDER BY start_time DESC LIMIT ?
+            )
+            ORDER BY metrics.value
+            """,
+            (name, *params, last_runs)
+        ).fetchall()
+        if not rows:
+            return None
+        return rows[min(len(rows) - 1, int(percentile * len(rows)))]["value"]
+
+    def get_comparable_runs(self, run_id: str,
+                            keys: Iterable[str] = ("platform", "browser", "environment", "launch_profile"),
+                            last_runs: int = 20) -> List[str]:
+        """
+        Get the finished runs started before a run with the same info values
+        :param keys: Run info keys that must match, e.g. durations are only comparable per browser
+        :param last_runs: Number of runs to look back
+        :return: Run ids, newest first
+        """
+        run = self.get_run(run_id)
+        if run is None:
+            return []
+        conditions = ["end_time IS NOT NULL", "start_time < ?"]
+        params: List[Any] = [run["start_time"]]
+        for key in keys:
+            conditions.append("json_extract(info, ?) IS ?")
+            params.extend([f"$.{key}", run.get(key)])
+        rows = self.connection.execute(
+            f"SELECT run_id FROM runs WHERE {' AND '.join(conditions)} ORDER BY start_time DESC LIMIT ?",
+            (*params, last_runs)
+        ).fetchall()
+        return [row["run_id"] for row in rows]
+
+    def get_passed_durations(self, run_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get run id, node id and duration of the passed tests of runs"""
+        rows = self.connection.execute(
+            f"SELECT run_id, nodeid, duration FROM tests WHERE outcome = 'passed' AND duration IS NOT NULL "
+            f"AND run_id IN ({', '.join('?' * len(run_ids))})",
+            run_ids
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_metric_values(self, run_ids: List[str], prefix: str) -> List[Dict[str, Any]]:
+        """Get run id, name and value of the metrics starting with a prefix of the passed tests of runs"""
+        rows = self.connection.execute(
+            f"""
+            SELECT tests.run_id, metrics.name, metrics.value FROM metrics JOIN tests ON tests.id = metrics.test_id
+            WHERE tests.outcome = 'passed' AND metrics.value IS NOT NULL AND metrics.name LIKE ? || '%'
+            AND tests.run_id IN ({', '.join('?' * len(run_ids))})
+            """,
+            (prefix, *run_ids)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def record_test_dependencies(self, nodeid: str, dependencies: Dict[str, Iterable[str]]):
+        """
+        Replace the recorded dependencies of a test
+        :param nodeid: pytest node id
+        :param dependencies: Names keyed by kind ('class', 'method', 'locator', 'module')
+        """
+        rows = [(nodeid, kind, name) for kind, names in dependencies.items() for name in names]
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM test_dependencies WHERE nodeid = ?", (nodeid,))
+            connection.executemany("INSERT INTO test_dependencies (nodeid, kind, name) VALUES (?, ?, ?)", rows)
+
+    def get_test_dependencies(self) -> Dict[str, Dict[str, Set[str]]]:
+        """Get the recorded dependencies of all tests keyed by node id and kind"""
+        dependencies: Dict[str, Dict[str, Set[str]]] = {}
+        for row in self.connection.execute("SELECT nodeid, kind, name FROM test_dependencies"):
+            dependencies.setdefault(row["nodeid"], {}).setdefault(row["kind"], set()).add(row["name"])
+        return dependencies
+
+    def get_test_history(self, last_runs: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the results of the most recent finished runs
+        :param last_runs: Number of runs to look back
+        :return: Results with outcome, retries, flaky and duration per node id, newest first
+        """
+        rows = self.connection.execute(
+            """
+            SELECT tests.nodeid, tests.outcome, tests.retries, tests.flaky, tests.duration FROM tests
+            JOIN (SELECT run_id, start_time FROM runs WHERE end_time IS NOT NULL
+                  ORDER BY start_time DESC LIMIT ?) AS recent ON recent.run_id = tests.run_id
+            ORDER BY recent.start_time DESC
+            """,
+            (last_runs,)
+        ).fetchall()
+        history: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            history.setdefault(row["nodeid"], []).append(dict(row))
+        return history
+
+    def update_trend_index(self, raw_runs: int = 100, rollup_days: int = 365) -> int:
+        """
+        Ingest the runs finished since the last update into the trend index. The newest
+        raw_runs runs are kept individually, older ones are folded into daily rollups
+        and rollups older than rollup_days are dropped, so the index stays bounded.
+        :param raw_runs: Number of runs kept individually
+        :param rollup_days: Days of daily rollups kept
+        :return: Number of runs ingested
+        """
+        trend_columns = ("total_tests", "passed", "failed", "skipped", "retried_tests", "flaky_tests",
+                         "duration_minutes")
+        with self._transaction() as connection:
+            row = connection.execute("SELECT value FROM trend_state WHERE key = 'last_end_time'").fetchone()
+            watermark = row["value"] if row else ""
+            new_runs = connection.execute(
+                "SELECT * FROM runs WHERE end_time > ? ORDER BY end_time", (watermark,)
+            ).fetchall()
+            for run_row in new_runs:
+                run = self._run_from_row(run_row)
+                duration = (datetime.datetime.fromisoformat(run["end_time"])
+                            - datetime.datetime.fromisoformat(run["start_time"])).total_seconds() / 60
+                connection.execute(
+                    "INSERT OR REPLACE INTO trend_runs (run_id, start_time, day, platform, browser, environment, "
+                    f"{', '.join(trend_columns)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run["run_id"], run["start_time"], run["start_time"][:10], run.get("platform"),
+                     run.get("browser"), run.get("environment"), run["total_tests"], run["passed"], run["failed"],
+                     run["skipped"], run["retry_stats"]["retried_tests"], run["retry_stats"]["flaky_tests"],
+                     round(duration, 3))
+                )
+            if new_runs:
+                connection.execute(
+                    "INSERT OR REPLACE INTO trend_state (key, value) VALUES ('last_end_time', ?)",
+                    (new_runs[-1]["end_time"],)
+                )
+
+            # Fold runs beyond the raw window into their day
+            expired = "SELECT run_id FROM trend_runs ORDER BY start_time DESC LIMIT -1 OFFSET ?"
+            connection.execute(
+                f"""
+                INSERT INTO trend_daily (day, runs, {', '.join(trend_columns)})
+                SELECT day, COUNT(*), {', '.join(f'SUM({column})' for column in trend_columns)}
+                FROM trend_runs WHERE run_id IN ({expired}) GROUP BY day
+                ON CONFLICT(day) DO UPDATE SET runs = runs + excluded.runs,
+                    {', '.join(f'{column} = {column} + excluded.{column}' for column in trend_columns)}
+                """,
+                (raw_runs,)
+            )
+            connection.execute(f"DELETE FROM trend_runs WHERE run_id IN ({expired})", (raw_runs,))
+            cutoff = (datetime.date.today() - datetime.timedelta(days=rollup_days)).isoformat()
+            connection.execute("DELETE FROM trend_daily WHERE day < ?", (cutoff,))
+        return len(new_runs)
+
+    def get_trend_data(self) -> List[Dict[str, Any]]:
+        """
+        Get the trend index, oldest first: daily rollups followed by the individual runs.
+        Rollups are averaged per run so they plot on the same scale as single runs.
+        :return: Entries with date, runs, test counts and duration_minutes (averages per run for rollups)
+        """
+        entries = []
+        for row in self.connection.execute("SELECT * FROM trend_daily ORDER BY day"):
+            entry = dict(row)
+            entry["date"] = entry.pop("day")
+            for column in ("total_tests", "passed", "failed", "skipped", "retried_tests", "flaky_tests"):
+                entry[column] = round((entry[column] or 0) / entry["runs"], 1)
+            entry["duration_minutes"] = round(entry["duration_minutes"] / entry["runs"], 3)
+            entries.append(entry)
+        for row in self.connection.execute("SELECT * FROM trend_runs ORDER BY start_time"):
+            entry = dict(row)
+            entry["date"] = entry.pop("day")
+            entry["runs"] = 1
+            entries.append(entry)
+        return entries
+
+    def prune_results(self, retention_days: int) -> int:
+        """
+        Delete runs older than retention_days with their tests, metrics, markers and memory
+        samples. Finished runs are only deleted once they are part of the trend index.
+        :param retention_days: Days of raw results kept
+        :return: Number of runs deleted
+        """
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=retention_days)).isoformat()
+        with self._transaction() as connection:
+            row = connection.execute("SELECT value FROM trend_state WHERE key = 'last_end_time'").fetchone()
+            watermark = row["value"] if row else ""
+            # Runs without an end time crashed and are never ingested
+            expired = "SELECT run_id FROM runs WHERE start_time < ? AND (end_time IS NULL OR end_time <= ?)"
+            expired_tests = f"SELECT id FROM tests WHERE run_id IN ({expired})"
+            connection.execute(f"DELETE FROM metrics WHERE test_id IN ({expired_tests})", (cutoff, watermark))
+            connection.execute(f"DELETE FROM test_markers WHERE test_id IN ({expired_tests})", (cutoff, watermark))
+            connection.execute(f"DELETE FROM tests WHERE run_id IN ({expired})", (cutoff, watermark))
+            connection.execute(f"DELETE FROM memory_samples WHERE run_id IN ({expired})", (cutoff, watermark))
+            return connection.execute(
+                "DELETE FROM runs WHERE start_time < ? AND (end_time IS NULL OR end_time <= ?)", (cutoff, watermark)
+            ).rowcount
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a run with its aggregated test statistics
+        :return: Run info dictionary as used by the report templates
+        """
+        row = self.connection.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._run_from_row(row) if row else None
+
+    def get_runs(self, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Get finished runs ordered by start time
+        :param limit: Only return the most recent runs
+        """
+        query = "SELECT * FROM runs WHERE end_time IS NOT NULL ORDER BY start_time DESC"
+        params: tuple = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        rows = self.connection.execute(query, params).fetchall()
+        return [self._run_from_row(row) for row in reversed(rows)]
+
+    def get_runs_by_info(self, key: str, value: Any) -> List[Dict[str, Any]]:
+        """Get the runs whose info has the given value, e.g. all runs of a matrix"""
+        rows = self.connection.execute(
+            "SELECT * FROM runs WHERE json_extract(info, ?) = ? ORDER BY start_time", (f"$.{key}", value)
+        ).fetchall()
+        return [self._run_from_row(row) for row in rows]
+
+    def get_tests(self, run_id: str) -> List[Dict[str, Any]]:
+        """Get all test results of a run ordered by start time"""
+        rows = self.connection.execute(
+            "SELECT * FROM tests WHERE run_id = ? ORDER BY timestamp", (run_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_metrics(self, run_id: str, name: str) -> Dict[str, float]:
+        """Get one metric for all tests of a run, keyed by node id"""
+        rows = self.connection.execute(
+            "SELECT tests.nodeid, metrics.value FROM metrics JOIN tests ON tests.id = metrics.test_id "
+            "WHERE tests.run_id = ? AND metrics.name = ?", (run_id, name)
+        ).fetchall()
+        return {row["nodeid"]: row["value"] for row in rows}
+
+    def get_markers(self, run_id: str) -> Dict[int, List[str]]:
+        """Get the marker names of all tests of a run, keyed by test id"""
+        rows = self.connection.execute(
+            "SELECT test_markers.test_id, test_markers.name FROM test_markers "
+            "JOIN tests ON tests.id = test_markers.test_id WHERE tests.run_id = ?", (run_id,)
+        ).fetchall()
+        markers: Dict[int, List[str]] = {}
+        for row in rows:
+            markers.setdefault(row["test_id"], []).append(row["name"])
+        return markers
+
+    def _run_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        stats = self.connection.execute(
+            """
+            SELECT COUNT(*) AS total_tests,
+                   COALESCE(SUM(outcome = 'passed'), 0) AS passed,
+                   COALESCE(SUM(outcome = 'failed'), 0) AS failed,
+                   COALESCE(SUM(outcome = 'skipped'), 0) AS skipped,
+                   COALESCE(SUM(retries), 0) AS total_retries,
+                   COALESCE(SUM(retries > 0), 0) AS retried_tests,
+                   COALESCE(SUM(flaky), 0) AS flaky_tests
+            FROM tests WHERE run_id = ?
+            """,
+            (row["run_id"],)
+        ).fetchone()
+
+        run = json.loads(row["info"])
+        run.update({
+            "run_id": row["run_id"],
+            "start_time": row["start_time"],
+            "end_time": row["end_time"],
+            "exit_status": row["exit_status"],
+            "total_tests": stats["total_tests"],
+            "passed": stats["passed"],
+            "failed": stats["failed"],
+            "skipped": stats["skipped"],
+            "retry_stats": {
+                "total_retries": stats["total_retries"],
+                "retried_tests": stats["retried_tests"],
+                "flaky_tests": stats["flaky_tests"]
+            }
+        })
+        return run
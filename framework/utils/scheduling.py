@@ -0,0 +1,136 @@
+import heapq
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Optional
+
+from xdist.scheduler import LoadScheduling
+
+
+def predict_makespan(durations: Iterable[float], workers: int, lpt: bool = True) -> float:
+    """
+    Predict the wall time of dispatching tests to the first idle worker
+    :param durations: Estimated duration of every test, in dispatch order
+    :param workers: Number of parallel workers
+    :param lpt: Dispatch longest-processing-time-first instead of in the given order
+    :return: Predicted makespan in seconds
+    """
+    loads = [0.0] * max(1, workers)
+    for duration in (sorted(durations, reverse=True) if lpt else durations):
+        heapq.heappush(loads, heapq.heappop(loads) + duration)
+    return max(loads)
+
+
+class DurationScheduling(LoadScheduling):
+    """
+    xdist scheduler assigning tests longest-processing-time-first. Tests are ordered by
+    their historical duration and every worker only holds the test it runs plus the
+    next one, so the longest remaining test always goes to the first idle worker.
+    """
+
+    def __init__(self, config, log=None, estimates: Dict[str, float] = None,
+                 default_estimate: Optional[float] = None, priority: Callable[[str], float] = None):
+        """
+        :param estimates: Estimated duration per node id
+        :param default_estimate: Duration assumed for tests without history
+        :param priority: Optional test priority (e.g. fail-first ordering) taking precedence over LPT
+        """
+        super().__init__(config, log)
+        self.estimates = estimates or {}
+        self.priority = priority
+        known = sorted(self.estimates.values())
+        # Unknown tests are assumed to take as long as a typical known test
+        self.default_estimate = default_estimate or (known[len(known) // 2] if known else 10.0)
+        self.predicted_makespan = 0.0
+        self.unknown_tests = 0
+        self._started = 0.0
+        self._finished = 0.0
+        self._busy: Dict[str, float] = defaultdict(float)
+
+    def estimate(self, nodeid: str) -> float:
+        """Get the estimated duration of a test"""
+        return self.estimates.get(nodeid, self.default_estimate)
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        # Initial distribution already happened, top up the nodes
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(self.node2collection.values())[0]
+        if not self.collection:
+            return
+
+        self.pending[:] = range(len(self.collection))
+        self._sort_pending()
+        self.unknown_tests = sum(1 for nodeid in self.collection if nodeid not in self.estimates)
+        self.predicted_makespan = predict_makespan(
+            [self.estimate(self.collection[index]) for index in self.pending], len(self.nodes), lpt=False
+        )
+        self._started = time.monotonic()
+        for node in self.nodes:
+            self._busy[node.gateway.id] = 0.0
+
+        for node in self.nodes:
+            self._send_tests(node, min(2, len(self.pending)))
+            if not self.pending:
+                break
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        if node.shutting_down:
+            return
+        if self.pending:
+            node_pending = self.node2pending[node]
+            if len(node_pending) < 2:
+                self._send_tests(node, 2 - len(node_pending))
+        else:
+            node.shutdown()
+
+    def mark_test_complete(self, node, item_index, duration=0):
+        self._busy[node.gateway.id] += duration
+        self._finished = time.monotonic()
+        super().mark_test_complete(node, item_index, duration)
+
+    def remove_node(self, node):
+        crashitem = super().remove_node(node)
+        # Tests of a crashed node are put back at the end, restore the LPT order
+        if self.collection:
+            self._sort_pending()
+        return crashitem
+
+    def stats(self) -> Dict:
+        """
+        Get the predicted and actual makespan and idle time per worker
+        :return: Dictionary with times in seconds
+        """
+        actual_makespan = max(0.0, self._finished - self._started) if self._started else 0.0
+        idle = {worker: round(max(0.0, actual_makespan - busy), 3) for worker, busy in self._busy.items()}
+        return {
+            "strategy": "priority" if self.priority else "lpt",
+            "predicted_makespan": round(self.predicted_makespan, 3),
+            "actual_makespan": round(actual_makespan, 3),
+            "worker_idle_time": idle,
+            "total_idle_time": round(sum(idle.values()), 3),
+            "unknown_tests": self.unknown_tests,
+            "default_estimate": self.default_estimate
+        }
+
+    def _sort_pending(self):
+        if self.priority:
+            def key(index):
+                nodeid = self.collection[index]
+                return self.priority(nodeid), self.estimate(nodeid)
+        else:
+            def key(index):
+                return self.estimate(self.collection[index])
+        self.pending.sort(key=key, reverse=True)
@@ -1,11 +1,142 @@
-from typing import List, Any, Callable
+from typing import List, Any, Callable, Dict, Iterable, Optional, Tuple, Union
+import re
+import sys
+import time
 import traceback
 from assertpy import assert_that
 
+# lxml evaluates full XPath 1.0 on Appium page sources, ElementTree only a subset
+try:
+    from lxml import etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+# Evaluates Selenium style (by, value) locators in the page and returns, per locator, the
+# match count and the state of the first match
+SNAPSHOT_FUNCTION = """
+function (locators) {
+    function find(by, value) {
+        switch (by) {
+            case 'css selector': return Array.from(document.querySelectorAll(value));
+            case 'id': return Array.from(document.querySelectorAll('[id="' + CSS.escape(value) + '"]'));
+            case 'name': return Array.from(document.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+            case 'class name': return Array.from(document.getElementsByClassName(value));
+            case 'tag name': return Array.from(document.getElementsByTagName(value));
+            case 'link text':
+            case 'partial link text':
+                return Array.from(document.getElementsByTagName('a')).filter(function (a) {
+                    var text = a.innerText.trim();
+                    return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+                });
+            case 'xpath':
+                var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                var nodes = [];
+                for (var i = 0; i < result.snapshotLength; i++) {
+                    // Text and attribute nodes have no state to check
+                    if (result.snapshotItem(i).nodeType === Node.ELEMENT_NODE) { nodes.push(result.snapshotItem(i)); }
+                }
+                return nodes;
+        }
+        throw new Error('unsupported locator strategy ' + by);
+    }
+
+    return locators.map(function (locator) {
+        try {
+            var elements = find(locator[0], locator[1]);
+        } catch (e) {
+            return {count: 0, error: String(e)};
+        }
+        var element = elements[0];
+        if (!element) { return {count: 0}; }
+        var attributes = {};
+        Array.from(element.attributes || []).forEach(function (a) { attributes[a.name] = a.value; });
+        var style = window.getComputedStyle(element);
+        return {
+            count: elements.length,
+            text: (element.innerText || element.textContent || '').trim(),
+            visible: !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length)
+                && style.visibility !== 'hidden',
+            enabled: !element.disabled,
+            selected: !!(element.checked || element.selected),
+            value: element.value === undefined ? null : element.value,
+            attributes: attributes
+        };
+    });
+}
+"""
+
+Locator = Tuple[str, str]
+
+
+class Condition:
+    """A check on the snapshot of the elements matching a locator"""
+
+    def __init__(self, description: str, check: Callable[[Dict[str, Any]], bool]):
+        self.description = description
+        self.check = check
+
+    def __call__(self, element: Dict[str, Any]) -> bool:
+        return bool(self.check(element))
+
+
+CONDITIONS = {
+    "present": Condition("present", lambda e: e["count"] > 0),
+    "absent": Condition("absent", lambda e: e["count"] == 0),
+    "visible": Condition("visible", lambda e: e["count"] > 0 and e["visible"]),
+    "hidden": Condition("hidden", lambda e: e["count"] == 0 or not e["visible"]),
+    "enabled": Condition("enabled", lambda e: e["count"] > 0 and e["enabled"]),
+    "disabled": Condition("disabled", lambda e: e["count"] > 0 and not e["enabled"]),
+    "selected": Condition("selected", lambda e: e["count"] > 0 and e["selected"])
+}
+
+
+def text_equals(expected: str) -> Condition:
+    return Condition(f"text == {expected!r}", lambda e: e["count"] > 0 and e["text"] == expected)
+
+
+def text_contains(expected: str) -> Condition:
+    return Condition(f"text containing {expected!r}", lambda e: e["count"] > 0 and expected in (e["text"] or ""))
+
+
+def text_matches(pattern: str) -> Condition:
+    return Condition(f"text matching {pattern!r}",
+                     lambda e: e["count"] > 0 and re.search(pattern, e["text"] or "") is not None)
+
+
+def count_is(expected: int) -> Condition:
+    return Condition(f"{expected} elements", lambda e: e["count"] == expected)
+
+
+def value_is(expected: str) -> Condition:
+    return Condition(f"value == {expected!r}", lambda e: e["count"] > 0 and e["value"] == expected)
+
+
+def attribute_is(name: str, expected: str) -> Condition:
+    return Condition(f"{name} == {expected!r}",
+                     lambda e: e["count"] > 0 and (e["attributes"] or {}).get(name) == expected)
+
+
+class _Failure:
+    """A failed assertion, its traceback is only formatted when verify_all reports it"""
+    __slots__ = ("message", "error", "location")
+
+    def __init__(self, message: str, error: Optional[BaseException] = None,
+                 location: Optional[Tuple[str, int, str]] = None):
+        self.message = message
+        self.error = error
+        self.location = location
+
+    def format(self) -> str:
+        if self.error is not None:
+            details = "".join(traceback.format_exception(type(self.error), self.error, self.error.__traceback__))
+        else:
+            details = 'File "{}", line {}, in {}\n'.format(*self.location)
+        return f"{self.message}\n{details}"
+
 
 class SoftAssert:
     def __init__(self):
-        self._errors: List[str] = []
+        self._errors: List[_Failure] = []
         self._current_test: str = ""
 
     def assert_that(self, value: Any) -> 'assertpy.AssertionBuilder':
@@ -17,7 +148,7 @@ class SoftAssert:
         try:
             return assert_that(value)
         except AssertionError as e:
-            self._errors.append(f"{str(e)}\n{traceback.format_exc()}")
+            self._errors.append(_Failure(str(e), e))
             return assert_that(value)
 
     def assert_true(self, condition: bool, message: str = None):
@@ -29,8 +160,7 @@ class SoftAssert:
         try:
             assert_that(condition).is_true()
         except AssertionError as e:
-            error_message = message if message else str(e)
-            self._errors.append(f"{error_message}\n{traceback.format_exc()}")
+            self._errors.append(_Failure(message if message else str(e), e))
 
     def assert_false(self, condition: bool, message: str = None):
         """
@@ -41,8 +171,7 @@ class SoftAssert:
         try:
             assert_that(condition).is_false()
         except AssertionError as e:
-            error_message = message if message else str(e)
-            self._errors.append(f"{error_message}\n{traceback.format_exc()}")
+            self._errors.append(_Failure(message if message else str(e), e))
 
     def assert_equals(self, actual: Any, expected: Any, message: str = None):
         """
@@ -54,18 +183,142 @@ class SoftAssert:
         try:
             assert_that(actual).is_equal_to(expected)
         except AssertionError as e:
-            error_message = message if message else str(e)
-            self._errors.append(f"{error_message}\n{traceback.format_exc()}")
+            self._errors.append(_Failure(message if message else str(e), e))
+
+    def expect_page(self, page: Any,
+                    expectations: Dict[Locator, Union[str, Callable, Iterable[Union[str, Callable]]]],
+                    message: str = None, timeout: float = 0, poll_interval: float = 0.25) -> bool:
+        """
+        Assert the state of many elements from one snapshot of the page: one script execution
+        on web, one page source on Appium, instead of a driver call per check
+        :param page: Page object or driver
+        :param expectations: Conditions keyed by (by, value) locator, a condition is a name from
+            CONDITIONS, a Condition such as text_contains("x") or a list of them
+        :param message: Optional custom message prefixed to every failure
+        :param timeout: Seconds to keep taking snapshots until all conditions hold, a snapshot
+            that raises (e.g. during a navigation) is retried until then as well
+        :param poll_interval: Seconds between snapshots while waiting
+        :return: True if all conditions held
+        """
+        caller = sys._getframe(1)
+        location = (caller.f_code.co_filename, caller.f_lineno, caller.f_code.co_name)
+        checks = [(locator, _as_condition(condition)) for locator, conditions in expectations.items()
+                  for condition in _as_list(conditions)]
+        driver = getattr(page, "driver", page)
+        locators = list(expectations)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                elements = dict(zip(locators, take_snapshot(driver, locators)))
+                error = None
+            except Exception as e:
+                # A navigation destroys the execution context mid-snapshot, the next one usually succeeds
+                error = e
+            # Errors raised by the conditions themselves are the caller's and propagate
+            failed = checks if error else [(locator, condition) for locator, condition in checks
+                                           if not condition(elements[locator])]
+            if not failed or time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+
+        prefix = f"{message}: " if message else ""
+        if error is not None:
+            self._errors.append(_Failure(
+                f"{prefix}page snapshot failed: {type(error).__name__}: {error}",
+                location=location
+            ))
+            return False
+        for locator, condition in failed:
+            element = elements[locator]
+            found = _describe_element(element)
+            self._errors.append(_Failure(
+                f"{prefix}{locator[0]}={locator[1]} expected {condition.description}, found {found}",
+                location=location
+            ))
+        return not failed
 
     def verify_all(self):
         """
         Verifies all assertions and raises AssertionError if any failed
         """
         if self._errors:
-            raise AssertionError("\n".join(self._errors))
+            raise AssertionError("\n".join(failure.format() for failure in self._errors))
 
     def reset(self):
         """
         Resets the soft assert instance
         """
-        self._errors = [] 
\ No newline at end of file
+        self._errors = []
+
+
+def take_snapshot(driver: Any, locators: List[Locator]) -> List[Dict[str, Any]]:
+    """
+    Snapshot the elements matching each locator in a single driver round trip
+    :return: Per locator the match count and the text, visibility, enabled, selected, value
+        and attributes of the first match
+    """
+    locators = [list(locator) for locator in locators]
+    if hasattr(driver, "goto"):  # Playwright
+        return driver.evaluate(SNAPSHOT_FUNCTION, locators)
+    if hasattr(driver, "start_recording_screen"):  # Appium: evaluate on the page source
+        return _snapshot_page_source(driver.page_source, locators)
+    return driver.execute_script(f"return ({SNAPSHOT_FUNCTION})(arguments[0]);", locators)
+
+
+def _snapshot_page_source(page_source: str, locators: List[List[str]]) -> List[Dict[str, Any]]:
+    """Evaluate locators on an Appium page source (UiAutomator2 or XCUITest XML)"""
+    root = etree.fromstring(page_source.encode("utf-8"))
+    snapshots = []
+    for by, value in locators:
+        if by == "xpath":
+            # ElementTree only understands a subset of XPath relative to the root
+            if hasattr(root, "xpath"):
+                elements = root.xpath(value)
+            else:
+                elements = root.findall(f".{value}" if value.startswith("/") else value)
+        elif by == "id":
+            elements = [e for e in root.iter() if value in (e.get("resource-id"), e.get("name"))]
+        elif by == "accessibility id":
+            elements = [e for e in root.iter() if value in (e.get("content-desc"), e.get("name"))]
+        elif by == "class name":
+            elements = [e for e in root.iter() if e.tag == value or e.get("class") == value]
+        else:
+            snapshots.append({"count": 0, "error": f"unsupported locator strategy {by} for a page source snapshot"})
+            continue
+        if not elements:
+            snapshots.append({"count": 0})
+            continue
+        attributes = dict(elements[0].attrib)
+        snapshots.append({
+            "count": len(elements),
+            "text": attributes.get("text") or attributes.get("value") or attributes.get("label") or "",
+            "visible": (attributes.get("displayed") or attributes.get("visible") or "true") == "true",
+            "enabled": attributes.get("enabled", "true") == "true",
+            "selected": "true" in (attributes.get("checked"), attributes.get("selected")),
+            "value": attributes.get("value"),
+            "attributes": attributes
+        })
+    return snapshots
+
+
+def _as_list(conditions: Any) -> List[Any]:
+    return list(conditions) if isinstance(conditions, (list, tuple, set)) else [conditions]
+
+
+def _as_condition(condition: Union[str, Callable]) -> Condition:
+    if isinstance(condition, Condition):
+        return condition
+    if isinstance(condition, str):
+        if condition not in CONDITIONS:
+            raise ValueError(f"Unknown condition '{condition}', use one of {', '.join(CONDITIONS)}")
+        return CONDITIONS[condition]
+    return Condition(getattr(condition, "__name__", repr(condition)), condition)
+
+
+def _describe_element(element: Dict[str, Any]) -> str:
+    if element.get("error"):
+        return f"an error: {element['error']}"
+    if not element["count"]:
+        return "no element"
+    return (f"{element['count']} element(s), first with text {element['text']!r}, "
+            f"{'visible' if element['visible'] else 'hidden'}, {'enabled' if element['enabled'] else 'disabled'}")
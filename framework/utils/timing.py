@@ -0,0 +1,165 @@
+import datetime
+import glob
+import heapq
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def summarize_phases(item: Any) -> Tuple[Dict[str, float], str]:
+    """
+    Get the phase durations and final outcome of a test
+    :param item: pytest Item with rep_setup/rep_call/rep_teardown attributes
+    :return: Tuple of (durations by phase, outcome)
+    """
+    phases = {}
+    outcome = "passed"
+    for when in ("setup", "call", "teardown"):
+        report = getattr(item, f"rep_{when}", None)
+        if report is None:
+            continue
+        phases[when] = report.duration
+        if report.failed:
+            outcome = "failed"
+        elif report.outcome != "passed" and outcome == "passed":
+            outcome = report.outcome
+    return phases, outcome
+
+
+class TimingCollector:
+    """
+    Records setup/call/teardown and fixture durations per test. Every process streams
+    one JSON line per test to its own file, so xdist workers never share a file and
+    memory does not grow with the suite; the controller merges the files at the end.
+    """
+
+    def __init__(self, results_dir: str = "framework/reports/results", worker_id: str = "main"):
+        self.results_dir = results_dir
+        self.timings_dir = os.path.join(results_dir, "timings")
+        self.worker_id = worker_id
+        self.path = os.path.join(self.timings_dir, f"{worker_id}.jsonl")
+        self._file = None
+        self._current: Optional[Dict[str, Any]] = None
+        self._started = 0.0
+
+    def reset(self, worker_only: bool = False):
+        """
+        Remove timing files of a previous run, called once by the controller
+        :param worker_only: Only remove this process's file, e.g. for a distributed node
+            sharing the results directory with other nodes
+        """
+        if worker_only:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        shutil.rmtree(self.timings_dir, ignore_errors=True)
+        os.makedirs(self.timings_dir, exist_ok=True)
+
+    def start_test(self, nodeid: str):
+        """Start timing a test"""
+        self._started = time.perf_counter()
+        self._current = {
+            "nodeid": nodeid,
+            "worker": self.worker_id,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "fixtures": {}
+        }
+
+    def add_fixture(self, argname: str, scope: str, when: str, duration: float):
+        """
+        Record a fixture setup or teardown duration for the running test
+        :param argname: Fixture name
+        :param scope: Fixture scope
+        :param when: 'setup' or 'teardown'
+        :param duration: Duration in seconds
+        """
+        if self._current is None:
+            return
+        fixture = self._current["fixtures"].setdefault(argname, {"scope": scope})
+        fixture[when] = round(duration, 6)
+
+    def finish_test(self, item: Any):
+        """
+        Write the record of the running test using the phase reports stored on the item
+        :param item: pytest Item with rep_setup/rep_call/rep_teardown attributes
+        """
+        if self._current is None:
+            return
+        record, self._current = self._current, None
+        record["duration"] = time.perf_counter() - self._started
+
+        record["phases"], record["outcome"] = summarize_phases(item)
+
+        metrics = getattr(item, "performance_metrics", None)
+        if metrics:
+            record["web_vitals"] = metrics["summary"]
+            if "JSHeapUsedSize" in metrics["cdp"]:
+                record["memory"] = {"used_js_heap_size": metrics["cdp"]["JSHeapUsedSize"]}
+
+        if self._file is None:
+            os.makedirs(self.timings_dir, exist_ok=True)
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """Close the worker file"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def merge(self, output_file: Optional[str] = None, top: int = 5, worker_only: bool = False) -> Dict[str, Any]:
+        """
+        Merge all worker files into one performance report. Records are streamed from
+        the worker files into the report, only the summary is kept in memory.
+        :param output_file: Report path, defaults to results/performance_report.json
+        :param top: Number of slowest and fastest tests in the summary
+        :param worker_only: Only merge this process's file
+        :return: Summary of the run
+        """
+        output_file = output_file or os.path.join(self.results_dir, "performance_report.json")
+        count = 0
+        total_duration = 0.0
+        slowest: List = []
+        fastest: List = []
+
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, "w") as out:
+            out.write('{"tests": [')
+            paths = [self.path] if worker_only else sorted(glob.glob(os.path.join(self.timings_dir, "*.jsonl")))
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Last line of a worker that crashed mid-write
+                            continue
+                        out.write(("\n" if count == 0 else ",\n") + json.dumps(record))
+                        count += 1
+                        duration = record["duration"]
+                        total_duration += duration
+                        heapq.heappush(slowest, (duration, record["nodeid"]))
+                        heapq.heappush(fastest, (-duration, record["nodeid"]))
+                        if len(slowest) > top:
+                            heapq.heappop(slowest)
+                        if len(fastest) > top:
+                            heapq.heappop(fastest)
+
+            summary = {
+                "total_tests": count,
+                "total_duration": total_duration,
+                "average_duration": total_duration / count if count else 0,
+                "slowest_tests": [{"nodeid": nodeid, "duration": duration}
+                                  for duration, nodeid in sorted(slowest, reverse=True)],
+                "fastest_tests": [{"nodeid": nodeid, "duration": -duration}
+                                  for duration, nodeid in sorted(fastest, reverse=True)]
+            }
+            out.write('\n], "summary": ' + json.dumps(summary, indent=2) + "}\n")
+
+        os.replace(temp_file, output_file)
+        return summary
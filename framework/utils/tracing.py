@@ -0,0 +1,278 @@
+import functools
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pytest
+
+from framework.utils.patching import is_wrapper, mark_wrapper, patch
+
+
+class Tracer:
+    """
+    Records nested spans as Chrome Trace Event "complete" events. While disabled,
+    span() hands out a shared no-op context manager so call sites cost almost nothing.
+    """
+
+    def __init__(self, pid: int = 0):
+        self.enabled = False
+        self.pid = pid
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str = "command", **args):
+        """
+        Record the duration of a block as a span
+        :param name: Span name shown in the trace viewer
+        :param category: Trace event category
+        :param args: Extra values shown with the span
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    @contextmanager
+    def _span(self, name: str, category: str, args: Dict[str, Any]) -> Iterator[None]:
+        token = self.begin(name, category, **args)
+        try:
+            yield
+        finally:
+            self.end(token)
+
+    def begin(self, name: str, category: str = "command", **args) -> Optional[Dict[str, Any]]:
+        """Start a span that is finished later with end()"""
+        if not self.enabled:
+            return None
+        return {"name": name, "cat": category, "ph": "X", "ts": time.time_ns() // 1000,
+                "pid": self.pid, "tid": threading.get_ident(), "args": args}
+
+    def end(self, token: Optional[Dict[str, Any]]):
+        """Finish a span started with begin()"""
+        if token is None:
+            return
+        token["dur"] = time.time_ns() // 1000 - token["ts"]
+        with self._lock:
+            self._events.append(token)
+
+    def totals(self, category: str) -> Dict[str, float]:
+        """Summed duration in seconds of the recorded spans of a category, keyed by span name"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for event in self._events:
+                if event["cat"] == category:
+                    totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1e6
+        return totals
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return and forget all recorded events"""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# Process wide tracer used by the instrumentation below
+tracer = Tracer()
+
+
+class TraceWriter:
+    """
+    Streams events to disk in the Chrome Trace JSON array format, which Perfetto and
+    chrome://tracing load even if the closing bracket is missing after a crash.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._file = open(path, "w")
+        self._file.write("[\n")
+        self._first = True
+
+    def write(self, events: List[Dict[str, Any]]):
+        for event in events:
+            self._file.write(("" if self._first else ",\n") + json.dumps(event))
+            self._first = False
+        self._file.flush()
+
+    def close(self):
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+def instrument_class(cls: type, category: str = "page") -> List[Callable[[], None]]:
+    """
+    Wrap the public methods defined on a class with spans
+    :return: Callables restoring the original methods
+    """
+    restore = []
+    for attr_name, attr in list(vars(cls).items()):
+        if attr_name.startswith("_") or not inspect.isfunction(attr) or is_wrapper(attr, "traced"):
+            continue
+        span_name = f"{cls.__name__}.{attr_name}"
+        restore.append(patch(cls, attr_name, _traced(attr, span_name, category)))
+    return restore
+
+
+def instrument_selenium() -> List[Callable[[], None]]:
+    """Trace every WebDriver command (covers Appium) and WebDriverWait polling"""
+    try:
+        from selenium.webdriver.remote.webdriver import WebDriver
+        from selenium.webdriver.support.wait import WebDriverWait
+    except ImportError:
+        return []
+
+    original_execute = WebDriver.execute
+    original_until = WebDriverWait.until
+    original_until_not = WebDriverWait.until_not
+
+    @functools.wraps(original_execute)
+    def execute(self, driver_command, params=None):
+        args = {key: params[key] for key in ("using", "value") if params and key in params}
+        with tracer.span(driver_command, "driver", **args):
+            return original_execute(self, driver_command, params)
+
+    def wrap_wait(original, name):
+        @functools.wraps(original)
+        def wait(self, method, message=""):
+            with tracer.span(name, "wait", timeout=self._timeout):
+                return original(self, _traced(method, "poll", "wait"), message)
+        return wait
+
+    return [
+        patch(WebDriver, "execute", execute),
+        patch(WebDriverWait, "until", wrap_wait(original_until, "WebDriverWait.until")),
+        patch(WebDriverWait, "until_not", wrap_wait(original_until_not, "WebDriverWait.until_not"))
+    ]
+
+
+def instrument_playwright() -> List[Callable[[], None]]:
+    """Trace every protocol message the Playwright client sends to the browser"""
+    try:
+        from playwright._impl._connection import Channel
+    except ImportError:
+        return []
+
+    original_send = Channel.send
+
+    @functools.wraps(original_send)
+    async def send(self, method, *args, **kwargs):
+        with tracer.span(method, "driver"):
+            return await original_send(self, method, *args, **kwargs)
+
+    return [patch(Channel, "send", send)]
+
+
+def _traced(func: Callable, span_name: str, category: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracer.span(span_name, category):
+            return func(*args, **kwargs)
+    return mark_wrapper(wrapper, "traced")
+
+
+class CommandTracingPlugin:
+    """
+    pytest plugin for --trace-commands. Registered only when the option is given, so
+    no hooks or wrappers exist otherwise.
+    """
+
+    def __init__(self, mode: str = "worker", output_dir: str = "framework/reports/traces"):
+        self.mode = mode
+        self.output_dir = output_dir
+        self.worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        digits = re.sub(r"\D", "", self.worker_id)
+        tracer.pid = int(digits) if digits else 0
+        self._restore: List[Callable[[], None]] = []
+        self._writer: Optional[TraceWriter] = None
+
+    def pytest_sessionstart(self, session):
+        tracer.enabled = True
+        self._restore.extend(instrument_selenium())
+        self._restore.extend(instrument_playwright())
+
+    def pytest_collection_finish(self, session):
+        from framework.core.base_page import BasePage
+
+        pending = [BasePage]
+        while pending:
+            cls = pending.pop()
+            pending.extend(cls.__subclasses__())
+            self._restore.extend(instrument_class(cls))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        with tracer.span(item.nodeid, "test"):
+            yield
+        self._flush(item.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        with tracer.span("setup", "phase"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with tracer.span("call", "phase"):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        with tracer.span("teardown", "phase"):
+            yield
+        # Events are drained per test, so these are the page method spans of this test
+        item.page_method_durations = tracer.totals("page")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        # Finalizers run last-in-first-out, so these two bracket the fixture's own teardown
+        teardown = {}
+        fixturedef.addfinalizer(lambda: tracer.end(teardown.pop("token", None)))
+        with tracer.span(f"setup {fixturedef.argname}", "fixture", scope=fixturedef.scope):
+            yield
+        fixturedef.addfinalizer(
+            lambda: teardown.update(token=tracer.begin(f"teardown {fixturedef.argname}", "fixture"))
+        )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        # Runs after session scoped fixtures are torn down so their spans are written
+        self._flush()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        tracer.enabled = False
+        for restore in reversed(self._restore):
+            restore()
+        self._restore = []
+
+    def _flush(self, nodeid: Optional[str] = None):
+        events = tracer.drain()
+        if not events:
+            return
+        if self.mode == "test" and nodeid:
+            safe_name = re.sub(r"[^\w.-]+", "_", nodeid).strip("_")
+            writer = TraceWriter(os.path.join(self.output_dir, self.worker_id, f"{safe_name}.trace.json"))
+            writer.write(self._process_metadata() + events)
+            writer.close()
+            return
+        if self._writer is None:
+            self._writer = TraceWriter(os.path.join(self.output_dir, self.worker_id, "trace.json"))
+            self._writer.write(self._process_metadata())
+        self._writer.write(events)
+
+    def _process_metadata(self) -> List[Dict[str, Any]]:
+        return [{"name": "process_name", "ph": "M", "pid": tracer.pid, "args": {"name": self.worker_id}}]
@@ -0,0 +1,217 @@
+import abc
+import base64
+import collections
+import os
+import re
+import shutil
+import subprocess
+import time
+import zipfile
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class VideoRecorder(abc.ABC):
+    """
+    Base class for per-test video capture. Recording starts once the driver is ready and
+    the video is only written to disk when the test failed.
+    """
+
+    def __init__(self, driver: Any, output_dir: str = "framework/reports/videos"):
+        self.driver = driver
+        self.output_dir = output_dir
+
+    @staticmethod
+    def create(driver: Any, output_dir: str = "framework/reports/videos",
+               buffer_seconds: int = 30, fps: int = 2) -> 'VideoRecorder':
+        """
+        Create the recorder matching the driver type
+        :param driver: Selenium WebDriver, Appium WebDriver or Playwright Page
+        :param output_dir: Directory failing videos are written to
+        :param buffer_seconds: Length of the rolling buffer for screencast recordings
+        :param fps: Frames per second for screencast recordings
+        :return: VideoRecorder instance
+        """
+        if hasattr(driver, 'start_recording_screen'):  # Appium
+            return AppiumVideoRecorder(driver, output_dir)
+        if hasattr(driver, 'goto'):  # Playwright
+            return PlaywrightVideoRecorder(driver, output_dir)
+        return ScreencastRecorder(driver, output_dir, buffer_seconds, fps)
+
+    @staticmethod
+    def playwright_context_options(video_dir: str = "framework/reports/videos/raw") -> Dict[str, Any]:
+        """
+        Context options enabling Playwright video recording. Raw videos go to video_dir and
+        are deleted when the test passed, failing ones are saved to the output directory.
+        """
+        return {
+            'record_video_dir': video_dir,
+            'record_video_size': {'width': 1280, 'height': 720}
+        }
+
+    @abc.abstractmethod
+    def start(self):
+        """Start recording"""
+
+    @abc.abstractmethod
+    def stop(self, name: str, keep: bool) -> Optional[str]:
+        """
+        Stop recording
+        :param name: Name of the test, used for the video file name
+        :param keep: Whether to write the video to disk (i.e. the test failed)
+        :return: Path of the written video, None if nothing was kept
+        """
+
+    def _video_path(self, name: str, extension: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_name = re.sub(r'[^\w.-]+', '_', name).strip('_')
+        return os.path.join(self.output_dir, f"{safe_name}.{extension}")
+
+
+class PlaywrightVideoRecorder(VideoRecorder):
+    """Uses the context video recording configured through playwright_context_options"""
+
+    def start(self):
+        # Playwright records from page creation, nothing to start
+        pass
+
+    def stop(self, name: str, keep: bool) -> Optional[str]:
+        video = self.driver.video
+        if not video:
+            return None
+
+        # The video file is only finalized once the page is closed
+        if not self.driver.is_closed():
+            self.driver.close()
+
+        path = None
+        if keep:
+            path = self._video_path(name, "webm")
+            video.save_as(path)
+        video.delete()
+        return path
+
+
+class ScreencastRecorder(VideoRecorder):
+    """
+    Samples the page into a bounded in-memory ring buffer holding the last
+    buffer_seconds of frames. Chromium frames are captured as JPEG through CDP, other
+    browsers fall back to WebDriver PNG screenshots.
+
+    WebDriver clients are not thread-safe, so frames are captured on the test's own
+    thread: the driver's execute method is wrapped and a frame is taken right after a
+    test command once the frame interval has passed. Slow captures stretch the
+    interval so they never take more than MAX_DRIVER_SHARE of the test's time.
+    """
+
+    MAX_CONSECUTIVE_ERRORS = 3
+    MAX_DRIVER_SHARE = 0.2
+    # Commands after which the session may be gone or the page is being captured anyway
+    SKIPPED_COMMANDS = {"quit", "close", "screenshot", "elementScreenshot", "executeCdpCommand"}
+
+    def __init__(self, driver: Any, output_dir: str = "framework/reports/videos",
+                 buffer_seconds: int = 30, fps: int = 2):
+        super().__init__(driver, output_dir)
+        self.fps = max(1, fps)
+        self._frames: Deque[Tuple[float, bytes]] = collections.deque(maxlen=max(1, buffer_seconds * self.fps))
+        self._use_cdp = hasattr(driver, 'execute_cdp_cmd')
+        self._execute = None
+        self._capturing = False
+        self._next_frame = 0.0
+        self._errors = 0
+
+    def start(self):
+        self._execute = self.driver.execute
+        recorder = self
+
+        def execute(driver_command, params=None):
+            response = recorder._execute(driver_command, params)
+            if driver_command not in recorder.SKIPPED_COMMANDS:
+                recorder._capture_after_command()
+            return response
+        # Instance attribute, stop() deletes it so the class method applies again
+        self.driver.execute = execute
+        self._capture_after_command()
+
+    def stop(self, name: str, keep: bool) -> Optional[str]:
+        if self._execute is not None:
+            del self.driver.execute
+            self._execute = None
+
+        frames = list(self._frames)
+        self._frames.clear()
+        if not keep or not frames:
+            return None
+        # Frames follow the test's commands, play them back at the rate they were captured
+        fps = self.fps
+        if len(frames) > 1 and frames[-1][0] > frames[0][0]:
+            fps = min(self.fps, (len(frames) - 1) / (frames[-1][0] - frames[0][0]))
+        return encode_frames([frame for _, frame in frames], fps, self._video_path(name, "mp4"))
+
+    def _capture_frame(self) -> bytes:
+        if self._use_cdp:
+            result = self.driver.execute_cdp_cmd('Page.captureScreenshot', {'format': 'jpeg', 'quality': 40})
+            return base64.b64decode(result['data'])
+        return self.driver.get_screenshot_as_png()
+
+    def _capture_after_command(self):
+        started = time.monotonic()
+        # The capture itself goes through execute as well
+        if self._capturing or started < self._next_frame or self._errors >= self.MAX_CONSECUTIVE_ERRORS:
+            return
+        self._capturing = True
+        try:
+            self._frames.append((started, self._capture_frame()))
+            self._errors = 0
+        except Exception:
+            # Alerts or navigations can make a single capture fail; a closed driver fails every time
+            self._errors += 1
+        finally:
+            self._capturing = False
+        elapsed = time.monotonic() - started
+        self._next_frame = started + max(1.0 / self.fps, elapsed / self.MAX_DRIVER_SHARE)
+
+
+class AppiumVideoRecorder(VideoRecorder):
+    """Uses the Appium start/stop screen recording commands"""
+
+    def start(self):
+        self.driver.start_recording_screen(forceRestart=True, videoQuality='low')
+
+    def stop(self, name: str, keep: bool) -> Optional[str]:
+        payload = self.driver.stop_recording_screen()
+        if not keep or not payload:
+            return None
+
+        path = self._video_path(name, "mp4")
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(payload))
+        return path
+
+
+def encode_frames(frames: List[bytes], fps: float, path: str) -> str:
+    """
+    Encode still frames to an MP4 with ffmpeg. Without ffmpeg the frames are stored
+    in a zip archive next to the requested path instead.
+    :param frames: JPEG or PNG encoded frames
+    :param fps: Frame rate of the captured frames
+    :param path: Target .mp4 path
+    :return: Path of the written file
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        result = subprocess.run(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'image2pipe', '-framerate', f"{fps:.3f}", '-i', '-',
+             '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2', '-c:v', 'libx264', '-pix_fmt', 'yuv420p', path],
+            input=b"".join(frames),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if result.returncode == 0:
+            return path
+
+    archive_path = os.path.splitext(path)[0] + ".zip"
+    extension = "jpg" if frames[0][:2] == b"\xff\xd8" else "png"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for index, frame in enumerate(frames):
+            archive.writestr(f"frame_{index:05d}.{extension}", frame)
+    return archive_path